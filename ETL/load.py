@@ -9,6 +9,10 @@ from tqdm import tqdm
 from config.local_config import DATABASE_URL
 # from config.heroku_config import HEROKU_DB_URL
 from dotenv import load_dotenv
+from myApp.models.schedule_index import day_mask, to_minutes
+from myApp.notify import publish_change, ALL_ENTITIES
+from myApp.models.globalStatistics_model import CREATE_STATISTICS_VIEWS_SQL, STATISTICS_VIEWS
+from ETL.migrate import MEETING_WEEKLY_SQL, SECTION_WEEKLY_TRIGGER_SQL, NO_ROOM_DOUBLE_BOOKING_SQL, LIST_FILTER_INDEXES_SQL
 # from myApp.filehandler import process_files
 
 def ask_database_choice():
@@ -126,6 +130,18 @@ class Load:
             self.logger.error(f"Failed to install pgvector: {str(e)}")
             return False
 
+    def _ensure_btree_gist(self, cur):
+        """Install btree_gist (needed for the room exclusion constraint) if the server has it"""
+        try:
+            cur.execute("SAVEPOINT btree_gist;")
+            cur.execute("CREATE EXTENSION IF NOT EXISTS btree_gist;")
+            cur.execute("RELEASE SAVEPOINT btree_gist;")
+            return True
+        except Exception as e:
+            cur.execute("ROLLBACK TO SAVEPOINT btree_gist;")
+            self.logger.error(f"Failed to install btree_gist: {str(e)}")
+            return False
+
     def create_tables(self):
         """Create the necessary tables for the project with proper sequences."""
         with psycopg2.connect(self.db_url) as conn:
@@ -183,10 +199,14 @@ class Load:
                         ccode varchar,
                         starttime time,
                         endtime time,
-                        cdays varchar(5)
+                        cdays varchar(5),
+                        day_mask smallint NOT NULL DEFAULT 0,  -- bit d set = meets on weekday d (L=0 ... D=6)
+                        minutes int4range  -- [start, end) in minutes since midnight
                     );
                 """)
 
+                cur.execute(MEETING_WEEKLY_SQL)
+
                 cur.execute("""
                     CREATE TABLE section (
                         sid serial PRIMARY KEY,
@@ -196,10 +216,26 @@ class Load:
                         semester varchar,
                         years varchar,
                         capacity int,
+                        weekly int4multirange,  -- copied from the meeting by section_weekly trigger
                         CONSTRAINT valid_class_id CHECK (cid >= 2)
                     );
                 """)
 
+                cur.execute(SECTION_WEEKLY_TRIGGER_SQL)
+
+                # Reject double-booked rooms in the database itself
+                if self._ensure_btree_gist(cur):
+                    cur.execute(NO_ROOM_DOUBLE_BOOKING_SQL)
+                else:
+                    self.logger.warning("btree_gist unavailable; room double-booking is only checked by the API.")
+                    cur.execute("CREATE INDEX section_weekly_gist ON section USING gist (weekly);")
+
+                # Indexes behind the list-endpoint filters (keyset order uses the primary keys)
+                cur.execute(LIST_FILTER_INDEXES_SQL)
+
+                # Materialized global statistics (refreshed by the app after writes)
+                cur.execute(CREATE_STATISTICS_VIEWS_SQL)
+
                 # # Create users table
                 # cur.execute("""
                 #     CREATE TABLE users (
@@ -275,6 +311,8 @@ class Load:
                 #     );
                 # """)
 
+                # Running app processes drop their caches and indexes
+                publish_change(cur, ALL_ENTITIES)
                 conn.commit()
                 self.logger.info("Tables created successfully.")
 
@@ -316,6 +354,10 @@ class Load:
                     print("Sections loaded successfully")
                     # self._load_syllabi(syllabi_data, cur)  # Updated syllabi loading
                     # print("Syllabi loaded successfully.")
+                    for view in STATISTICS_VIEWS:
+                        cur.execute(f"REFRESH MATERIALIZED VIEW {view};")
+                    print("Statistics refreshed successfully")
+                    publish_change(cur, ALL_ENTITIES)
                     conn.commit()
                     print("All data committed to database successfully!")
                     
@@ -357,10 +399,11 @@ class Load:
             
             cur.execute(
                 """
-                INSERT INTO meeting (ccode, starttime, endtime, cdays)
-                VALUES (%s, %s, %s, %s) RETURNING mid
+                INSERT INTO meeting (ccode, starttime, endtime, cdays, day_mask, minutes)
+                VALUES (%s, %s, %s, %s, %s, int4range(%s, %s)) RETURNING mid
                 """,
-                (row['ccode'], starttime, endtime, row['cdays'])
+                (row['ccode'], starttime, endtime, row['cdays'],
+                 day_mask(row['cdays']), to_minutes(starttime), to_minutes(endtime))
             )
             # row['mid'] = cur.fetchone()[0]
             new_mid = cur.fetchone()[0]
@@ -450,6 +493,9 @@ class Load:
                     WHERE sid IN (SELECT sid FROM duplicate_schedules);
                 """)
 
+                for view in STATISTICS_VIEWS:
+                    cur.execute(f"REFRESH MATERIALIZED VIEW {view};")
+                publish_change(cur, "section")
                 conn.commit()
                 # self.logger.info("Duplicate sections cleaned successfully")
 
@@ -0,0 +1,197 @@
+# ETL.migrate.py
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import psycopg2
+from psycopg2.extras import execute_values
+import logging
+from config.local_config import DATABASE_URL
+from myApp.models.schedule_index import day_mask, to_minutes
+from myApp.notify import publish_change, ALL_ENTITIES
+from myApp.models.globalStatistics_model import STATISTICS_VIEW_SQL, refresh_statistics
+
+# int4multirange and range_agg() were added in PostgreSQL 14
+MIN_SERVER_VERSION = 140000
+
+# Weekly minute ranges of a meeting (weekday * 1440 + minute),
+# so two meetings clash exactly when their ranges overlap
+MEETING_WEEKLY_SQL = """
+    CREATE OR REPLACE FUNCTION meeting_weekly(mask smallint, minutes int4range)
+    RETURNS int4multirange
+    LANGUAGE sql IMMUTABLE AS $$
+        SELECT COALESCE(
+            range_agg(int4range(d * 1440 + lower(minutes), d * 1440 + upper(minutes))),
+            '{}'::int4multirange
+        )
+        FROM generate_series(0, 6) AS d
+        WHERE minutes IS NOT NULL AND (mask::int & (1 << d)) <> 0
+    $$;
+"""
+
+# Keeps section.weekly in step with the section's meeting
+SECTION_WEEKLY_TRIGGER_SQL = """
+    CREATE OR REPLACE FUNCTION section_fill_weekly() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        SELECT meeting_weekly(m.day_mask, m.minutes) INTO NEW.weekly
+        FROM meeting m WHERE m.mid = NEW.mid;
+        RETURN NEW;
+    END
+    $$;
+    DROP TRIGGER IF EXISTS section_weekly ON section;
+    CREATE TRIGGER section_weekly
+    BEFORE INSERT OR UPDATE OF mid ON section
+    FOR EACH ROW EXECUTE FUNCTION section_fill_weekly();
+"""
+
+# Rejects double-booked rooms in the database itself; semesters compare
+# case-insensitively, like the API's checks and the schedule index
+NO_ROOM_DOUBLE_BOOKING_SQL = """
+    ALTER TABLE section ADD CONSTRAINT no_room_double_booking
+    EXCLUDE USING gist (roomid WITH =, (lower(semester)) WITH =, years WITH =, weekly WITH &&);
+"""
+
+# Indexes behind the list-endpoint filters (keyset order uses the primary keys)
+LIST_FILTER_INDEXES_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_section_term ON section (lower(semester), years, sid);
+    CREATE INDEX IF NOT EXISTS idx_section_cid ON section (cid, sid);
+    CREATE INDEX IF NOT EXISTS idx_section_roomid ON section (roomid, sid);
+    CREATE INDEX IF NOT EXISTS idx_section_mid ON section (mid, sid);
+    CREATE INDEX IF NOT EXISTS idx_class_term ON class (lower(term), years, cid);
+    CREATE INDEX IF NOT EXISTS idx_class_ccode ON class (ccode, cid);
+    CREATE INDEX IF NOT EXISTS idx_meeting_ccode ON meeting (ccode, mid);
+    CREATE INDEX IF NOT EXISTS idx_requisite_reqid ON requisite (reqid, classid);
+    CREATE INDEX IF NOT EXISTS idx_room_building ON room (building, rid);
+"""
+
+
+class Migrate:
+    """
+    Bring a database created before the weekly schedule columns up to date.
+
+    Adds meeting.day_mask, meeting.minutes and section.weekly, the
+    meeting_weekly() function and the section_weekly trigger, backfills
+    them from the existing rows, and adds the no_room_double_booking
+    constraint (or the plain GiST index when btree_gist is missing or
+    rooms are already double-booked). It also creates the list-filter
+    indexes and any missing statistics views, then refreshes every view.
+    Every step is idempotent, so it is
+    safe to run on a database that ETL/load.py created or already migrated.
+    """
+
+    def __init__(self, db_url=None):
+        self.db_url = db_url or DATABASE_URL
+        if not self.db_url:
+            raise ValueError("DATABASE_URL is not configured properly")
+        if self.db_url.startswith("postgres://"):
+            self.db_url = self.db_url.replace("postgres://", "postgresql://", 1)
+        logging.basicConfig(level=logging.INFO)
+        self.logger = logging.getLogger(__name__)
+
+    def _check_server_version(self, cur):
+        cur.execute("SHOW server_version_num;")
+        version = int(cur.fetchone()[0])
+        if version < MIN_SERVER_VERSION:
+            raise RuntimeError(
+                f"PostgreSQL 14 or newer is required (int4multirange, range_agg); server is {version}"
+            )
+
+    def _backfill_meetings(self, cur):
+        cur.execute("SELECT mid, cdays, starttime, endtime FROM meeting WHERE minutes IS NULL;")
+        rows = []
+        for mid, cdays, starttime, endtime in cur.fetchall():
+            try:
+                mask = day_mask(cdays)
+            except ValueError as e:
+                self.logger.warning(f"Meeting {mid}: {e}; it will not block any room")
+                mask = 0
+            if starttime is None or endtime is None or to_minutes(endtime) <= to_minutes(starttime):
+                self.logger.warning(f"Meeting {mid} has no valid time range; it will not block any room")
+                rows.append((mid, mask, None, None))
+                continue
+            rows.append((mid, mask, to_minutes(starttime), to_minutes(endtime)))
+        if rows:
+            execute_values(
+                cur,
+                """
+                UPDATE meeting m
+                SET day_mask = v.day_mask, minutes = int4range(v.low, v.high)
+                FROM (VALUES %s) AS v (mid, day_mask, low, high)
+                WHERE m.mid = v.mid
+                """,
+                rows,
+                template="(%s::int, %s::smallint, %s::int, %s::int)",
+            )
+        return len(rows)
+
+    def _ensure_double_booking_check(self, cur):
+        cur.execute("""
+            SELECT pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conname = 'no_room_double_booking' AND conrelid = 'section'::regclass;
+        """)
+        existing = cur.fetchone()
+        if existing and "lower(" in existing[0]:
+            return
+        try:
+            cur.execute("SAVEPOINT no_room_double_booking;")
+            if existing:
+                # Created before semesters were compared case-insensitively
+                cur.execute("ALTER TABLE section DROP CONSTRAINT no_room_double_booking;")
+            cur.execute("CREATE EXTENSION IF NOT EXISTS btree_gist;")
+            cur.execute(NO_ROOM_DOUBLE_BOOKING_SQL)
+            cur.execute("RELEASE SAVEPOINT no_room_double_booking;")
+        except psycopg2.Error as e:
+            cur.execute("ROLLBACK TO SAVEPOINT no_room_double_booking;")
+            if existing:
+                self.logger.warning(f"Kept the case-sensitive no_room_double_booking constraint: {e}")
+                return
+            self.logger.warning(f"Room double-booking is only checked by the API: {e}")
+            cur.execute("CREATE INDEX IF NOT EXISTS section_weekly_gist ON section USING gist (weekly);")
+
+    def _create_statistics_views(self, cur):
+        cur.execute("SELECT matviewname FROM pg_matviews WHERE schemaname = current_schema();")
+        existing = {name for (name,) in cur.fetchall()}
+        missing = [view for view in STATISTICS_VIEW_SQL if view not in existing]
+        for view in missing:
+            cur.execute(STATISTICS_VIEW_SQL[view])
+        return missing
+
+    def run(self):
+        """Apply the migration in one transaction."""
+        with psycopg2.connect(self.db_url) as conn:
+            with conn.cursor() as cur:
+                self._check_server_version(cur)
+                cur.execute("""
+                    ALTER TABLE meeting
+                        ADD COLUMN IF NOT EXISTS day_mask smallint NOT NULL DEFAULT 0,
+                        ADD COLUMN IF NOT EXISTS minutes int4range;
+                    ALTER TABLE section ADD COLUMN IF NOT EXISTS weekly int4multirange;
+                """)
+                cur.execute(MEETING_WEEKLY_SQL)
+                cur.execute(SECTION_WEEKLY_TRIGGER_SQL)
+                meetings = self._backfill_meetings(cur)
+                cur.execute("""
+                    UPDATE section s
+                    SET weekly = meeting_weekly(m.day_mask, m.minutes)
+                    FROM meeting m
+                    WHERE m.mid = s.mid AND s.weekly IS DISTINCT FROM meeting_weekly(m.day_mask, m.minutes);
+                """)
+                sections = cur.rowcount
+                self._ensure_double_booking_check(cur)
+                cur.execute(LIST_FILTER_INDEXES_SQL)
+                created = self._create_statistics_views(cur)
+                publish_change(cur, ALL_ENTITIES)
+        # Views that already existed may predate the backfill
+        refresh_statistics(self.db_url, concurrently=False)
+        self.logger.info(f"Backfilled {meetings} meetings and {sections} sections")
+        if created:
+            self.logger.info(f"Created statistics views: {', '.join(created)}")
+
+
+if __name__ == "__main__":
+    try:
+        Migrate().run()
+        print("\nMigration completed successfully!")
+    except Exception as e:
+        print(f"\nError during migration: {str(e)}")
+        raise
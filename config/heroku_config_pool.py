@@ -1,6 +1,6 @@
 import os
 from dotenv import load_dotenv
-from psycopg2 import pool, DatabaseError
+from psycopg2 import DatabaseError
 
 # Load the .env file based on the current environment
 env = os.getenv("FLASK_ENV", "development")
@@ -22,9 +22,8 @@ class DatabaseConfig:
         """
         try:
             if not DatabaseConfig.connection_pool:
-                DatabaseConfig.connection_pool = pool.SimpleConnectionPool(
-                    1, 20, HEROKU_DB_URL
-                )
+                from myApp.extensions import init_pool
+                DatabaseConfig.connection_pool = init_pool(HEROKU_DB_URL, minconn=1, maxconn=20)
                 print("Database connection pool created successfully.")
         except DatabaseError as e:
             print(f"Error creating connection pool: {e}")
@@ -7,9 +7,22 @@ from myApp.views.localStatistics_views import statistics_bp  # Local statistics
 from myApp.views.syllabus_views import syllabus_blueprint  # Local syllabuses blueprint
 from myApp.views.globalStatistics_views import global_statistics_bp  # Global statistics blueprint
 from myApp.views.chatbot_views import chatbot_blueprint  # Chatbot blueprint
+from myApp.views.planner_views import planner_blueprint  # Academic planner blueprint
 from myApp.views.auth_views import auth_blueprint  # Add this import
-from myApp.extensions import get_db_connection  # Import the database connection function
-from myApp.chatbot import chat
+from myApp.extensions import init_pool, get_pool  # Shared database connection pool
+from myApp.cache import get_read_cache  # Catalog read cache
+from myApp.embeddings import embedding_stats  # Shared embedding models
+from myApp.warmup import start_warmup, readiness, WARMUP_ON_START  # Deferred chatbot loading
+from myApp.models.schedule_index import get_schedule_index  # In-memory room schedule
+from myApp.notify import start_change_listener  # Cross-process change notifications
+from myApp.models.globalStatistics_model import (  # Materialized statistics
+    get_statistics_refresher, STATISTICS_REFRESH_INTERVAL, STATISTICS_FALLBACK_INTERVAL
+)
+from myApp.models.requisite_graph import get_requisite_graph  # Prerequisite graph
+from myApp.models.utilization_model import get_room_utilization  # Room utilization heatmaps
+from myApp.models.planner_model import get_academic_planner  # Academic plans
+from myApp.models.schedule_builder import get_schedule_builder  # Student schedule combinations
+from myApp.models.statistics_snapshot import get_statistics_snapshot, DEFAULT_STATISTICS_BACKEND, SNAPSHOT_BACKEND  # In-memory statistics
 from flask import Flask, jsonify
 import os
 
@@ -62,10 +75,46 @@ def create_app():
 
     # Store configuration in app config
     app.config["DATABASE_URL"] = db_url
-    app.config["DB_CONNECTION"] = config.get_db_connection()
+    app.config["DB_POOL_MIN"] = int(os.getenv("DB_POOL_MIN", 1))
+    app.config["DB_POOL_MAX"] = int(os.getenv("DB_POOL_MAX", 10))
+    app.config["DB_POOL_TIMEOUT"] = float(os.getenv("DB_POOL_TIMEOUT", 10))
+
+    # Shared, thread-safe connection pool borrowed by every model
+    app.config["DB_POOL"] = init_pool(
+        db_url,
+        minconn=app.config["DB_POOL_MIN"],
+        maxconn=app.config["DB_POOL_MAX"],
+        timeout=app.config["DB_POOL_TIMEOUT"],
+    )
     
     # Make DATABASE_URL available globally
     os.environ["DATABASE_URL"] = db_url
+
+    # Keep this process's caches in step with writes made by other workers
+    if os.getenv("CHANGE_LISTENER", "1") == "1":
+        listener = start_change_listener(db_url)
+        listener.subscribe(get_read_cache(db_url).apply_change)
+        listener.subscribe(get_schedule_index(db_url).apply_change)
+        listener.subscribe(get_requisite_graph(db_url).apply_change)
+        # Utilization heatmaps are recomputed after any committed write, this process's included
+        listener.subscribe(get_room_utilization(db_url).apply_change)
+        listener.subscribe(get_room_utilization(db_url).apply_change, own=True)
+        # Memoized plans are dropped after any committed class, requisite or section write
+        listener.subscribe(get_academic_planner(db_url).apply_change)
+        listener.subscribe(get_academic_planner(db_url).apply_change, own=True)
+        # Cached terms and schedules are dropped after any committed section, meeting or class write
+        listener.subscribe(get_schedule_builder(db_url).apply_change)
+        listener.subscribe(get_schedule_builder(db_url).apply_change, own=True)
+        # Each process refreshes the statistics views after its own committed writes
+        listener.subscribe(get_statistics_refresher(db_url).mark_stale, own=True)
+        # The in-memory statistics reload after any committed write, this process's included
+        if DEFAULT_STATISTICS_BACKEND == SNAPSHOT_BACKEND:
+            snapshot = get_statistics_snapshot(db_url)
+            listener.subscribe(snapshot.apply_change)
+            listener.subscribe(snapshot.apply_change, own=True)
+    else:
+        # Nothing reports writes without the listener, so the views are refreshed on a schedule
+        get_statistics_refresher(db_url, interval=STATISTICS_REFRESH_INTERVAL or STATISTICS_FALLBACK_INTERVAL)
     
     print(f"Using the {'local' if choice == '1' else 'Heroku'} database.")
 
@@ -79,8 +128,13 @@ def create_app():
     app.register_blueprint(global_statistics_bp, url_prefix='/no-pensamos-repetir-npr/')  # Register the global statistics blueprint
     app.register_blueprint(syllabus_blueprint, url_prefix='/no-pensamos-repetir-npr/')  # Register the syllabus blueprint
     app.register_blueprint(chatbot_blueprint, url_prefix='/no-pensamos-repetir-npr/')  # Register the chatbot blueprint
+    app.register_blueprint(planner_blueprint, url_prefix='/no-pensamos-repetir-npr/')  # Register the planner blueprint
     app.register_blueprint(auth_blueprint, url_prefix='/no-pensamos-repetir-npr/auth')  # Add this line
 
+    # Chatbot models and clients load in the background; CRUD and statistics serve meanwhile
+    if WARMUP_ON_START:
+        start_warmup()
+
     # Configure port binding for Heroku
     port = int(os.getenv("PORT", 5000))
     if os.getenv('HEROKU_ENV'):
@@ -101,6 +155,48 @@ def create_app():
             "environment": env
         })
 
+    @app.route("/ready")
+    def ready():
+        """
+        Report whether the chatbot stack has finished loading.
+
+        Returns:
+            Response: JSON with "ready" and the state of each deferred resource;
+            status 503 until everything is loaded.
+        """
+        status = readiness()
+        return jsonify(status), 200 if status["ready"] else 503
+
+    @app.route("/pool")
+    def pool_stats():
+        """
+        Report connection pool usage and wait times.
+
+        Returns:
+            Response: JSON response with the pool statistics.
+        """
+        return jsonify(get_pool(app.config["DATABASE_URL"]).stats())
+
+    @app.route("/cache")
+    def cache_stats():
+        """
+        Report hit/miss counters of the class, room, meeting and requisite read cache.
+
+        Returns:
+            Response: JSON response with the cache statistics.
+        """
+        return jsonify(get_read_cache(app.config["DATABASE_URL"]).stats())
+
+    @app.route("/embeddings")
+    def embeddings_stats():
+        """
+        Report the shared embedding models: whether each is loaded, its memory footprint and encode counters.
+
+        Returns:
+            Response: JSON response with one entry per model.
+        """
+        return jsonify(embedding_stats())
+
     return app
 
 # Application instance for gunicorn
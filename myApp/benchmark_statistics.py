@@ -0,0 +1,101 @@
+# myApp/benchmark_statistics.py
+"""
+Compare the SQL and snapshot statistics backends.
+
+Usage:
+    python -m myApp.benchmark_statistics [--iterations 200] [--building Stefani]
+        [--room-id 1] [--year 2022] [--semester fall]
+
+Every statistic is run through StatisticsController / GlobalStatisticsController
+with each backend. The snapshot is loaded before timing starts; its load time
+is reported separately. "snapshot, no memo" empties the snapshot's result
+memo before every call, i.e. the cost of the first read after a reload.
+"""
+
+import argparse
+import logging
+import statistics
+import time
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from myApp.controllers.localStatistics_controller import StatisticsController
+from myApp.controllers.globalStatistics_controller import GlobalStatisticsController
+from myApp.models.statistics_snapshot import get_statistics_snapshot, STATISTICS_BACKENDS, SNAPSHOT_BACKEND
+
+
+def time_call(call, iterations, before=None):
+    """Run call iterations times and return (median, p95) latency in milliseconds; before() is not timed."""
+    timings = []
+    for _ in range(iterations):
+        if before:
+            before()
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def run_benchmark(db_url, iterations, building, room_id, year, semester):
+    """
+    Time every statistic on both backends.
+
+    Returns:
+        dict: Statistic name -> backend -> (median ms, p95 ms). "snapshot_cold"
+        recomputes from the frames on every call instead of using the memo.
+    """
+    results = {}
+    snapshot = get_statistics_snapshot(db_url)
+    for backend in STATISTICS_BACKENDS:
+        local_controller = StatisticsController(db_url, backend=backend)
+        global_controller = GlobalStatisticsController(db_url, backend=backend)
+        calls = {
+            "room_capacity": lambda: local_controller.room_capacity(building),
+            "room_ratio": lambda: local_controller.room_ratio(building),
+            "room_classes": lambda: local_controller.room_classes(room_id),
+            "classes_by_semester": lambda: local_controller.classes_by_semester(year, semester),
+            "top_meetings": global_controller.top_meetings_with_most_sections,
+            "most_prerequisites": global_controller.top_classes_most_prerequisites,
+            "least_offered": global_controller.top_classes_least_offered,
+            "sections_per_year": global_controller.total_sections_per_year,
+            "dashboard": lambda: global_controller.dashboard(building, room_id, year, semester),
+        }
+        for name, call in calls.items():
+            call()  # warm up: pool connection, prepared plans, snapshot load
+            results.setdefault(name, {})[backend] = time_call(call, iterations)
+            if backend == SNAPSHOT_BACKEND:
+                results[name]["snapshot_cold"] = time_call(
+                    call, iterations, before=lambda: snapshot.data()["results"].clear())
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--building", default="Stefani")
+    parser.add_argument("--room-id", type=int, default=1)
+    parser.add_argument("--year", default="2022")
+    parser.add_argument("--semester", default="fall")
+    args = parser.parse_args()
+    if not args.db_url:
+        parser.error("Set DATABASE_URL or pass --db-url.")
+    # The controllers log every call at INFO
+    logging.disable(logging.INFO)
+
+    results = run_benchmark(args.db_url, args.iterations, args.building, args.room_id, args.year, args.semester)
+    snapshot = get_statistics_snapshot(args.db_url).stats()
+
+    columns = (("sql", "sql"), ("snapshot", "snapshot"), ("snapshot_cold", "snapshot, no memo"))
+    print(f"{'ms (p50/p95)':<22}" + "".join(f"{title:>20}" for _, title in columns) + f"{'speedup':>10}")
+    for name, timings in results.items():
+        cells = "".join(f"{f'{timings[key][0]:.3f}/{timings[key][1]:.3f}':>20}" for key, _ in columns)
+        print(f"{name:<22}{cells}{timings['sql'][0] / timings['snapshot'][0]:>9.1f}x")
+    print(f"\nSnapshot load: {snapshot['load_seconds'] * 1000:.1f} ms ({snapshot['loads']} load(s))")
+
+
+if __name__ == "__main__":
+    main()
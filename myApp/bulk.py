@@ -0,0 +1,242 @@
+# myApp/bulk.py
+
+import os
+import psycopg2
+from psycopg2.extras import execute_values
+from myApp.extensions import db_connection
+
+# Largest batch a /<entity>/bulk request may carry
+MAX_BULK_ROWS = int(os.getenv("BULK_MAX_ROWS", "10000"))
+
+# Rows per INSERT/UPDATE statement sent by execute_values
+BULK_PAGE_SIZE = 1000
+
+
+class BulkValidationError(ValueError):
+    """
+    A batch was rejected and nothing was written.
+
+    errors holds one {"index": <row position>, "error": <reason>} entry per bad row.
+    """
+
+    def __init__(self, errors):
+        self.errors = sorted(errors, key=lambda error: error["index"])
+        super().__init__(f"{len(self.errors)} row(s) rejected; nothing was written.")
+
+
+def validate_batch(rows, validate_row, key=None):
+    """
+    Validate every row of a batch before anything touches the database.
+
+    Args:
+        rows (list): Row dicts from the request body.
+        validate_row (callable): Row dict -> tuple of cleaned values; raises
+            KeyError/ValueError/TypeError for a bad row.
+        key (callable): Cleaned tuple -> primary key, to reject rows that
+            target the same record twice.
+
+    Returns:
+        list: Cleaned tuples in request order.
+
+    Raises:
+        ValueError: If rows is not a non-empty list within MAX_BULK_ROWS.
+        BulkValidationError: If any row is invalid.
+    """
+    if not isinstance(rows, list):
+        raise ValueError("Expected a JSON list of rows.")
+    if not rows:
+        raise ValueError("The batch is empty.")
+    if len(rows) > MAX_BULK_ROWS:
+        raise ValueError(f"A batch may hold at most {MAX_BULK_ROWS} rows; got {len(rows)}.")
+
+    values, errors, seen = [], [], {}
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append({"index": index, "error": "Row must be an object."})
+            continue
+        try:
+            cleaned = validate_row(row)
+        except KeyError as e:
+            errors.append({"index": index, "error": f"Missing required field: {e}"})
+            continue
+        except (ValueError, TypeError) as e:
+            errors.append({"index": index, "error": str(e)})
+            continue
+        if key is not None:
+            row_key = key(cleaned)
+            if row_key in seen:
+                errors.append({"index": index, "error": f"Duplicate of row {seen[row_key]}."})
+                continue
+            seen[row_key] = index
+        values.append(cleaned)
+
+    if errors:
+        raise BulkValidationError(errors)
+    return values
+
+
+def as_key_rows(items, field):
+    """Let delete batches be plain id lists: [3, 4] becomes [{field: 3}, {field: 4}]."""
+    if not isinstance(items, list):
+        return items
+    return [item if isinstance(item, dict) else {field: item} for item in items]
+
+
+def require_int(row, field, minimum=None):
+    """Read an integer field (booleans are rejected)."""
+    value = row[field]
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"{field} must be an integer")
+    if minimum is not None and value < minimum:
+        raise ValueError(f"{field} cannot be less than {minimum}")
+    return value
+
+
+def require_str(row, field):
+    """Read a non-empty string field."""
+    value = row[field]
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"{field} must be a non-empty string")
+    return value
+
+
+def require_bool(row, field):
+    """Read a boolean field."""
+    value = row[field]
+    if not isinstance(value, bool):
+        raise ValueError(f"{field} must be true or false")
+    return value
+
+
+def optional_str(row, field):
+    """Read a string field that may be missing, null or empty."""
+    value = row.get(field)
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"{field} must be a string")
+    return value
+
+
+def insert_rows(cur, table, columns, values, returning, template=None):
+    """
+    Insert a batch with execute_values.
+
+    Returns:
+        list: The returning column of each inserted row, in input order.
+    """
+    query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s RETURNING {returning}"
+    rows = execute_values(cur, query, values, template=template, page_size=BULK_PAGE_SIZE, fetch=True)
+    return [row[0] for row in rows]
+
+
+def update_rows(cur, table, key_columns, columns, values, template):
+    """
+    Update a batch with one UPDATE ... FROM (VALUES ...) per page.
+
+    Args:
+        values (list): Tuples of key values followed by column values.
+        template (str): Typed placeholders, e.g. "(%s::int, %s::varchar)";
+            VALUES columns are otherwise typed as text.
+
+    Returns:
+        set: Keys (tuples) of the rows that were updated.
+    """
+    names = list(key_columns) + list(columns)
+    assignments = ", ".join(f"{column} = v.{column}" for column in columns)
+    match = " AND ".join(f"t.{column} = v.{column}" for column in key_columns)
+    returning = ", ".join(f"t.{column}" for column in key_columns)
+    query = (
+        f"UPDATE {table} t SET {assignments} "
+        f"FROM (VALUES %s) AS v ({', '.join(names)}) "
+        f"WHERE {match} RETURNING {returning}"
+    )
+    rows = execute_values(cur, query, values, template=template, page_size=BULK_PAGE_SIZE, fetch=True)
+    return {tuple(row) for row in rows}
+
+
+def delete_rows(cur, table, key_columns, keys, template):
+    """
+    Delete a batch of rows by primary key.
+
+    Returns:
+        set: Keys (tuples) of the rows that were deleted.
+    """
+    match = " AND ".join(f"t.{column} = v.{column}" for column in key_columns)
+    returning = ", ".join(f"t.{column}" for column in key_columns)
+    query = (
+        f"DELETE FROM {table} t USING (VALUES %s) AS v ({', '.join(key_columns)}) "
+        f"WHERE {match} RETURNING {returning}"
+    )
+    rows = execute_values(cur, query, keys, template=template, page_size=BULK_PAGE_SIZE, fetch=True)
+    return {tuple(row) for row in rows}
+
+
+def raise_if_missing(keys, found, label):
+    """
+    Reject the batch if some keys matched no row.
+
+    Args:
+        keys (list): Requested keys (tuples), in request order.
+        found (set): Keys the statement touched.
+        label (str): Entity name for the message, e.g. "Section".
+
+    Raises:
+        BulkValidationError: Listing every key that was not found.
+    """
+    errors = [
+        {"index": index, "error": f"{label} {', '.join(map(str, key))} not found."}
+        for index, key in enumerate(keys) if tuple(key) not in found
+    ]
+    if errors:
+        raise BulkValidationError(errors)
+
+
+def reset_sequence(cur, table, column):
+    """Move a serial column's sequence past rows inserted with explicit ids."""
+    cur.execute(
+        f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), "
+        f"COALESCE((SELECT MAX({column}) FROM {table}), 1), true)"
+    )
+
+
+def insert_with_sequence_retry(db_url, table, column, write):
+    """
+    Run write(cursor) in one transaction, catching the serial sequence up once if needed.
+
+    Tables loaded with explicit ids leave their sequence behind MAX(id); the
+    first insert then fails with a unique violation on the primary key.
+
+    Args:
+        db_url (str): Database connection URL.
+        table (str): Table with a serial primary key.
+        column (str): The serial column.
+        write (callable): Cursor -> result; does the inserts.
+
+    Returns:
+        The value returned by write.
+    """
+    for attempt in range(2):
+        try:
+            with db_connection(db_url) as conn:
+                with conn.cursor() as cur:
+                    return write(cur)
+        except psycopg2.errors.UniqueViolation:
+            if attempt:
+                raise
+            with db_connection(db_url) as conn:
+                with conn.cursor() as cur:
+                    reset_sequence(cur, table, column)
+
+
+def bulk_request_rows(payload):
+    """Rows of a bulk request: a bare JSON list, or {"rows": [...]} / {"ids": [...]}."""
+    if isinstance(payload, dict):
+        return payload.get("rows", payload.get("ids"))
+    return payload
+
+
+def bulk_error_payload(error):
+    """JSON body for a rejected batch: the message plus per-row errors when there are any."""
+    payload = {"error": str(error)}
+    if isinstance(error, BulkValidationError):
+        payload["errors"] = error.errors
+    return payload
@@ -0,0 +1,161 @@
+# myApp/cache.py
+
+from collections import OrderedDict
+import threading
+import time
+import os
+
+# Size and lifetime of the catalog read cache, overridable through the environment
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "4096"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+
+_MISSING = object()
+
+
+def filters_key(filters):
+    """Hashable form of a fetch_all_* filters dict, for use in a cache key."""
+    return tuple(sorted((filters or {}).items()))
+
+
+class ReadCache:
+    """
+    In-process read-through cache with LRU eviction and a TTL.
+
+    Keys are tuples (entity, kind, ...), e.g. ("class", "row", 12) for one
+    class or ("class", "page", after, limit, filters) for a list page. The
+    model that owns an entity invalidates it on every write: the rows it
+    touched plus every cached page of that entity, since any page may
+    contain them. Cached values are shared between callers and must be
+    treated as read-only.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._pages = {}               # entity -> keys of cached pages
+        self._generations = {}         # entity -> write counter, guards loads racing a write
+        self._epoch = 0                # bumped by clear(), same purpose for every entity
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def _drop(self, key):
+        if self._entries.pop(key, _MISSING) is not _MISSING and key[1] != "row":
+            self._pages.get(key[0], set()).discard(key)
+
+    def get_or_load(self, key, load):
+        """
+        Return the cached value for key, calling load() on a miss.
+
+        Args:
+            key (tuple): (entity, kind, ...); kind "row" marks a single-record entry.
+            load (callable): Reads the value from the database. Exceptions
+                propagate and nothing is cached.
+
+        Returns:
+            The cached or freshly loaded value.
+        """
+        entity = key[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry[1]
+                self._drop(key)
+                self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            generation = (self._epoch, self._generations.get(entity, 0))
+
+        value = load()
+
+        with self._lock:
+            # A write landed while we were reading; the value may predate it
+            if (self._epoch, self._generations.get(entity, 0)) != generation:
+                return value
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            if key[1] != "row":
+                self._pages.setdefault(entity, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stats["evictions"] += 1
+        return value
+
+    def invalidate(self, entity, *row_ids):
+        """
+        Forget what a write to entity may have changed.
+
+        Args:
+            entity (str): Entity name used in the keys, e.g. "class".
+            *row_ids: Ids of the rows written (tuples for composite keys).
+                With none given, every entry of the entity is dropped.
+        """
+        with self._lock:
+            self._generations[entity] = self._generations.get(entity, 0) + 1
+            self._stats["invalidations"] += 1
+            if row_ids:
+                for row_id in row_ids:
+                    self._drop((entity, "row", row_id))
+                for key in list(self._pages.get(entity, ())):
+                    self._drop(key)
+            else:
+                for key in [key for key in self._entries if key[0] == entity]:
+                    self._drop(key)
+
+    def apply_change(self, entity, ids):
+        """ChangeListener handler: invalidate what another process wrote."""
+        if entity == "*":
+            self.clear()
+        elif ids:
+            self.invalidate(entity, *ids)
+        else:
+            self.invalidate(entity)
+
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._pages.clear()
+
+    def stats(self):
+        """
+        Snapshot of the cache counters.
+
+        Returns:
+            dict: Hits, misses, hit ratio, evictions, expirations, invalidations and size.
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["size"] = len(self._entries)
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_ratio"] = round(snapshot["hits"] / lookups, 4) if lookups else 0.0
+        snapshot["max_entries"] = self.max_entries
+        snapshot["ttl_seconds"] = self.ttl
+        return snapshot
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_read_cache(db_url=None):
+    """
+    Get the process-wide read cache for a database URL.
+
+    Args:
+        db_url (str): Database connection URL. Defaults to DATABASE_URL.
+
+    Returns:
+        ReadCache: The cache shared by the class, room, meeting and requisite models.
+    """
+    db_url = db_url or os.getenv("DATABASE_URL")
+    with _caches_lock:
+        cache = _caches.get(db_url)
+        if cache is None:
+            cache = ReadCache()
+            _caches[db_url] = cache
+        return cache
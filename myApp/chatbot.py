@@ -1,12 +1,9 @@
-from sentence_transformers import SentenceTransformer
-from langchain.prompts import PromptTemplate
-from myApp.controllers.syllabus_controller import SyllabusController
-from transformers import pipeline
 from config.environment import get_database_url  # Changed this line
-from langchain_ollama import ChatOllama
 from myApp.models.chatbot_model import ChatbotService
+from myApp.embeddings import get_embedding_model, EMBEDDING_MODEL_NAME
+from myApp.extensions import db_connection
+from myApp.warmup import lazy_resource
 import requests
-import warnings
 import time  # Add time import for sleep
 
 class Chatbot:
@@ -15,9 +12,7 @@ class Chatbot:
         self.is_ollama_available = False
         try:
             self.chatbot_service = ChatbotService()
-            with warnings.catch_warnings():
-                warnings.filterwarnings("ignore", category=UserWarning)
-                self.embedding_model = SentenceTransformer('all-mpnet-base-v2', device='cpu')
+            self.embedding_model = get_embedding_model(EMBEDDING_MODEL_NAME)
             self.ollama_url = "http://localhost:11434/api/generate"
             self.model_name = "qwen2.5:1.5b"
             self.max_retries = 5  # Increased retries
@@ -180,28 +175,33 @@ class Chatbot:
 
 # Keep existing template and helper functions
 
-# Database setup
-db_url = get_database_url()  # Changed this line
-syllabus_controller = SyllabusController(db_url=db_url)
-
-# Initialize the embedding model
-EMBEDDING_MODEL_NAME = "all-mpnet-base-v2"
-embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
-
-# Initialize the LLM
-llm = ChatOllama(
-    model="qwen2.5:1.5b",  # Changed model
-    temperature=0.2,  # Lower temperature for more focused responses
-    num_ctx=2048,    # Increased context window
-    num_thread=4,    # Utilize multiple threads
-    num_gpu=1,       # Enable GPU acceleration if available
-    base_url="http://localhost:11434",
-    timeout=45,      # Increased timeout
-    streaming=True,  # Enable streaming for faster initial response
-    cache=True,      # Enable response caching
-    repeat_penalty=1.1,  # Slight penalty for repetition
-    seed=42          # Consistent random seed
-)
+# Database setup (validated on first use, not at import)
+chatbot_database = lazy_resource("chatbot_database", get_database_url)
+
+# Shared embedding model (loaded on first encode or by the warm-up)
+embedding_model = get_embedding_model(EMBEDDING_MODEL_NAME)
+lazy_resource("embedding_model", lambda: embedding_model.model)
+
+
+def _create_llm():
+    from langchain_ollama import ChatOllama
+    return ChatOllama(
+        model="qwen2.5:1.5b",  # Changed model
+        temperature=0.2,  # Lower temperature for more focused responses
+        num_ctx=2048,    # Increased context window
+        num_thread=4,    # Utilize multiple threads
+        num_gpu=1,       # Enable GPU acceleration if available
+        base_url="http://localhost:11434",
+        timeout=45,      # Increased timeout
+        streaming=True,  # Enable streaming for faster initial response
+        cache=True,      # Enable response caching
+        repeat_penalty=1.1,  # Slight penalty for repetition
+        seed=42          # Consistent random seed
+    )
+
+
+# The LLM client (built on first use or by the warm-up)
+chatbot_llm = lazy_resource("chatbot_llm", _create_llm)
 
 # Add caching decorator
 from functools import lru_cache
@@ -219,7 +219,7 @@ def get_relevant_context(question_embedding, top_n=2):
         
         # Get context from syllabus table with improved similarity search
         try:
-            with psycopg2.connect(db_url) as conn:
+            with db_connection(chatbot_database.get()) as conn:
                 with conn.cursor() as cur:
                     # Convert embedding to proper format
                     embedding_list = question_embedding if isinstance(question_embedding, list) else question_embedding.tolist()
@@ -407,7 +407,7 @@ def chat(question: str, user_id: str = "anonymous"):
         ]
 
         # Generate answer from the LLM
-        result = llm.invoke(messages)
+        result = chatbot_llm.get().invoke(messages)
         answer = result.content.strip()[:500]  # Limit response length
         print(f"Generated answer for user {user_id}")
 
@@ -1,9 +1,10 @@
 # myApp/controllers/chatbot_controller.py
 from myApp.models.chatbot_model import ChatbotService
-from sentence_transformers import SentenceTransformer
+from myApp.embeddings import get_embedding_model
 from myApp.models.chatbot_model import ChatbotModel
 from config.local_config import DATABASE_URL
 from datetime import datetime
+from myApp.controllers.planner_controller import PlannerController
 
 class ChatbotController:
     """
@@ -13,7 +14,8 @@ class ChatbotController:
     def __init__(self):
         self.chatbot_service = ChatbotService()
         self.model = ChatbotModel(DATABASE_URL)
-        self.embedding_model = SentenceTransformer('all-mpnet-base-v2')
+        self.embedding_model = get_embedding_model()
+        self.planner = PlannerController(DATABASE_URL)
 
     def process_question(self, question: str, user_id: str = "anonymous") -> dict:
         """
@@ -66,6 +68,27 @@ class ChatbotController:
             print(f"Error in controller: {e}")
             raise
 
+    def plan_courses(self, completed, terms, max_credits=None, user_id: str = "anonymous") -> dict:
+        """
+        Answer "what should I take next" with an academic plan.
+
+        Args:
+            completed (list): Class ids the student already passed.
+            terms (list): [{"semester": "Fall", "year": 2025}, ...] to plan.
+            max_credits (int): Credit limit per term.
+            user_id (str): The user ID (default: anonymous).
+
+        Returns:
+            dict: "answer" (the plan as text) and "plan".
+        """
+        try:
+            plan = self.planner.plan(completed, terms, max_credits)
+            return {"answer": plan["summary"], "plan": plan}
+        except ValueError:
+            raise
+        except Exception as e:
+            raise Exception(f"Error planning courses for {user_id}: {str(e)}")
+
     def store_knowledge(self, content: str, user_id: int) -> dict:
         try:
             # Generate embedding for content
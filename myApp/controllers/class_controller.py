@@ -15,6 +15,24 @@ class ClassController:
         except Exception as e:
             raise e
 
+    def bulk_create_classes(self, classes):
+        try:
+            return self.model.bulk_insert_classes(classes)
+        except Exception as e:
+            raise e
+
+    def bulk_update_classes(self, classes):
+        try:
+            return self.model.bulk_update_classes(classes)
+        except Exception as e:
+            raise e
+
+    def bulk_delete_classes(self, class_ids):
+        try:
+            return self.model.bulk_delete_classes(class_ids)
+        except Exception as e:
+            raise e
+
     def get_class(self, class_id):
         try:
             class_data = self.model.fetch_class(class_id)
@@ -24,12 +42,22 @@ class ClassController:
         except Exception as e:
             raise e
 
-    def get_all_classes(self):
+    def get_all_classes(self, after=None, limit=None, filters=None):
+        try:
+            # An empty page (no match, or a cursor past the end) is returned as is
+            return self.model.fetch_all_classes(after, limit, filters)
+        except Exception as e:
+            raise e
+
+    def get_all_classes_json(self, after=None, limit=None, filters=None):
+        try:
+            return self.model.fetch_all_classes_json(after, limit, filters)
+        except Exception as e:
+            raise e
+
+    def stream_classes(self, after=None, filters=None):
         try:
-            classes = self.model.fetch_all_classes()
-            if not classes:
-                raise ValueError("No classes found.")
-            return classes
+            return self.model.stream_all_classes(after, filters)
         except Exception as e:
             raise e
 
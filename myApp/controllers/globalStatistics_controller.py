@@ -1,19 +1,106 @@
 import logging
+import json
 from myApp.models.globalStatistics_model import (
     get_top_meetings_by_sections,
     get_total_sections_per_year,
     get_top_classes_most_prerequisites,
-    get_top_classes_least_offered
+    get_top_classes_least_offered,
+    get_statistic_json,
+    get_statistics_dashboard
 )
+from myApp.models.statistics_engine import get_top_statistic, STATISTIC_FILTERS
+from myApp.models.statistics_snapshot import (
+    get_statistics_snapshot,
+    SNAPSHOT_BACKEND,
+    STATISTICS_BACKENDS,
+    DEFAULT_STATISTICS_BACKEND
+)
+
+# Error raised when a statistic comes back empty (None = empty is a valid answer)
+EMPTY_STATISTIC_ERRORS = {
+    "top_meetings": "No meetings found with associated sections.",
+    "most_prerequisites": "No classes found as prerequisites.",
+    "least_offered": "No classes found that were offered the least.",
+    "sections_per_year": None,
+}
 
 class GlobalStatisticsController:
-    def __init__(self, db_url):
+    def __init__(self, db_url, backend=None):
         self.db_url = db_url
+        # "sql" queries Postgres; "snapshot" answers from in-memory frames
+        self.backend = backend or DEFAULT_STATISTICS_BACKEND
+        if self.backend not in STATISTICS_BACKENDS:
+            raise ValueError(f"Unknown statistics backend '{self.backend}'")
+
+    def statistic_json(self, name):
+        """Get a statistic as JSON text (built by PostgreSQL on the SQL backend)."""
+        try:
+            if self.backend == SNAPSHOT_BACKEND:
+                body = json.dumps(get_statistics_snapshot(self.db_url).statistic(name))
+            else:
+                body = get_statistic_json(name, self.db_url)
+            if body == "[]" and EMPTY_STATISTIC_ERRORS[name]:
+                raise ValueError(EMPTY_STATISTIC_ERRORS[name])
+            return body
+        except Exception as e:
+            logging.error(f"Error in statistic_json({name}): {e}")
+            raise e
+
+    def dashboard(self, building=None, room_id=None, year=None, semester=None, as_json=False):
+        """Get every global panel and the local panels for a building, room and term in one query."""
+        try:
+            if self.backend == SNAPSHOT_BACKEND:
+                panels = get_statistics_snapshot(self.db_url).dashboard(
+                    building=building or None,
+                    room_id=room_id or None,
+                    year=year or None,
+                    semester=semester or None,
+                )
+                return json.dumps(panels) if as_json else panels
+            return get_statistics_dashboard(
+                self.db_url,
+                as_json=as_json,
+                building=building or None,
+                room_id=room_id or None,
+                year=year or None,
+                semester=semester or None,
+            )
+        except Exception as e:
+            logging.error(f"Error in dashboard: {e}")
+            raise e
+
+    def top_statistic_json(self, params):
+        """
+        Get any top-N statistic as JSON text built by PostgreSQL.
+
+        Args:
+            params (dict): metric, group_by, optional per, n and order, plus
+                filters either under "filters" or as top-level keys.
+        """
+        try:
+            filters = dict(params.get("filters") or {})
+            filters.update({name: params[name] for name in STATISTIC_FILTERS if name in params})
+            return get_top_statistic(
+                self.db_url,
+                as_json=True,
+                metric=params.get("metric"),
+                group_by=params.get("group_by"),
+                per=params.get("per") or None,
+                filters=filters,
+                n=params.get("n", 3),
+                order=params.get("order", "desc"),
+            )
+        except Exception as e:
+            logging.error(f"Error in top_statistic_json: {e}")
+            raise e
 
     def top_meetings_with_most_sections(self):
         """Get top 5 meetings with the most sections."""
         try:
-            meetings = get_top_meetings_by_sections(self.db_url)
+            if self.backend == SNAPSHOT_BACKEND:
+                meetings = get_statistics_snapshot(self.db_url).get_top_meetings_by_sections()
+            else:
+                meetings = get_top_meetings_by_sections(self.db_url)
             if not meetings:
                 raise ValueError("No meetings found with associated sections.")
             return meetings
@@ -25,7 +112,10 @@ class GlobalStatisticsController:
         """Get total number of sections per year."""
         try:
             logging.info("Starting total_sections_per_year request")
-            sections_per_year = get_total_sections_per_year(self.db_url)
+            if self.backend == SNAPSHOT_BACKEND:
+                sections_per_year = get_statistics_snapshot(self.db_url).get_total_sections_per_year()
+            else:
+                sections_per_year = get_total_sections_per_year(self.db_url)
             logging.info(f"Retrieved sections per year: {sections_per_year}")
             return sections_per_year
         except Exception as e:
@@ -35,7 +125,10 @@ class GlobalStatisticsController:
     def top_classes_most_prerequisites(self):
         """Get top 3 classes that appear the most as prerequisites."""
         try:
-            classes = get_top_classes_most_prerequisites(self.db_url)
+            if self.backend == SNAPSHOT_BACKEND:
+                classes = get_statistics_snapshot(self.db_url).get_top_classes_most_prerequisites()
+            else:
+                classes = get_top_classes_most_prerequisites(self.db_url)
             if not classes:
                 raise ValueError("No classes found as prerequisites.")
             return classes
@@ -46,7 +139,10 @@ class GlobalStatisticsController:
     def top_classes_least_offered(self):
         """Get top 3 classes that were offered the least."""
         try:
-            classes = get_top_classes_least_offered(self.db_url)
+            if self.backend == SNAPSHOT_BACKEND:
+                classes = get_statistics_snapshot(self.db_url).get_top_classes_least_offered()
+            else:
+                classes = get_top_classes_least_offered(self.db_url)
             if not classes:
                 raise ValueError("No classes found that were offered the least.")
             return classes
@@ -5,16 +5,29 @@ from myApp.models.localStatistics_model import (
     get_top_classes_per_room,
     get_top_classes_per_semester
 )
+from myApp.models.utilization_model import get_room_utilization
+from myApp.models.statistics_snapshot import (
+    get_statistics_snapshot,
+    SNAPSHOT_BACKEND,
+    STATISTICS_BACKENDS,
+    DEFAULT_STATISTICS_BACKEND
+)
 
 class StatisticsController:
-    def __init__(self, db_url):
+    def __init__(self, db_url, backend=None):
         self.db_url = db_url
+        # "sql" queries Postgres; "snapshot" answers from in-memory frames
+        self.backend = backend or DEFAULT_STATISTICS_BACKEND
+        if self.backend not in STATISTICS_BACKENDS:
+            raise ValueError(f"Unknown statistics backend '{self.backend}'")
 
-    @staticmethod
-    def room_capacity(building):
+    def room_capacity(self, building):
         """Get top 3 rooms with most capacity."""
         try:
-            rooms = get_top_rooms_by_capacity(building)
+            if self.backend == SNAPSHOT_BACKEND:
+                rooms = get_statistics_snapshot(self.db_url).get_top_rooms_by_capacity(building)
+            else:
+                rooms = get_top_rooms_by_capacity(building, self.db_url)
             if not rooms:
                 raise ValueError("Building does not exist or no rooms found.")
             return rooms
@@ -22,11 +35,13 @@ class StatisticsController:
             logging.error(f"Error in room_capacity: {e}")
             raise e
 
-    @staticmethod
-    def room_ratio(building):
+    def room_ratio(self, building):
         """Get top 3 sections with highest ratio."""
         try:
-            sections = get_top_sections_by_ratio(building)
+            if self.backend == SNAPSHOT_BACKEND:
+                sections = get_statistics_snapshot(self.db_url).get_top_sections_by_ratio(building)
+            else:
+                sections = get_top_sections_by_ratio(building, self.db_url)
             if not sections:
                 raise ValueError("Building does not exist or no sections found.")
             return sections
@@ -34,11 +49,13 @@ class StatisticsController:
             logging.error(f"Error in room_ratio: {e}")
             raise e
 
-    @staticmethod
-    def room_classes(room_id):
+    def room_classes(self, room_id):
         """Get top 3 most taught classes per room."""
         try:
-            classes = get_top_classes_per_room(room_id)
+            if self.backend == SNAPSHOT_BACKEND:
+                classes = get_statistics_snapshot(self.db_url).get_top_classes_per_room(room_id)
+            else:
+                classes = get_top_classes_per_room(room_id, self.db_url)
             if not classes:
                 raise ValueError("No classes found for this room.")
             return classes
@@ -46,14 +63,34 @@ class StatisticsController:
             logging.error(f"Error in room_classes: {e}")
             raise e
 
-    @staticmethod
-    def classes_by_semester(year, semester):
+    def classes_by_semester(self, year, semester):
         """Get top 3 most taught classes per semester."""
         try:
-            classes = get_top_classes_per_semester(year, semester)
+            if self.backend == SNAPSHOT_BACKEND:
+                classes = get_statistics_snapshot(self.db_url).get_top_classes_per_semester(year, semester)
+            else:
+                classes = get_top_classes_per_semester(year, semester, self.db_url)
             if not classes:
                 raise ValueError("No classes found for this semester.")
             return classes
         except Exception as e:
             logging.error(f"Error in classes_by_semester: {e}")
-            raise e
\ No newline at end of file
+            raise e
+
+    def utilization(self, year, semester, by="room", building=None, room_id=None):
+        """Get the day x time-slot occupancy heatmap and utilization of rooms or buildings in a term."""
+        try:
+            if room_id is not None:
+                try:
+                    room_id = int(room_id)
+                except (TypeError, ValueError):
+                    raise ValueError("room_id must be an integer.")
+            heatmap = get_room_utilization(self.db_url).heatmap(
+                semester, year, by=by, building=building, room_id=room_id
+            )
+            if not heatmap["results"]:
+                raise ValueError("No rooms found for this building or room.")
+            return heatmap
+        except Exception as e:
+            logging.error(f"Error in utilization: {e}")
+            raise e
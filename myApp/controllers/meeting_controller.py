@@ -14,12 +14,34 @@ class MeetingController:
         except Exception as e:
             raise e
 
-    def get_all_meetings(self):
+    def bulk_create_meetings(self, meetings):
         try:
-            meetings = self.model.fetch_all_meetings()
-            if not meetings:
-                raise ValueError("No meetings found.")
-            return meetings
+            return self.model.bulk_insert_meetings(meetings)
+        except Exception as e:
+            raise e
+
+    def bulk_update_meetings(self, meetings):
+        try:
+            return self.model.bulk_update_meetings(meetings)
+        except Exception as e:
+            raise e
+
+    def bulk_delete_meetings(self, meeting_ids):
+        try:
+            return self.model.bulk_delete_meetings(meeting_ids)
+        except Exception as e:
+            raise e
+
+    def get_all_meetings(self, after=None, limit=None, filters=None):
+        try:
+            # An empty page (no match, or a cursor past the end) is returned as is
+            return self.model.fetch_all_meetings(after, limit, filters)
+        except Exception as e:
+            raise e
+
+    def get_all_meetings_json(self, after=None, limit=None, filters=None):
+        try:
+            return self.model.fetch_all_meetings_json(after, limit, filters)
         except Exception as e:
             raise e
 
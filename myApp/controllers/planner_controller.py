@@ -0,0 +1,29 @@
+# myApp/controllers/planner_controller.py
+
+import logging
+from myApp.models.planner_model import get_academic_planner, describe_plan, DEFAULT_MAX_CREDITS
+
+
+class PlannerController:
+    def __init__(self, db_url):
+        self.planner = get_academic_planner(db_url)
+
+    def plan(self, completed, terms, max_credits=None):
+        """
+        Semester-by-semester plan for a transcript.
+
+        Args:
+            completed (list): Class ids already passed.
+            terms (list): [{"semester": "Fall", "year": 2025}, ...] in order.
+            max_credits (int): Credit limit per term (default PLANNER_MAX_CREDITS).
+
+        Returns:
+            dict: The plan, with a plain-text "summary".
+        """
+        try:
+            plan = self.planner.plan(completed or [], terms,
+                                     DEFAULT_MAX_CREDITS if max_credits is None else max_credits)
+            return {**plan, "summary": describe_plan(plan)}
+        except Exception as e:
+            logging.error(f"Error in plan: {e}")
+            raise e
@@ -10,8 +10,17 @@ class RequisiteController:
     def create_requisite(self, requisite_data):
         return self.model.insert_requisite(requisite_data)
 
-    def get_all_requisites(self):
-        return self.model.fetch_all_requisites()
+    def get_all_requisites(self, after=None, limit=None, filters=None):
+        return self.model.fetch_all_requisites(after, limit, filters)
+
+    def bulk_create_requisites(self, requisites):
+        return self.model.bulk_insert_requisites(requisites)
+
+    def bulk_update_requisites(self, requisites):
+        return self.model.bulk_update_requisites(requisites)
+
+    def bulk_delete_requisites(self, requisites):
+        return self.model.bulk_delete_requisites(requisites)
 
     def get_requisite(self, classid, reqid):
         return self.model.fetch_requisite(classid, reqid)
@@ -21,3 +30,12 @@ class RequisiteController:
 
     def delete_requisite(self, classid, reqid):
         return self.model.delete_requisite(classid, reqid)
+
+    def get_prerequisite_chain(self, cid):
+        return self.model.prerequisite_chain(cid)
+
+    def get_unlocks(self, cid):
+        return self.model.unlocks(cid)
+
+    def get_requisite_graph(self):
+        return self.model.graph_summary()
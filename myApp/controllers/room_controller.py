@@ -1,6 +1,7 @@
 # myApp/controllers/room_controller.py
 
 from myApp.models.room_model import RoomModel
+from myApp.pagination import Page
 
 class RoomController:
 
@@ -54,14 +55,14 @@ class RoomController:
         return temp
     
 
-    def get_all_rooms(self):
+    def get_all_rooms(self, after=None, limit=None, filters=None):
 
-        temp = self.model.fetch_all_rooms()
+        temp = self.model.fetch_all_rooms(after, limit, filters)
 
         if temp == None:
             return None
     
-        rooms = []
+        rooms = Page(next_after=temp.next_after)
 
         for record in temp:
             room = self.convert_to_dict(record[0], record[1], record[2], record[3])
@@ -70,6 +71,48 @@ class RoomController:
         return rooms 
 
 
+    def find_free_rooms(self, args):
+
+        column_names = ["days", "start", "end", "semester", "year"]
+
+        # Validation
+        for column_name in column_names:
+            if not args.get(column_name):
+                return f"Invalid Input, parameter {column_name} missing"
+
+        try:
+            min_capacity = int(args.get("capacity", 0))
+        except ValueError:
+            return "Invalid Input, Capacity must be an integer"
+
+        try:
+            temp = self.model.find_free_rooms(
+                args["days"], args["start"], args["end"], args["semester"], args["year"], min_capacity
+            )
+        except (ValueError, IndexError) as e:
+            return f"Invalid Input, {e}"
+
+        rooms = []
+
+        for record in temp:
+            room = self.convert_to_dict(record[0], record[1], record[2], record[3])
+            rooms.append(room)
+
+        return rooms
+
+
+    def bulk_create_rooms(self, rooms):
+        return self.model.bulk_insert_rooms(rooms)
+
+
+    def bulk_update_rooms(self, rooms):
+        return self.model.bulk_update_rooms(rooms)
+
+
+    def bulk_delete_rooms(self, room_ids):
+        return self.model.bulk_delete_rooms(room_ids)
+
+
     def get_room_by_id(self, room_id):
         found_room = self.model.fetch_room(room_id)
 
@@ -1,11 +1,14 @@
 # myApp/controllers/section_controller.py
 
 from myApp.models.section_model import SectionModel
+from myApp.models.schedule_builder import get_schedule_builder, SCHEDULE_DEFAULT_LIMIT
+from myApp.models.room_assignment import assign_rooms, ASSIGNMENT_TIME_LIMIT
 from config.local_config import DATABASE_URL
 
 class SectionController:
     def __init__(self):
         self.model = SectionModel(DATABASE_URL)
+        self.schedule_builder = get_schedule_builder(DATABASE_URL)
 
     def create_section(self, section_data):
         try:
@@ -13,9 +16,63 @@ class SectionController:
         except Exception as e:
             raise e
 
-    def get_all_sections(self):
+    def check_conflicts(self, proposals):
         try:
-            return self.model.fetch_all_sections()
+            return self.model.check_batch_conflicts(proposals)
+        except Exception as e:
+            raise e
+
+    def build_schedules(self, courses, semester, year, rank="gaps", limit=SCHEDULE_DEFAULT_LIMIT):
+        try:
+            return self.schedule_builder.build(courses, semester, year, rank, limit)
+        except Exception as e:
+            raise e
+
+    def assign_rooms(self, semester, year, reassign=False, time_limit=ASSIGNMENT_TIME_LIMIT):
+        try:
+            return assign_rooms(DATABASE_URL, semester, year, reassign, time_limit)
+        except Exception as e:
+            raise e
+
+    def bulk_create_sections(self, sections):
+        try:
+            return self.model.bulk_insert_sections(sections)
+        except Exception as e:
+            raise e
+
+    def bulk_update_sections(self, sections):
+        try:
+            return self.model.bulk_update_sections(sections)
+        except Exception as e:
+            raise e
+
+    def bulk_delete_sections(self, section_ids):
+        try:
+            return self.model.bulk_delete_sections(section_ids)
+        except Exception as e:
+            raise e
+
+    def import_sections(self, stream):
+        try:
+            return self.model.import_sections_csv(stream)
+        except Exception as e:
+            raise e
+
+    def get_all_sections(self, after=None, limit=None, filters=None):
+        try:
+            return self.model.fetch_all_sections(after, limit, filters)
+        except Exception as e:
+            raise e
+
+    def get_all_sections_json(self, after=None, limit=None, filters=None):
+        try:
+            return self.model.fetch_all_sections_json(after, limit, filters)
+        except Exception as e:
+            raise e
+
+    def stream_sections(self, after=None, filters=None):
+        try:
+            return self.model.stream_all_sections(after, filters)
         except Exception as e:
             raise e
 
@@ -23,11 +23,17 @@ class SyllabusController:
         """
         return self.model.fetch_fragment(chunkid)
 
-    def get_all_fragments(self):
+    def get_all_fragments(self, after=None, limit=None, filters=None):
         """
-        Retrieves all syllabus fragments from the database.
+        Retrieves syllabus fragments from the database, one page at a time.
         """
-        return self.model.fetch_all_fragments()
+        return self.model.fetch_all_fragments(after, limit, filters)
+
+    def stream_fragments(self, after=None, filters=None):
+        """
+        Streams every matching syllabus fragment.
+        """
+        return self.model.stream_all_fragments(after, filters)
 
     def delete_fragment(self, chunkid):
         """
@@ -0,0 +1,178 @@
+# myApp/embeddings.py
+
+import threading
+import warnings
+import logging
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+# Sentence embedding model of the chatbot and knowledge base, and the device it runs on
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "all-mpnet-base-v2")
+EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE", "cpu")
+
+# Question encoder filehandler uses for syllabus fragments
+DPR_MODEL_NAME = "facebook/dpr-question_encoder-single-nq-base"
+
+SENTENCE_TRANSFORMER = "sentence-transformers"
+DPR = "dpr"
+
+
+def _load_sentence_transformer(name, device):
+    from sentence_transformers import SentenceTransformer
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        return SentenceTransformer(name, device=device)
+
+
+def _encode_sentence_transformer(model, text, **kwargs):
+    return model.encode(text, **kwargs)
+
+
+def _load_dpr(name, device):
+    from transformers import AutoTokenizer, AutoModel
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    model = AutoModel.from_pretrained(name).to(device)
+    model.eval()
+    return tokenizer, model
+
+
+def _encode_dpr(loaded, text, max_length=768):
+    import torch
+    tokenizer, model = loaded
+    inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=max_length, padding=True)
+    inputs = {key: value.to(model.device) for key, value in inputs.items()}
+    with torch.no_grad():
+        outputs = model(**inputs)
+    return outputs.pooler_output.squeeze().tolist()  # pooler_output is the DPR embedding
+
+
+# kind -> (load(name, device), encode(loaded, text, **kwargs))
+EMBEDDING_KINDS = {
+    SENTENCE_TRANSFORMER: (_load_sentence_transformer, _encode_sentence_transformer),
+    DPR: (_load_dpr, _encode_dpr),
+}
+
+
+def _modules(loaded):
+    """torch modules inside a loaded model (DPR loads a (tokenizer, model) pair)."""
+    items = loaded if isinstance(loaded, tuple) else (loaded,)
+    return [item for item in items if hasattr(item, "parameters")]
+
+
+class EmbeddingModel:
+    """
+    One embedding model, loaded on first use and shared by the whole process.
+
+    The weights are loaded once, under a lock, the first time encode() or
+    model is used; later callers get the same instance. encode() is
+    serialized with a lock as well: the underlying torch modules are not
+    documented as safe to call from several threads at once, and a single
+    CPU model gains little from concurrent calls anyway.
+    """
+
+    def __init__(self, name, kind=SENTENCE_TRANSFORMER, device=EMBEDDING_DEVICE):
+        if kind not in EMBEDDING_KINDS:
+            raise ValueError(f"Unknown embedding model kind '{kind}'")
+        self.name = name
+        self.kind = kind
+        self.device = device
+        self._loaded = None
+        self._load_lock = threading.Lock()
+        self._encode_lock = threading.Lock()
+        self._stats = {"loads": 0, "load_seconds": 0.0, "encodes": 0, "encode_seconds": 0.0}
+
+    @property
+    def loaded(self):
+        return self._loaded is not None
+
+    @property
+    def model(self):
+        """The underlying model, loading it on first use."""
+        if self._loaded is None:
+            with self._load_lock:
+                if self._loaded is None:
+                    started = time.perf_counter()
+                    load = EMBEDDING_KINDS[self.kind][0]
+                    loaded = load(self.name, self.device)
+                    self._stats["loads"] += 1
+                    self._stats["load_seconds"] = round(time.perf_counter() - started, 3)
+                    logger.info(f"Loaded embedding model {self.name} in {self._stats['load_seconds']}s")
+                    self._loaded = loaded
+        return self._loaded
+
+    def encode(self, text, **kwargs):
+        """
+        Embed text with the model.
+
+        Args:
+            text (str|list): Text, or texts for a batch (sentence-transformers).
+
+        Returns:
+            The model's embedding: a NumPy array for sentence-transformers
+            (as SentenceTransformer.encode), a list of floats for DPR.
+        """
+        loaded = self.model
+        encode = EMBEDDING_KINDS[self.kind][1]
+        with self._encode_lock:
+            started = time.perf_counter()
+            embedding = encode(loaded, text, **kwargs)
+            self._stats["encodes"] += 1
+            self._stats["encode_seconds"] += time.perf_counter() - started
+        return embedding
+
+    def memory_bytes(self):
+        """Bytes held by the model's parameters and buffers (0 until loaded)."""
+        if self._loaded is None:
+            return 0
+        total = 0
+        for module in _modules(self._loaded):
+            for tensor in list(module.parameters()) + list(module.buffers()):
+                total += tensor.numel() * tensor.element_size()
+        return total
+
+    def stats(self):
+        """Name, kind, device, whether it is loaded, its memory footprint and call counters."""
+        stats = dict(self._stats)
+        stats["encode_seconds"] = round(stats["encode_seconds"], 3)
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "device": self.device,
+            "loaded": self.loaded,
+            "memory_bytes": self.memory_bytes(),
+            **stats,
+        }
+
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def get_embedding_model(name=EMBEDDING_MODEL_NAME, kind=SENTENCE_TRANSFORMER):
+    """
+    Get the process-wide embedding model for a name.
+
+    Nothing is loaded until the model is first used.
+
+    Args:
+        name (str): Model name (sentence-transformers or Hugging Face hub id).
+        kind (str): "sentence-transformers" or "dpr".
+
+    Returns:
+        EmbeddingModel: The shared model.
+    """
+    with _models_lock:
+        model = _models.get((name, kind))
+        if model is None:
+            model = EmbeddingModel(name, kind)
+            _models[(name, kind)] = model
+        return model
+
+
+def embedding_stats():
+    """stats() of every registered embedding model, loaded or not."""
+    with _models_lock:
+        models = list(_models.values())
+    return [model.stats() for model in models]
@@ -1,18 +1,36 @@
 # myApp/extensions.py
 
 import psycopg2
+from psycopg2 import pool as pg_pool
+from psycopg2 import extensions as pg_extensions
 from psycopg2.extras import RealDictCursor
+from contextlib import contextmanager
+import threading
+import logging
+import hashlib
+import weakref
+import time
+import uuid
 import os
 
+logger = logging.getLogger(__name__)
+
+# Pool sizing and health-check settings, overridable through the environment
+DEFAULT_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DEFAULT_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DEFAULT_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DEFAULT_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTH_CHECK", "30"))
+
+
 def get_db_connection():
     """
     Establish a connection to the database specified by the environment.
-    
+
     Returns:
         connection: A connection object for PostgreSQL.
     """
     choice = os.getenv("DATABASE_CHOICE")
-    
+
     if choice == "1":  # Local database
         from config.local_config import LocalConfig
         db_url = LocalConfig.get_db_connection()
@@ -24,6 +42,317 @@ def get_db_connection():
 
     if not db_url:
         raise ValueError("Database URL not configured properly.")
-    
+
     connection = psycopg2.connect(db_url, cursor_factory=RealDictCursor)
     return connection
+
+
+class PoolTimeout(pg_pool.PoolError):
+    """Raised when no pooled connection becomes available in time."""
+
+
+class DatabasePool:
+    """
+    Thread-safe PostgreSQL connection pool shared by every model.
+
+    Callers block (up to ``timeout`` seconds) when all connections are in use
+    instead of failing immediately. Connections that sat idle longer than
+    ``health_check_interval`` are pinged before being handed out, and broken
+    ones are discarded and replaced.
+    """
+
+    def __init__(self, db_url, minconn=DEFAULT_POOL_MIN, maxconn=DEFAULT_POOL_MAX,
+                 timeout=DEFAULT_POOL_TIMEOUT, health_check_interval=DEFAULT_HEALTH_CHECK_INTERVAL):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError(f"Invalid pool size: min={minconn}, max={maxconn}")
+        self.db_url = db_url
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.pid = os.getpid()
+        self._pool = pg_pool.ThreadedConnectionPool(minconn, maxconn, db_url)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._last_used = {}
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "discarded": 0,
+            "in_use": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+        }
+
+    def _is_healthy(self, conn):
+        """Return True if the connection can still talk to the server."""
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn))
+        if last_used is not None and time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        self._last_used.pop(id(conn), None)
+        try:
+            self._pool.putconn(conn, close=True)
+        except pg_pool.PoolError:
+            pass
+        with self._stats_lock:
+            self._stats["discarded"] += 1
+
+    def getconn(self):
+        """
+        Borrow a healthy connection from the pool.
+
+        Returns:
+            connection: A psycopg2 connection that must be given back with putconn().
+
+        Raises:
+            PoolTimeout: If no connection is available within the configured timeout.
+        """
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._stats_lock:
+                self._stats["timeouts"] += 1
+            raise PoolTimeout(f"No database connection available after {self.timeout}s")
+        try:
+            conn = self._pool.getconn()
+            while not self._is_healthy(conn):
+                logger.warning("Discarding stale pooled database connection.")
+                self._discard(conn)
+                conn = self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+        waited_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self._stats["checkouts"] += 1
+            self._stats["in_use"] += 1
+            self._stats["total_wait_ms"] += waited_ms
+            self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], waited_ms)
+        return conn
+
+    def putconn(self, conn):
+        """
+        Return a borrowed connection to the pool, closing it if it is broken.
+
+        Args:
+            conn (connection): The connection obtained from getconn().
+        """
+        try:
+            status = conn.get_transaction_status() if not conn.closed else None
+            if status is None or status == pg_extensions.TRANSACTION_STATUS_UNKNOWN:
+                self._discard(conn)
+                return
+            if status != pg_extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            self._last_used[id(conn)] = time.monotonic()
+            self._pool.putconn(conn)
+        except psycopg2.Error:
+            self._discard(conn)
+        finally:
+            with self._stats_lock:
+                self._stats["in_use"] -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for one unit of work.
+
+        The transaction is committed when the block exits normally and rolled
+        back if it raises, mirroring ``with psycopg2.connect(...) as conn``.
+        """
+        conn = self.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            self.putconn(conn)
+
+    def stats(self):
+        """
+        Snapshot of pool usage and wait-time counters.
+
+        Returns:
+            dict: Pool size, connections in use, checkout count and wait times in ms.
+        """
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+        checkouts = snapshot["checkouts"]
+        snapshot["avg_wait_ms"] = round(snapshot["total_wait_ms"] / checkouts, 3) if checkouts else 0.0
+        snapshot["total_wait_ms"] = round(snapshot["total_wait_ms"], 3)
+        snapshot["max_wait_ms"] = round(snapshot["max_wait_ms"], 3)
+        snapshot["minconn"] = self.minconn
+        snapshot["maxconn"] = self.maxconn
+        return snapshot
+
+    def close(self):
+        """Close every connection held by the pool."""
+        self._pool.closeall()
+        self._last_used.clear()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def init_pool(db_url, minconn=DEFAULT_POOL_MIN, maxconn=DEFAULT_POOL_MAX, timeout=DEFAULT_POOL_TIMEOUT):
+    """
+    Create (or replace) the shared pool for a database URL.
+
+    Args:
+        db_url (str): Database connection URL.
+        minconn (int): Connections opened eagerly and kept around.
+        maxconn (int): Upper bound on concurrently borrowed connections.
+        timeout (float): Seconds to wait for a free connection.
+
+    Returns:
+        DatabasePool: The pool registered for db_url.
+    """
+    with _pools_lock:
+        existing = _pools.get(db_url)
+        if existing is not None and existing.pid == os.getpid():
+            existing.close()
+        _pools[db_url] = DatabasePool(db_url, minconn, maxconn, timeout)
+        logger.info(f"Database connection pool created (min={minconn}, max={maxconn}).")
+        return _pools[db_url]
+
+
+def get_pool(db_url=None):
+    """
+    Get the shared pool for a database URL, creating it with defaults on first use.
+
+    Pools inherited from a parent process (e.g. gunicorn --preload) are
+    rebuilt so workers never share sockets.
+
+    Args:
+        db_url (str): Database connection URL. Defaults to DATABASE_URL.
+
+    Returns:
+        DatabasePool: The pool registered for db_url.
+    """
+    db_url = db_url or os.getenv("DATABASE_URL")
+    if not db_url:
+        raise ValueError("DATABASE_URL environment variable not set.")
+    pool = _pools.get(db_url)
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    with _pools_lock:
+        pool = _pools.get(db_url)
+        if pool is None or pool.pid != os.getpid():
+            pool = DatabasePool(db_url)
+            _pools[db_url] = pool
+        return pool
+
+
+def db_connection(db_url=None):
+    """
+    Context manager that borrows a pooled connection for one unit of work.
+
+    Usage:
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                ...
+    """
+    return get_pool(db_url).connection()
+
+
+def iter_rows(db_url, query, params=None, batch_size=1000):
+    """
+    Stream a query's rows through a named (server-side) cursor.
+
+    Rows are pulled from the server batch_size at a time, so memory stays
+    flat however large the result is. The pooled connection is held until
+    the generator is exhausted or closed.
+
+    Args:
+        db_url (str): Database connection URL.
+        query (str): SELECT to run.
+        params (list|tuple|dict): Query parameters.
+        batch_size (int): Rows fetched per round trip.
+
+    Yields:
+        dict: One row, keyed by column name.
+    """
+    with db_connection(db_url) as conn:
+        with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cur:
+            cur.itersize = batch_size
+            cur.execute(query, params)
+            columns = None
+            for row in cur:
+                if columns is None:
+                    columns = [desc[0] for desc in cur.description]
+                yield dict(zip(columns, row))
+
+
+def fetch_json(db_url, query, params=None):
+    """
+    Run a SELECT and let PostgreSQL serialise the result as a JSON array.
+
+    Rows never become Python objects: the server builds the array with
+    json_agg and the text is handed back as-is, ready to be sent.
+
+    Args:
+        db_url (str): Database connection URL.
+        query (str): SELECT whose rows become the array elements (its ORDER BY is kept).
+        params (list|tuple|dict): Query parameters.
+
+    Returns:
+        str: JSON text, '[]' when there are no rows.
+    """
+    with db_connection(db_url) as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT coalesce(json_agg(q), '[]'::json)::text FROM ({query}) q", params)
+            return cur.fetchone()[0]
+
+
+# Server-side prepared statements per pooled connection (they live as long as the session)
+_prepared = weakref.WeakKeyDictionary()
+
+
+def execute_prepared(cur, query, params=()):
+    """
+    Execute a query through a server-side prepared statement.
+
+    The statement is named after a hash of its text and PREPAREd the first
+    time a connection runs it; later calls on the same connection only send
+    EXECUTE with the parameter values, so Postgres skips parsing and planning.
+
+    Args:
+        cur (cursor): Cursor of a pooled connection.
+        query (str): SQL using $1, $2, ... placeholders.
+        params (list|tuple): Values for the placeholders, in order.
+    """
+    conn = cur.connection
+    name = "stmt_" + hashlib.sha1(query.encode()).hexdigest()[:20]
+    names = _prepared.setdefault(conn, set())
+    if name not in names:
+        cur.execute(f"PREPARE {name} AS {query}")
+        names.add(name)
+    if params:
+        cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", list(params))
+    else:
+        cur.execute(f"EXECUTE {name}")
+
+
+def close_all_pools():
+    """Close every pool owned by this process."""
+    with _pools_lock:
+        for pool in _pools.values():
+            if pool.pid == os.getpid():
+                pool.close()
+        _pools.clear()
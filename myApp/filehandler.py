@@ -1,14 +1,11 @@
 from pypdf import PdfReader
 from os import listdir
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from transformers import AutoTokenizer, AutoModel
-import torch
+from myApp.embeddings import get_embedding_model, DPR_MODEL_NAME, DPR
 import re
 import json
 
-MODEL_NAME = "facebook/dpr-question_encoder-single-nq-base"
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-model = AutoModel.from_pretrained(MODEL_NAME)
+MODEL_NAME = DPR_MODEL_NAME
+model = get_embedding_model(MODEL_NAME, kind=DPR)  # Loaded on first embed_text()
 
 FILES_DIR = "./syllabuses"
 EMBEDDING_CACHE = "./embeddings_cache.json"
@@ -25,11 +22,7 @@ def embed_text(text):
     """
     Generates embeddings for a given text using a Hugging Face DPR model.
     """
-    inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=768, padding=True)
-    with torch.no_grad():
-        outputs = model(**inputs)
-        embeddings = outputs.pooler_output.squeeze().tolist()  # Use pooler_output for embeddings
-    return embeddings
+    return model.encode(text, max_length=768)  # pooler_output of the DPR encoder
 
 def load_cache():
     """
@@ -55,6 +48,7 @@ def process_files():
     Returns:
         List[Dict]: A list of dictionaries containing embedding and chunk for each syllabus file.
     """
+    from langchain.text_splitter import RecursiveCharacterTextSplitter  # Imported on first use, it is slow to load
     files = listdir(FILES_DIR)
     all_syllabi_data = []
     cache = load_cache()
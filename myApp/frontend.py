@@ -14,9 +14,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Import controllers and config
 from myApp.controllers.class_controller import ClassController
-from myApp.controllers.localStatistics_controller import StatisticsController
 from myApp.controllers.globalStatistics_controller import GlobalStatisticsController
-from myApp.controllers.room_controller import RoomController
 from myApp.controllers.auth_controller import AuthController
 from config.environment import get_database_url  # Changed this line
 from myApp.chatbot import Chatbot
@@ -25,9 +23,7 @@ from myApp.models.chatbot_model import ChatbotService
 # Initialize controllers
 db_url = get_database_url()  # Changed this line
 class_controller = ClassController(db_url=db_url)
-local_controller = StatisticsController(db_url=db_url)
 global_controller = GlobalStatisticsController(db_url=db_url)
-room_controller = RoomController(db_url=db_url)
 auth_controller = AuthController()
 
 # Configure requests for Ollama
@@ -390,15 +386,30 @@ def render_home_page():
 def render_local_statistics():
     st.header("Local Statistics 📊")
 
-    rooms = room_controller.get_all_rooms()
-    building_options = pd.DataFrame(rooms)["building"].unique()
+    # Every panel comes from one query, keyed by the inputs of the previous run
+    try:
+        dashboard = global_controller.dashboard(
+            building=st.session_state.get("stats_building"),
+            room_id=st.session_state.get("stats_room_id", "1"),
+            year=st.session_state.get("stats_year", 2024),
+            semester=st.session_state.get("stats_semester", "Fall"),
+        )
+    except Exception as e:
+        st.error(f"Error fetching local statistics: {e}")
+        return
+    building_options = dashboard["buildings"]
 
     # Local Statistics: Room Capacity
     try:
-        building = st.selectbox("Select a Building for Room Statistics:", options=building_options)
+        building = st.selectbox(
+            "Select a Building for Room Statistics:",
+            options=building_options,
+            index=building_options.index(dashboard["building"]) if dashboard["building"] in building_options else 0,
+            key="stats_building",
+        )
         if building:
             st.subheader(f"Top 3 Rooms by Capacity in Building {building}")
-            rooms = local_controller.room_capacity(building)
+            rooms = dashboard["room_capacity"]
             if rooms:
                 room_data = pd.DataFrame(rooms)
                 room_data.columns = ["Room ID", "Room Number", "Capacity"]  # Rename columns for clarity
@@ -419,11 +430,13 @@ def render_local_statistics():
 
     # Local Statistics: Sections by Student-to-Capacity Ratio
     try:
-        st.subheader(f"Top 3 Sections by Student-to-Capacity Ratio in Building {building}")
-        sections_ratio = local_controller.room_ratio(building)
+        st.subheader(f"Top 3 Rooms by Student-to-Capacity Ratio in Building {building}")
+        sections_ratio = dashboard["room_ratio"]
         if sections_ratio:
             ratio_data = pd.DataFrame(sections_ratio)
-            ratio_data.columns = ["Section ID", "Semester", "Ratio (%)", "Room Number"]  # Rename columns for clarity
+            ratio_data.columns = [
+                "Room ID", "Building", "Room Number", "Capacity", "Average Section Capacity", "Ratio (%)"
+            ]  # Rename columns for clarity
             st.table(ratio_data)
 
             # Ensure data is sorted
@@ -431,7 +444,7 @@ def render_local_statistics():
 
             # Plot ratio using Streamlit
             st.bar_chart(
-                data=ratio_data.set_index("Section ID")["Ratio (%)"],
+                data=ratio_data.set_index("Room ID")["Ratio (%)"],
                 use_container_width=True,
             )
     except Exception as e:
@@ -439,10 +452,10 @@ def render_local_statistics():
 
     # Local Statistics: Classes per Room
     try:
-        room_id = st.text_input("Enter Room ID for Top Classes:", value="1")
+        room_id = st.text_input("Enter Room ID for Top Classes:", value="1", key="stats_room_id")
         if room_id:
             st.subheader(f"Top 3 Most Taught Classes in Room {room_id}")
-            room_classes = local_controller.room_classes(room_id)
+            room_classes = dashboard["room_classes"]
             if room_classes:
                 class_data = pd.DataFrame(room_classes)
                 class_data.columns = ["Class ID", "Class Name", "Class Code", "Number of Semesters Taught"]
@@ -458,11 +471,15 @@ def render_local_statistics():
 
     # Local Statistics: Top Classes Per Semester
     try:
-        year = st.number_input("Enter Year for Semester Statistics:", min_value=2000, max_value=2100, value=2024)
-        semester = st.selectbox("Select Semester for Top Classes:", options=["Fall", "Spring", "Summer"])
+        year = st.number_input(
+            "Enter Year for Semester Statistics:", min_value=2000, max_value=2100, value=2024, key="stats_year"
+        )
+        semester = st.selectbox(
+            "Select Semester for Top Classes:", options=["Fall", "Spring", "Summer"], key="stats_semester"
+        )
         if year and semester:
             st.subheader(f"Top 3 Most Taught Classes in {semester} {year}")
-            semester_classes = local_controller.classes_by_semester(year, semester)
+            semester_classes = dashboard["classes_by_semester"]
             if semester_classes:
                 semester_data = pd.DataFrame(semester_classes)
                 semester_data.columns = ["Class ID", "Class Name", "Number of Sections"]
@@ -479,10 +496,17 @@ def render_local_statistics():
 def render_global_statistics():
     st.header("Global Statistics 🌐")
 
+    # Every panel comes from one query
+    try:
+        dashboard = global_controller.dashboard()
+    except Exception as e:
+        st.error(f"Error fetching global statistics: {e}")
+        return
+
     # Global Statistics: Total Sections Per Year
     try:
         st.subheader("Total Sections Per Year")
-        total_sections_data = global_controller.total_sections_per_year()
+        total_sections_data = dashboard["sections_per_year"]
         if total_sections_data:
             # Convert to DataFrame for easier visualization
             total_sections_df = pd.DataFrame(total_sections_data)
@@ -497,7 +521,7 @@ def render_global_statistics():
     # Global Statistics: Top Meetings by Section Count
     try:
         st.subheader("Top 5 Meetings with the Most Sections")
-        top_meetings = global_controller.top_meetings_with_most_sections()
+        top_meetings = dashboard["top_meetings"]
         if top_meetings:
             meetings_df = pd.DataFrame(top_meetings)
             meetings_df.columns = [
@@ -513,7 +537,7 @@ def render_global_statistics():
     # Global Statistics: Top Classes Most Prerequisites
     try:
         st.subheader("Top 3 Classes with the Most Prerequisites")
-        most_prerequisites = global_controller.top_classes_most_prerequisites()
+        most_prerequisites = dashboard["most_prerequisites"]
         if most_prerequisites:
             prerequisites_df = pd.DataFrame(most_prerequisites)
             prerequisites_df.columns = ["Class ID", "Class Name", "Class Code", "Number of Prerequisites"]
@@ -527,7 +551,7 @@ def render_global_statistics():
     # Global Statistics: Top Classes Least Offered
     try:
         st.subheader("Top 3 Classes Offered the Least")
-        least_offered = global_controller.top_classes_least_offered()
+        least_offered = dashboard["least_offered"]
         if least_offered:
             least_offered_df = pd.DataFrame(least_offered)
             least_offered_df.columns = ["Class ID", "Class Name", "Class Code", "Number of Times Offered"]
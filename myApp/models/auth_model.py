@@ -1,8 +1,8 @@
 # myApp/models/auth_model.py
 import os
 from dotenv import load_dotenv
-import psycopg2
 from config.environment import get_database_url
+from myApp.extensions import db_connection
 import bcrypt
 
 # Force production environment
@@ -25,7 +25,7 @@ class AuthModel:
     def execute_query(self, query, params=None):
         """Execute database query with improved error handling."""
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 db_info = conn.info
                 if not hasattr(self, '_db_validated'):
                     print(f"📊 Connected to database: {db_info.dbname} at {db_info.host}")
@@ -1,6 +1,6 @@
 # myApp.models.chatbot_model.py
 import psycopg2
-from psycopg2.extras import Json, execute_values, RealDictCursor
+from psycopg2.extras import RealDictCursor
 import requests
 import os
 from dotenv import load_dotenv
@@ -8,6 +8,7 @@ from typing import Dict, List, Optional
 from datetime import datetime  # Add this import
 from config.local_config import LocalConfig
 from config.heroku_config import DatabaseConfig
+from myApp.extensions import db_connection
 
 load_dotenv()
 
@@ -71,7 +72,7 @@ class ChatbotService:
 
     def get_db_connection(self):
         """Get database connection."""
-        return psycopg2.connect(self.db_url)
+        return db_connection(self.db_url)
 
     def execute_query(self, query, params=None):
         """Execute query with enhanced error handling and logging."""
@@ -306,7 +307,6 @@ class ChatbotService:
     def delete_knowledge(self, entry_id: int) -> bool:
         """Delete a knowledge entry"""
         try:
-            # Use get_db_connection instead of direct psycopg2 connection
             with self.get_db_connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute("DELETE FROM knowledge_base WHERE id = %s", (entry_id,))
@@ -319,7 +319,6 @@ class ChatbotService:
     def update_knowledge(self, entry_id: int, content: str, tags: list = None, priority: str = None) -> bool:
         """Update a knowledge entry"""
         try:
-            # Use get_db_connection instead of direct psycopg2 connection
             with self.get_db_connection() as conn:
                 with conn.cursor() as cursor:
                     # Update multiple fields
@@ -344,7 +343,7 @@ class ChatbotModel:
     def insert_knowledge(self, content, embedding):
         """Insert a new knowledge entry into the database."""
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
                     cur.execute(
                         """
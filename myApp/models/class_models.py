@@ -1,14 +1,53 @@
 # myApp.models.class_models.py
 
 import psycopg2
+from myApp.extensions import db_connection, iter_rows
+from myApp.cache import get_read_cache, filters_key
+from myApp.models.requisite_graph import get_requisite_graph
+from myApp.notify import publish_change
+from myApp.pagination import keyset_query, json_page_query, to_page, STREAM_BATCH_SIZE
+from myApp.bulk import (
+    validate_batch, as_key_rows, require_int, require_str, optional_str,
+    insert_rows, update_rows, delete_rows, raise_if_missing, insert_with_sequence_retry
+)
+
+# Filters accepted by fetch_all_classes
+CLASS_FILTERS = {
+    "term": "lower(term) = lower(%s)",
+    "year": "years = %s",
+    "ccode": "ccode = %s",
+    "cname": "cname = %s",
+}
+
+CLASS_COLUMNS = ("cname", "ccode", "cdesc", "term", "years", "cred", "csyllabus")
+
+
+def class_values(class_data):
+    """Validate one class for a bulk write and return its CLASS_COLUMNS values."""
+    years = class_data.get('years')
+    if isinstance(years, int) and not isinstance(years, bool):
+        years = str(years)  # years is a varchar column; accept 2024 as well as "2024"
+    elif years is not None and not isinstance(years, str):
+        raise ValueError("years must be a string")
+    return (
+        require_str(class_data, 'cname'),
+        require_str(class_data, 'ccode'),
+        optional_str(class_data, 'cdesc'),
+        optional_str(class_data, 'term'),
+        years,
+        require_int(class_data, 'cred', 0),
+        optional_str(class_data, 'csyllabus'),
+    )
 
 class ClassModel:
     def __init__(self, db_url):
         self.db_url = db_url
+        self.cache = get_read_cache(db_url)
+        self.graph = get_requisite_graph(db_url)
 
     def insert_class(self, class_data):
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
                     cur.execute(
                         """
@@ -18,40 +57,79 @@ class ClassModel:
                         (class_data['cname'], class_data['ccode'], class_data['cdesc'],
                          class_data['term'], class_data['years'], class_data['cred'], class_data['csyllabus'])
                     )
-                    return cur.fetchone()[0]
+                    cid = cur.fetchone()[0]
+                    publish_change(cur, "class", [cid])
+            self.cache.invalidate("class", cid)
+            self.graph.set_class(cid, class_data['cname'], class_data['ccode'])
+            return cid
         except psycopg2.Error as e:
             print(f"Error inserting class: {e}")
             return None
 
+    def _load_class(self, class_id):
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT * FROM class WHERE cid = %s", (class_id,))
+                result = cur.fetchone()
+                if result:
+                    columns = [desc[0] for desc in cur.description]
+                    return dict(zip(columns, result))
+                return None
+
     def fetch_class(self, class_id):
         try:
-            with psycopg2.connect(self.db_url) as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT * FROM class WHERE cid = %s", (class_id,))
-                    result = cur.fetchone()
-                    if result:
-                        columns = [desc[0] for desc in cur.description]
-                        return dict(zip(columns, result))
-                    return None
+            return self.cache.get_or_load(("class", "row", class_id), lambda: self._load_class(class_id))
         except psycopg2.Error as e:
             print(f"Error fetching class: {e}")
             return None
 
-    def fetch_all_classes(self):
+    def _load_classes(self, query, params, limit):
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                results = cur.fetchall()
+                columns = [desc[0] for desc in cur.description]
+                rows = [dict(zip(columns, row)) for row in results]
+                return to_page(rows, limit, lambda row: (row['cid'],))
+
+    def fetch_all_classes(self, after=None, limit=None, filters=None):
+        query, params = keyset_query("SELECT * FROM class", ("cid",), CLASS_FILTERS, filters, after, limit)
         try:
-            with psycopg2.connect(self.db_url) as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT * FROM class")
-                    results = cur.fetchall()
-                    columns = [desc[0] for desc in cur.description]
-                    return [dict(zip(columns, row)) for row in results]
+            return self.cache.get_or_load(
+                ("class", "page", after, limit, filters_key(filters)),
+                lambda: self._load_classes(query, params, limit)
+            )
         except psycopg2.Error as e:
             print(f"Error fetching all classes: {e}")
             return []
 
+    def fetch_all_classes_json(self, after=None, limit=None, filters=None):
+        # Same page as fetch_all_classes, but PostgreSQL builds the JSON: (json_text, next_after)
+        query, params = keyset_query("SELECT * FROM class", ("cid",), CLASS_FILTERS, filters, after, limit)
+        query, params = json_page_query(query, params, limit, ("cid",))
+        try:
+            return self.cache.get_or_load(
+                ("class", "json", after, limit, filters_key(filters)),
+                lambda: self._fetch_one(query, params)
+            )
+        except psycopg2.Error as e:
+            print(f"Error fetching all classes: {e}")
+            return "[]", None
+
+    def _fetch_one(self, query, params):
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                return cur.fetchone()
+
+    def stream_all_classes(self, after=None, filters=None, batch_size=STREAM_BATCH_SIZE):
+        # Server-side cursor; rows are read batch_size at a time as the response is sent
+        query, params = keyset_query("SELECT * FROM class", ("cid",), CLASS_FILTERS, filters, after)
+        return iter_rows(self.db_url, query, params, batch_size)
+
     def update_class(self, class_id, class_data):
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
                     cur.execute(
                         """
@@ -61,26 +139,85 @@ class ClassModel:
                         (class_data['cname'], class_data['ccode'], class_data['cdesc'],
                          class_data['term'], class_data['years'], class_data['cred'], class_data['csyllabus'], class_id)
                     )
-                    return cur.rowcount
+                    updated_rows = cur.rowcount
+                    if updated_rows:
+                        publish_change(cur, "class", [class_id])
+            if updated_rows:
+                self.cache.invalidate("class", class_id)
+                self.graph.set_class(class_id, class_data['cname'], class_data['ccode'])
+            return updated_rows
         except psycopg2.Error as e:
             print(f"Error updating class: {e}")
             return 0
 
     def delete_class(self, class_id):
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
                     cur.execute("DELETE FROM class WHERE cid = %s", (class_id,))
                     rows_deleted = cur.rowcount
+                    if rows_deleted:
+                        publish_change(cur, "class", [class_id])
+            if rows_deleted:
+                self.cache.invalidate("class", class_id)
+                self.graph.remove_class(class_id)
             self.reset_class_sequence()
             return rows_deleted
         except psycopg2.Error as e:
             print(f"Error deleting class: {e}")
             return 0
 
+    def bulk_insert_classes(self, classes):
+        values = validate_batch(classes, class_values)
+
+        def write(cur):
+            cids = insert_rows(cur, "class", CLASS_COLUMNS, values, "cid")
+            publish_change(cur, "class", cids)
+            return cids
+
+        cids = insert_with_sequence_retry(self.db_url, "class", "cid", write)
+        self.cache.invalidate("class", *cids)
+        for cid, value in zip(cids, values):
+            self.graph.set_class(cid, value[0], value[1])
+        return cids
+
+    def bulk_update_classes(self, classes):
+        values = validate_batch(classes, lambda class_data: (require_int(class_data, 'cid'),) + class_values(class_data),
+                                key=lambda value: value[0])
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                updated = update_rows(
+                    cur, "class", ("cid",), CLASS_COLUMNS, values,
+                    "(%s::int, %s::varchar, %s::varchar, %s::varchar, %s::varchar, %s::varchar, %s::int, %s::varchar)"
+                )
+                raise_if_missing([value[:1] for value in values], updated, "Class")
+                cids = [value[0] for value in values]
+                publish_change(cur, "class", cids)
+        self.cache.invalidate("class", *cids)
+        for cid, cname, ccode, *_ in values:
+            self.graph.set_class(cid, cname, ccode)
+        return cids
+
+    def bulk_delete_classes(self, class_ids):
+        keys = validate_batch(as_key_rows(class_ids, 'cid'), lambda key: (require_int(key, 'cid'),),
+                              key=lambda value: value)
+        try:
+            with db_connection(self.db_url) as conn:
+                with conn.cursor() as cur:
+                    deleted = delete_rows(cur, "class", ("cid",), keys, "(%s::int)")
+                    raise_if_missing(keys, deleted, "Class")
+                    cids = [key[0] for key in keys]
+                    publish_change(cur, "class", cids)
+        except psycopg2.errors.ForeignKeyViolation:
+            raise ValueError("Some classes still have sections, requisites or syllabus fragments.")
+        self.cache.invalidate("class", *cids)
+        for cid in cids:
+            self.graph.remove_class(cid)
+        return cids
+
     def reset_class_sequence(self):
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
                     # Get the maximum id in the class table
                     cur.execute("SELECT COALESCE(MAX(cid), 1) FROM class")
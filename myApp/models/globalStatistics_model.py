@@ -1,123 +1,364 @@
 import os
-import psycopg2
 from psycopg2.extras import RealDictCursor
+from myApp.extensions import db_connection, fetch_json
+from myApp.models.localStatistics_model import LOCAL_STATISTICS_QUERIES, local_params
+import threading
 import logging
 import datetime
+import json
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Materialized views behind the global statistics. Each keeps the full
+# aggregate with a unique index (required by REFRESH ... CONCURRENTLY) and
+# an index in the order the endpoint reads it, so a statistic is a short
+# index scan instead of a GROUP BY over section/requisite. Times are
+# formatted in SQL so the row and JSON paths return the same "HH:MM:SS".
+# Keyed by view name so a migration can create only the missing ones.
+STATISTICS_VIEW_SQL = {
+    "statistics_meeting_sections": """
+    CREATE MATERIALIZED VIEW statistics_meeting_sections AS
+        SELECT m.mid, m.ccode,
+               to_char(m.starttime, 'HH24:MI:SS') AS starttime,
+               to_char(m.endtime, 'HH24:MI:SS') AS endtime,
+               m.cdays,
+               COUNT(s.*) AS section_count
+        FROM meeting m
+        JOIN section s ON m.mid = s.mid
+        GROUP BY m.mid, m.ccode, m.starttime, m.endtime, m.cdays;
+    CREATE UNIQUE INDEX statistics_meeting_sections_mid ON statistics_meeting_sections (mid);
+    CREATE INDEX statistics_meeting_sections_rank ON statistics_meeting_sections (section_count DESC, mid);
+    """,
+    "statistics_class_prerequisites": """
+    CREATE MATERIALIZED VIEW statistics_class_prerequisites AS
+        SELECT c.cid, c.cname, c.ccode, COUNT(r.*) AS prereq_count
+        FROM class c
+        JOIN requisite r ON c.cid = r.reqid
+        WHERE r.prereq = true
+        GROUP BY c.cid, c.cname, c.ccode;
+    CREATE UNIQUE INDEX statistics_class_prerequisites_cid ON statistics_class_prerequisites (cid);
+    CREATE INDEX statistics_class_prerequisites_rank ON statistics_class_prerequisites (prereq_count DESC, cid);
+    """,
+    "statistics_class_offers": """
+    CREATE MATERIALIZED VIEW statistics_class_offers AS
+        SELECT c.cid, c.cname, c.ccode, COUNT(s.*) AS offer_count
+        FROM class c
+        JOIN section s ON c.cid = s.cid
+        GROUP BY c.cid, c.cname, c.ccode;
+    CREATE UNIQUE INDEX statistics_class_offers_cid ON statistics_class_offers (cid);
+    CREATE INDEX statistics_class_offers_rank ON statistics_class_offers (offer_count, cid);
+    """,
+    "statistics_sections_per_year": """
+    CREATE MATERIALIZED VIEW statistics_sections_per_year AS
+        SELECT years::text AS year, COUNT(*) AS total_sections
+        FROM section
+        GROUP BY years;
+    CREATE UNIQUE INDEX statistics_sections_per_year_year ON statistics_sections_per_year (year);
+    """,
+}
+
+CREATE_STATISTICS_VIEWS_SQL = "".join(STATISTICS_VIEW_SQL.values())
+
+# Which writes make each view stale
+STATISTICS_VIEWS = {
+    "statistics_meeting_sections": ("section", "meeting"),
+    "statistics_class_prerequisites": ("requisite", "class"),
+    "statistics_class_offers": ("section", "class"),
+    "statistics_sections_per_year": ("section",),
+}
+
+# Seconds to wait after a write before refreshing, so a burst of writes costs one refresh
+STATISTICS_REFRESH_DELAY = float(os.getenv("STATISTICS_REFRESH_DELAY", "2"))
+
+# Optional periodic refresh of every view (seconds, 0 = off) for writes made outside the app
+STATISTICS_REFRESH_INTERVAL = float(os.getenv("STATISTICS_REFRESH_INTERVAL", "0"))
+
+# Periodic refresh used when no change listener reports writes (CHANGE_LISTENER=0)
+# and STATISTICS_REFRESH_INTERVAL is unset
+STATISTICS_FALLBACK_INTERVAL = float(os.getenv("STATISTICS_FALLBACK_INTERVAL", "300"))
+
+# Statistics queries, read from the materialized views
+TOP_MEETINGS_BY_SECTIONS_SQL = """
+    SELECT mid, ccode, starttime, endtime, cdays, section_count
+    FROM statistics_meeting_sections
+    ORDER BY section_count DESC, mid
+    LIMIT 5
+"""
+
+TOP_CLASSES_MOST_PREREQUISITES_SQL = """
+    SELECT cid, cname, ccode, prereq_count
+    FROM statistics_class_prerequisites
+    ORDER BY prereq_count DESC, cid
+    LIMIT 3
+"""
+
+TOP_CLASSES_LEAST_OFFERED_SQL = """
+    SELECT cid, cname, ccode, offer_count
+    FROM statistics_class_offers
+    ORDER BY offer_count, cid
+    LIMIT 3
+"""
+
+TOTAL_SECTIONS_PER_YEAR_SQL = """
+    SELECT year, total_sections
+    FROM statistics_sections_per_year
+    ORDER BY year
+"""
+
+STATISTICS_QUERIES = {
+    "top_meetings": TOP_MEETINGS_BY_SECTIONS_SQL,
+    "most_prerequisites": TOP_CLASSES_MOST_PREREQUISITES_SQL,
+    "least_offered": TOP_CLASSES_LEAST_OFFERED_SQL,
+    "sections_per_year": TOTAL_SECTIONS_PER_YEAR_SQL,
+}
+
+# Local parameters for the dashboard; without a building the first one is shown
+DASHBOARD_PARAMS_SQL = """
+    WITH params AS (
+        SELECT coalesce(%(building)s::text, (SELECT min(building) FROM room)) AS building,
+               %(room_id)s::int AS room_id,
+               %(year)s::text AS year,
+               %(semester)s::text AS semester
+    )
+"""
+
+# Every global and local panel as one JSON object, built in a single statement
+DASHBOARD_SQL = DASHBOARD_PARAMS_SQL + """
+    SELECT json_build_object(
+        'building', (SELECT building FROM params),
+        'buildings', (SELECT coalesce(json_agg(building ORDER BY building), '[]'::json)
+                      FROM (SELECT DISTINCT building FROM room WHERE building IS NOT NULL) b),
+        {panels}
+    )::text
+""".format(panels=",\n        ".join(
+    f"'{name}', (SELECT coalesce(json_agg(q), '[]'::json) FROM ({query}) q)"
+    for name, query in {**STATISTICS_QUERIES, **LOCAL_STATISTICS_QUERIES}.items()
+))
+
 def get_db_connection(db_url=None):
     """
-    Establish a connection to the database.
+    Borrow a pooled connection to the database (use as a context manager).
     """
     if not db_url:
         db_url = os.getenv("DATABASE_URL")
     if not db_url:
         logger.error("DATABASE_URL environment variable not set.")
         raise ValueError("DATABASE_URL environment variable not set.")
-    try:
-        conn = psycopg2.connect(db_url, cursor_factory=RealDictCursor)
-        logger.info("Successfully connected to the database.")
-        return conn
-    except Exception as e:
-        logger.error(f"Failed to connect to the database: {e}")
-        raise
+    return db_connection(db_url)
 
 def get_top_meetings_by_sections(db_url=None):
     """Get top 5 meetings with the most sections."""
-    conn = get_db_connection(db_url)
-    cur = conn.cursor()
     try:
-        query = """
-            SELECT m.mid, m.ccode, m.starttime, m.endtime, m.cdays, 
-                   COUNT(s.*) as section_count
-            FROM meeting m
-            JOIN section s ON m.mid = s.mid
-            GROUP BY m.mid, m.ccode, m.starttime, m.endtime, m.cdays
-            ORDER BY section_count DESC
-            LIMIT 5;
-        """
-        cur.execute(query)
-        results = cur.fetchall()
-        return [dict(row) for row in results]
+        with get_db_connection(db_url) as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(TOP_MEETINGS_BY_SECTIONS_SQL)
+                results = cur.fetchall()
+                return [dict(row) for row in results]
     except Exception as e:
         logger.error(f"Error fetching top meetings by sections: {e}")
         raise
-    finally:
-        cur.close()
-        conn.close()
 
 def get_top_classes_most_prerequisites(db_url=None):
     """Get top 3 classes that appear the most as prerequisites."""
-    conn = get_db_connection(db_url)
-    cur = conn.cursor()
     try:
-        query = """
-            SELECT c.cid, c.cname, c.ccode, COUNT(r.*) as prereq_count
-            FROM class c
-            JOIN requisite r ON c.cid = r.reqid
-            WHERE r.prereq = true
-            GROUP BY c.cid, c.cname, c.ccode
-            ORDER BY prereq_count DESC
-            LIMIT 3;
-        """
-        cur.execute(query)
-        results = cur.fetchall()
-        return [dict(row) for row in results]
+        with get_db_connection(db_url) as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(TOP_CLASSES_MOST_PREREQUISITES_SQL)
+                results = cur.fetchall()
+                return [dict(row) for row in results]
     except Exception as e:
         logger.error(f"Error fetching top classes most prerequisites: {e}")
         raise
-    finally:
-        cur.close()
-        conn.close()
 
 def get_top_classes_least_offered(db_url=None):
     """Get top 3 classes that were offered the least."""
-    conn = get_db_connection(db_url)
-    cur = conn.cursor()
     try:
-        #Should this include classes that weren't offered at all? 
-        # Or just classes that were offered, but very little?
-
-        # Added: 
-        # Order by c.cid as well, so that it order by least count and lowest cid
-        query = """
-            SELECT c.cid, c.cname, c.ccode, COUNT(s.*) as offer_count
-            FROM class c
-            LEFT JOIN section s ON c.cid = s.cid
-            GROUP BY c.cid, c.cname, c.ccode
-            HAVING COUNT(s.*) > 0
-            ORDER BY offer_count, c.cid
-            LIMIT 3;
-        """
-        cur.execute(query)
-        results = cur.fetchall()
-        return [dict(row) for row in results]
+        with get_db_connection(db_url) as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                # Only classes offered at least once; ties go to the lowest cid
+                cur.execute(TOP_CLASSES_LEAST_OFFERED_SQL)
+                results = cur.fetchall()
+                return [dict(row) for row in results]
     except Exception as e:
         logger.error(f"Error fetching top classes least offered: {e}")
         raise
-    finally:
-        cur.close()
-        conn.close()
 
 def get_total_sections_per_year(db_url=None):
     """Get total number of sections per year."""
-    conn = get_db_connection(db_url)
-    cur = conn.cursor()
     try:
-        query = """
-            SELECT years::text AS year, COUNT(*) AS total_sections
-            FROM section
-            GROUP BY years
-            ORDER BY year;
-        """
-        cur.execute(query)
-        results = cur.fetchall()
-        return [dict(row) for row in results]  # Use dict() since we're using RealDictCursor
+        with get_db_connection(db_url) as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(TOTAL_SECTIONS_PER_YEAR_SQL)
+                results = cur.fetchall()
+                return [dict(row) for row in results]  # Use dict() since we're using RealDictCursor
     except Exception as e:
         logger.error(f"Error fetching total sections per year: {e}")
         raise
-    finally:
-        cur.close()
-        conn.close()
\ No newline at end of file
+
+def get_statistic_json(name, db_url=None):
+    """
+    Run one of STATISTICS_QUERIES and let PostgreSQL serialise the rows.
+
+    Args:
+        name (str): Key in STATISTICS_QUERIES.
+        db_url (str): Database connection URL. Defaults to DATABASE_URL.
+
+    Returns:
+        str: JSON array text.
+    """
+    if not db_url:
+        db_url = os.getenv("DATABASE_URL")
+    try:
+        return fetch_json(db_url, STATISTICS_QUERIES[name])
+    except Exception as e:
+        logger.error(f"Error fetching {name} statistics: {e}")
+        raise
+
+
+def get_statistics_dashboard(db_url=None, as_json=False, building=None, room_id=None, year=None, semester=None):
+    """
+    Get every global statistic and the local ones for a building, room and term in one round trip.
+
+    Args:
+        db_url (str): Database connection URL. Defaults to DATABASE_URL.
+        as_json (bool): Return the JSON text built by PostgreSQL instead of a dict.
+        building (str): Building of the room capacity and ratio panels; defaults to the first one.
+        room_id (int): Room of the most taught classes panel.
+        year (int|str): Year of the classes per semester panel.
+        semester (str): Semester of the classes per semester panel.
+
+    Returns:
+        dict|str: "building", "buildings", one list per STATISTICS_QUERIES and
+        LOCAL_STATISTICS_QUERIES key (empty when its parameter is missing).
+    """
+    if not db_url:
+        db_url = os.getenv("DATABASE_URL")
+    try:
+        params = local_params(building=building, room_id=room_id, year=year, semester=semester)
+    except ValueError:
+        raise ValueError("room_id must be an integer.")
+    try:
+        with get_db_connection(db_url) as conn:
+            with conn.cursor() as cur:
+                cur.execute(DASHBOARD_SQL, params)
+                body = cur.fetchone()[0]
+                return body if as_json else json.loads(body)
+    except Exception as e:
+        logger.error(f"Error fetching statistics dashboard: {e}")
+        raise
+
+
+def refresh_statistics(db_url=None, views=None, concurrently=True):
+    """
+    Recompute materialized statistics views.
+
+    Args:
+        db_url (str): Database connection URL. Defaults to DATABASE_URL.
+        views (iterable): View names from STATISTICS_VIEWS; None refreshes all.
+        concurrently (bool): Keep the views readable during the refresh.
+            Must be False for views that were never populated.
+    """
+    if not db_url:
+        db_url = os.getenv("DATABASE_URL")
+    mode = "CONCURRENTLY " if concurrently else ""
+    with get_db_connection(db_url) as conn:
+        with conn.cursor() as cur:
+            for view in sorted(views or STATISTICS_VIEWS):
+                if view not in STATISTICS_VIEWS:
+                    raise ValueError(f"Unknown statistics view '{view}'")
+                cur.execute(f"REFRESH MATERIALIZED VIEW {mode}{view};")
+
+
+class StatisticsRefresher:
+    """
+    Refresh the statistics views in the background after writes.
+
+    Writes are reported with mark_stale(entity); the views that depend on
+    that entity are refreshed once STATISTICS_REFRESH_DELAY has passed
+    without further writes. With STATISTICS_REFRESH_INTERVAL set, every
+    view is also refreshed on that schedule.
+    """
+
+    def __init__(self, db_url, delay=STATISTICS_REFRESH_DELAY, interval=STATISTICS_REFRESH_INTERVAL):
+        self.db_url = db_url
+        self.delay = delay
+        self.interval = interval
+        self._stale = set()
+        self._marks = 0
+        self._changed = threading.Condition()
+        self._thread = None
+        self.pid = None
+
+    def start(self):
+        """Start the refresh thread (again, in a forked worker that inherited this object)."""
+        if self._thread is not None and self.pid == os.getpid():
+            return
+        self.pid = os.getpid()
+        self._changed = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="statistics-refresher", daemon=True)
+        self._thread.start()
+
+    def mark_stale(self, entity, ids=None):
+        """
+        Note a write to entity (ChangeListener handler signature).
+
+        Args:
+            entity (str): Table written, or "*" for everything.
+            ids: Ignored; views are refreshed as a whole.
+        """
+        views = [view for view, sources in STATISTICS_VIEWS.items() if entity == "*" or entity in sources]
+        if views:
+            self.start()
+            with self._changed:
+                self._stale.update(views)
+                self._marks += 1
+                self._changed.notify()
+
+    def _run(self):
+        while True:
+            with self._changed:
+                if not self._stale:
+                    self._changed.wait(self.interval or None)
+                    if not self._stale and self.interval:
+                        self._stale.update(STATISTICS_VIEWS)
+                # Let a burst of writes settle
+                while True:
+                    marks = self._marks
+                    self._changed.wait(self.delay)
+                    if self._marks == marks:
+                        break
+                views, self._stale = self._stale, set()
+            if not views:
+                continue
+            try:
+                refresh_statistics(self.db_url, views)
+            except Exception as e:
+                logger.error(f"Error refreshing statistics views {sorted(views)}: {e}")
+
+
+_refreshers = {}
+_refreshers_lock = threading.Lock()
+
+
+def get_statistics_refresher(db_url=None, interval=None):
+    """
+    Get the running statistics refresher for a database URL (one per process).
+
+    Args:
+        db_url (str): Database connection URL. Defaults to DATABASE_URL.
+        interval (float): Periodic refresh in seconds for a new refresher.
+            Defaults to STATISTICS_REFRESH_INTERVAL.
+
+    Returns:
+        StatisticsRefresher: The started refresher.
+    """
+    if not db_url:
+        db_url = os.getenv("DATABASE_URL")
+    with _refreshers_lock:
+        refresher = _refreshers.get(db_url)
+        if refresher is None:
+            refresher = StatisticsRefresher(db_url, interval=STATISTICS_REFRESH_INTERVAL if interval is None else interval)
+            _refreshers[db_url] = refresher
+        refresher.start()
+        return refresher
@@ -1,18 +1,71 @@
 # myApp/models/meeting_model.py
 import psycopg2.extras
 import psycopg2
+from psycopg2.extras import execute_values
+from myApp.extensions import db_connection
+from myApp.cache import get_read_cache, filters_key
+from myApp.notify import publish_change
+from myApp.models.schedule_index import get_schedule_index, day_mask, to_minutes
+from myApp.pagination import keyset_query, json_page_query, to_page
+from myApp.bulk import (
+    BulkValidationError, validate_batch, as_key_rows, require_int, require_str,
+    insert_rows, update_rows, delete_rows, raise_if_missing, insert_with_sequence_retry, BULK_PAGE_SIZE
+)
 from datetime import datetime
 
+# Columns exposed by the API; day_mask and minutes are internal encodings
+MEETING_COLUMNS = "mid, ccode, starttime, endtime, cdays"
+
+# Same columns with the times already formatted, for JSON built by PostgreSQL
+MEETING_JSON_COLUMNS = (
+    "mid, ccode, to_char(starttime, 'HH24:MI:SS') AS starttime, "
+    "to_char(endtime, 'HH24:MI:SS') AS endtime, cdays"
+)
+
+MEETING_WRITE_COLUMNS = ("ccode", "cdays", "starttime", "endtime", "day_mask", "minutes")
+
+
+def meeting_values(meeting_data):
+    """
+    Validate one meeting before it is written (single or bulk).
+
+    Returns:
+        tuple: ccode, cdays, starttime, endtime, day_mask, start minute, end minute.
+    """
+    start_time = require_str(meeting_data, 'starttime')
+    end_time = require_str(meeting_data, 'endtime')
+    try:
+        datetime.strptime(start_time, "%H:%M:%S")
+        datetime.strptime(end_time, "%H:%M:%S")
+    except ValueError:
+        raise ValueError("Invalid time format. Expected HH:MM:SS.")
+    if to_minutes(end_time) <= to_minutes(start_time):
+        raise ValueError("endtime must be after starttime")
+    cdays = require_str(meeting_data, 'cdays')
+    return (
+        require_str(meeting_data, 'ccode'), cdays, start_time, end_time,
+        day_mask(cdays), to_minutes(start_time), to_minutes(end_time),
+    )
+
+# Filters accepted by fetch_all_meetings
+MEETING_FILTERS = {
+    "ccode": "ccode = %s",
+    "cdays": "cdays = %s",
+}
+
 class MeetingModel:
     def __init__(self, db_url):
         self.db_url = db_url
+        self.schedule_index = get_schedule_index(db_url)
+        self.cache = get_read_cache(db_url)
 
     def create_meeting(self, meeting_data):
-        # Remove default date
+        # Same checks as the bulk path: time format, endtime after starttime, known days
+        meeting_values(meeting_data)
         start_time = meeting_data['starttime']
         end_time = meeting_data['endtime']
 
-        with psycopg2.connect(self.db_url) as conn:
+        with db_connection(self.db_url) as conn:
             with conn.cursor() as cur:
                 # Check if a meeting with the same ccode and time range already exists
                 cur.execute(
@@ -31,21 +84,27 @@ class MeetingModel:
                 # If no duplicate is found, proceed with insertion
                 cur.execute(
                     """
-                    INSERT INTO meeting (ccode, cdays, starttime, endtime)
-                    VALUES (%s, %s, %s, %s) RETURNING mid
+                    INSERT INTO meeting (ccode, cdays, starttime, endtime, day_mask, minutes)
+                    VALUES (%s, %s, %s, %s, %s, int4range(%s, %s)) RETURNING mid
                     """,
                     (
                         meeting_data['ccode'],
                         meeting_data['cdays'],
                         start_time,
-                        end_time
+                        end_time,
+                        day_mask(meeting_data['cdays']),
+                        to_minutes(start_time),
+                        to_minutes(end_time)
                     )
                 )
-                return cur.fetchone()[0]
+                mid = cur.fetchone()[0]
+                publish_change(cur, "meeting", [mid])
+        self.cache.invalidate("meeting", mid)
+        return mid
 
     def delete_meeting(self, meeting_id):
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
                     # Delete all related records in section
                     cur.execute("DELETE FROM section WHERE mid = %s;", (meeting_id,))
@@ -57,16 +116,29 @@ class MeetingModel:
                     # Reset the sequence if deletion occurred
                     if rows_deleted:
                         cur.execute("SELECT setval('meeting_mid_seq', COALESCE((SELECT MAX(mid) FROM meeting), 1))")
+                        publish_change(cur, "meeting", [meeting_id])
 
-                    return rows_deleted
+            if rows_deleted:
+                self.schedule_index.remove_meeting(meeting_id)
+                self.cache.invalidate("meeting", meeting_id)
+            return rows_deleted
         except psycopg2.Error as e:
             print(f"Error deleting meeting: {e}")
             return 0
     
-    def fetch_all_meetings(self):
-        with psycopg2.connect(self.db_url) as conn:
+    def fetch_all_meetings(self, after=None, limit=None, filters=None):
+        query, params = keyset_query(
+            f"SELECT {MEETING_COLUMNS} FROM meeting", ("mid",), MEETING_FILTERS, filters, after, limit
+        )
+        return self.cache.get_or_load(
+            ("meeting", "page", after, limit, filters_key(filters)),
+            lambda: self._load_meetings(query, params, limit)
+        )
+
+    def _load_meetings(self, query, params, limit):
+        with db_connection(self.db_url) as conn:
             with conn.cursor() as cur:
-                cur.execute("SELECT * FROM meeting;")
+                cur.execute(query, params)
                 results = cur.fetchall()
                 columns = [desc[0] for desc in cur.description]
                 
@@ -81,12 +153,37 @@ class MeetingModel:
                         row_dict['endtime'] = row_dict['endtime'].strftime("%H:%M:%S")
                     formatted_results.append(row_dict)
                 
-                return formatted_results
+                return to_page(formatted_results, limit, lambda row: (row['mid'],))
+
+    def fetch_all_meetings_json(self, after=None, limit=None, filters=None):
+        """
+        Same page as fetch_all_meetings, serialised to JSON by PostgreSQL.
+
+        Returns:
+            tuple: (JSON array text, next cursor or None)
+        """
+        query, params = keyset_query(
+            f"SELECT {MEETING_JSON_COLUMNS} FROM meeting", ("mid",), MEETING_FILTERS, filters, after, limit
+        )
+        query, params = json_page_query(query, params, limit, ("mid",))
+        return self.cache.get_or_load(
+            ("meeting", "json", after, limit, filters_key(filters)),
+            lambda: self._fetch_one(query, params)
+        )
+
+    def _fetch_one(self, query, params):
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                return cur.fetchone()
 
     def fetch_meeting(self, mid):
-        with psycopg2.connect(self.db_url) as conn:
+        return self.cache.get_or_load(("meeting", "row", mid), lambda: self._load_meeting(mid))
+
+    def _load_meeting(self, mid):
+        with db_connection(self.db_url) as conn:
             with conn.cursor() as cur:
-                cur.execute("SELECT * FROM meeting WHERE mid = %s;", (mid,))
+                cur.execute(f"SELECT {MEETING_COLUMNS} FROM meeting WHERE mid = %s;", (mid,))
                 result = cur.fetchone()
                 if result:
                     columns = [desc[0] for desc in cur.description]
@@ -100,31 +197,133 @@ class MeetingModel:
                 return None
 
     def update_meeting(self, mid, meeting_data):
-        # Remove default date
+        meeting_values(meeting_data)
         start_time = meeting_data['starttime']
         end_time = meeting_data['endtime']
 
-        with psycopg2.connect(self.db_url) as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    UPDATE meeting
-                    SET ccode = %s, cdays = %s, starttime = %s, endtime = %s
-                    WHERE mid = %s
-                    """,
-                    (
-                        meeting_data['ccode'],
-                        meeting_data['cdays'],
-                        start_time,
-                        end_time,
-                        mid
+        try:
+            with db_connection(self.db_url) as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        """
+                        UPDATE meeting
+                        SET ccode = %s, cdays = %s, starttime = %s, endtime = %s,
+                            day_mask = %s, minutes = int4range(%s, %s)
+                        WHERE mid = %s
+                        """,
+                        (
+                            meeting_data['ccode'],
+                            meeting_data['cdays'],
+                            start_time,
+                            end_time,
+                            day_mask(meeting_data['cdays']),
+                            to_minutes(start_time),
+                            to_minutes(end_time),
+                            mid
+                        )
                     )
-                )
-                return cur.rowcount
+                    updated_rows = cur.rowcount
+
+                    # Re-stamp the sections using this meeting; the exclusion
+                    # constraint rejects the change if it double-books a room
+                    cur.execute(
+                        """
+                        UPDATE section s
+                        SET weekly = meeting_weekly(m.day_mask, m.minutes)
+                        FROM meeting m
+                        WHERE m.mid = s.mid AND s.mid = %s
+                        """,
+                        (mid,)
+                    )
+                    if updated_rows:
+                        publish_change(cur, "meeting", [mid])
+        except psycopg2.errors.ExclusionViolation:
+            raise ValueError("Schedule conflict: the new meeting time double-books a room")
+        except psycopg2.DataError as e:
+            raise ValueError(f"Invalid meeting data: {str(e).strip()}")
+
+        if updated_rows:
+            self.schedule_index.update_meeting(mid, meeting_data['cdays'], start_time, end_time)
+            self.cache.invalidate("meeting", mid)
+        return updated_rows
+
+    def bulk_insert_meetings(self, meetings):
+        # A meeting is identified by its days and times, as in create_meeting
+        values = validate_batch(meetings, meeting_values, key=lambda value: value[1:4])
+
+        def write(cur):
+            existing = execute_values(
+                cur,
+                """
+                SELECT v.n FROM (VALUES %s) AS v (n, cdays, starttime, endtime)
+                JOIN meeting m ON m.cdays = v.cdays AND m.starttime = v.starttime AND m.endtime = v.endtime
+                """,
+                [(index,) + value[1:4] for index, value in enumerate(values)],
+                template="(%s, %s::varchar, %s::time, %s::time)", page_size=BULK_PAGE_SIZE, fetch=True
+            )
+            if existing:
+                raise BulkValidationError([
+                    {"index": index, "error": "Meeting with the specified details already exists."}
+                    for (index,) in existing
+                ])
+            mids = insert_rows(cur, "meeting", MEETING_WRITE_COLUMNS, values, "mid",
+                               "(%s, %s, %s::time, %s::time, %s, int4range(%s, %s))")
+            publish_change(cur, "meeting", mids)
+            return mids
+
+        mids = insert_with_sequence_retry(self.db_url, "meeting", "mid", write)
+        self.cache.invalidate("meeting", *mids)
+        return mids
+
+    def bulk_update_meetings(self, meetings):
+        values = validate_batch(meetings, lambda meeting_data: (require_int(meeting_data, 'mid'),) +
+                                meeting_values(meeting_data), key=lambda value: value[0])
+        mids = [value[0] for value in values]
+        try:
+            with db_connection(self.db_url) as conn:
+                with conn.cursor() as cur:
+                    updated = update_rows(
+                        cur, "meeting", ("mid",), MEETING_WRITE_COLUMNS, values,
+                        "(%s::int, %s::varchar, %s::varchar, %s::time, %s::time, %s::smallint, int4range(%s, %s))"
+                    )
+                    raise_if_missing([(mid,) for mid in mids], updated, "Meeting")
+                    cur.execute(
+                        """
+                        UPDATE section s
+                        SET weekly = meeting_weekly(m.day_mask, m.minutes)
+                        FROM meeting m
+                        WHERE m.mid = s.mid AND s.mid = ANY(%s)
+                        """,
+                        (mids,)
+                    )
+                    publish_change(cur, "meeting", mids)
+        except psycopg2.errors.ExclusionViolation:
+            raise ValueError("Schedule conflict: the new meeting times double-book a room")
+
+        for mid, _, cdays, start_time, end_time, *_ in values:
+            self.schedule_index.update_meeting(mid, cdays, start_time, end_time)
+        self.cache.invalidate("meeting", *mids)
+        return mids
+
+    def bulk_delete_meetings(self, meeting_ids):
+        keys = validate_batch(as_key_rows(meeting_ids, 'mid'), lambda key: (require_int(key, 'mid'),),
+                              key=lambda value: value)
+        mids = [key[0] for key in keys]
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                # Sections go with their meeting, as in delete_meeting
+                cur.execute("DELETE FROM section WHERE mid = ANY(%s);", (mids,))
+                deleted = delete_rows(cur, "meeting", ("mid",), keys, "(%s::int)")
+                raise_if_missing(keys, deleted, "Meeting")
+                publish_change(cur, "meeting", mids)
+        for mid in mids:
+            self.schedule_index.remove_meeting(mid)
+        self.cache.invalidate("meeting", *mids)
+        return mids
 
     def reset_meeting_sequence(self):
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
                     # Get the maximum id in the meeting table
                     cur.execute("SELECT COALESCE(MAX(mid), 1) FROM meeting")
@@ -0,0 +1,306 @@
+# myApp/models/planner_model.py
+
+from collections import OrderedDict
+import threading
+import logging
+import time
+import os
+from myApp.extensions import db_connection
+from myApp.models.requisite_graph import get_requisite_graph
+
+logger = logging.getLogger(__name__)
+
+# Credit load per term unless the request says otherwise, and the accepted range
+DEFAULT_MAX_CREDITS = int(os.getenv("PLANNER_MAX_CREDITS", "16"))
+MAX_CREDITS_LIMIT = 30
+MAX_PLAN_TERMS = 12
+
+# Plans remembered per (transcript, terms, credits) until the next relevant write
+PLANNER_MEMO_SIZE = int(os.getenv("PLANNER_MEMO_SIZE", "2048"))
+
+# How long (seconds) loaded data and plans stay without change notifications (0 = forever)
+PLANNER_MAX_AGE_SECONDS = float(os.getenv("PLANNER_MAX_AGE_SECONDS", "300"))
+
+# Section semesters the planner knows and the class.term wording that offers them
+PLANNER_SEMESTERS = {
+    "fall": "first semester",
+    "spring": "second semester",
+    "v1": None,
+    "v2": None,
+}
+
+# Tables a plan is computed from
+PLANNER_ENTITIES = ("class", "requisite", "section")
+
+
+def _bits(bitset):
+    """Indexes of the set bits of an int, lowest first."""
+    while bitset:
+        low = bitset & -bitset
+        yield low.bit_length() - 1
+        bitset ^= low
+
+
+class AcademicPlanner:
+    """
+    Semester-by-semester course plans from prerequisites and offerings.
+
+    Classes are bit indexes; a transcript, each class's prerequisites and
+    corequisites, and the classes offered in a term are int bitsets, so a
+    class is eligible when prerequisites & ~completed == 0, checked only
+    for the classes offered that term.
+
+    A class is offered in a term when a section already exists for it,
+    or when its catalog term ("First Semester" = Fall, "Second Semester" =
+    Spring) and years ("Every Year", "Even Years", "Odd Years") allow it.
+    Classes offered "According to Demand" only count with a section.
+
+    Each term takes eligible classes greedily, most unlocking first (by
+    the size of their transitive unlocks in the requisite graph), then by
+    level and id, within the credit limit. A class with a pending
+    corequisite is only taken together with it. Plans are memoized per
+    request until a class, requisite or section write is reported through
+    apply_change(), or for PLANNER_MAX_AGE_SECONDS.
+    """
+
+    def __init__(self, db_url, memo_size=PLANNER_MEMO_SIZE, max_age=PLANNER_MAX_AGE_SECONDS):
+        self.db_url = db_url
+        self.memo_size = memo_size
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._data = None
+        self._generation = 0
+        self._memo = OrderedDict()
+
+    def _load(self):
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT cid, cname, ccode, cred, term, years FROM class ORDER BY cid")
+                classes = cur.fetchall()
+                cur.execute("SELECT classid, reqid, prereq FROM requisite")
+                requisites = cur.fetchall()
+                cur.execute("SELECT DISTINCT cid, lower(semester), years FROM section WHERE cid IS NOT NULL")
+                sections = cur.fetchall()
+
+        graph = get_requisite_graph(self.db_url)
+        index = {row[0]: position for position, row in enumerate(classes)}
+        data = {
+            "index": index,
+            "classes": classes,
+            "prereqs": [0] * len(classes),
+            "coreqs": [0] * len(classes),
+            "sections": {},       # (semester, year) -> bitset of classes with a section
+            "catalog": {},        # semester -> bitset of classes its catalog term allows
+            "parity": {"even years": 0, "odd years": 0, "every year": 0},
+            "priority": [],
+            "loaded_at": time.monotonic(),
+        }
+        for classid, reqid, prereq in requisites:
+            if classid in index and reqid in index:
+                data["prereqs" if prereq else "coreqs"][index[classid]] |= 1 << index[reqid]
+        for cid, semester, year in sections:
+            if cid in index:
+                key = (semester, str(year))
+                data["sections"][key] = data["sections"].get(key, 0) | (1 << index[cid])
+        for position, (cid, _, _, _, term, years) in enumerate(classes):
+            terms = [part.strip() for part in (term or "").lower().split(",")]
+            for semester, wording in PLANNER_SEMESTERS.items():
+                if wording and wording in terms:
+                    data["catalog"][semester] = data["catalog"].get(semester, 0) | (1 << position)
+            rule = (years or "").strip().lower()
+            if rule in data["parity"]:
+                data["parity"][rule] |= 1 << position
+
+        # A class the requisite graph does not know yet (created after it was built) unlocks nothing, level 0
+        unlocks, levels = {}, {}
+        for cid in index:
+            try:
+                unlocks[cid] = len(graph.unlocks(cid)["unlocks"])
+            except ValueError:
+                unlocks[cid] = 0
+            try:
+                levels[cid] = graph.prerequisite_chain(cid)["level"]
+            except ValueError:
+                levels[cid] = 0
+        data["priority"] = sorted(range(len(classes)), key=lambda position: (
+            -unlocks[classes[position][0]], levels[classes[position][0]], classes[position][0]))
+        return data
+
+    def _current(self):
+        with self._lock:
+            if self._data is not None and self.max_age and time.monotonic() - self._data["loaded_at"] > self.max_age:
+                # Nothing may have reported the writes since (CHANGE_LISTENER=0)
+                self._generation += 1
+                self._data = None
+                self._memo.clear()
+            if self._data is not None:
+                return self._data, self._generation
+            generation = self._generation
+        data = self._load()
+        with self._lock:
+            if self._generation == generation:
+                self._data = data
+        return data, generation
+
+    def apply_change(self, entity, ids=None):
+        """ChangeListener handler: forget plans after class, requisite or section writes."""
+        if entity == "*" or entity in PLANNER_ENTITIES:
+            with self._lock:
+                self._generation += 1
+                self._data = None
+                self._memo.clear()
+
+    def _offered(self, data, semester, year):
+        offered = data["sections"].get((semester, str(year)), 0)
+        catalog = data["catalog"].get(semester, 0)
+        parity = data["parity"]["every year"] | data["parity"]["even years" if int(year) % 2 == 0 else "odd years"]
+        return offered | (catalog & parity)
+
+    def _describe(self, data, position, offered_by_section):
+        cid, cname, ccode, cred, _, _ = data["classes"][position]
+        return {"cid": cid, "cname": cname, "ccode": ccode, "cred": cred or 0,
+                "offered": "section" if offered_by_section else "catalog"}
+
+    def _plan(self, data, completed, terms, max_credits):
+        done = completed
+        plan = []
+        for semester, year in terms:
+            offered = self._offered(data, semester, year)
+            with_section = data["sections"].get((semester, str(year)), 0)
+            eligible = 0
+            for position in _bits(offered & ~done):
+                if not data["prereqs"][position] & ~done:
+                    eligible |= 1 << position
+            taken, credits = 0, 0
+            for position in data["priority"]:
+                bit = 1 << position
+                if not eligible & bit or taken & bit:
+                    continue
+                group = bit
+                pending = data["coreqs"][position] & ~done & ~taken
+                if pending:
+                    # Corequisites come along this term or the class waits
+                    if pending & ~eligible:
+                        continue
+                    group |= pending
+                group_credits = sum(data["classes"][p][3] or 0 for p in _bits(group & ~taken))
+                if credits + group_credits > max_credits:
+                    continue
+                taken |= group
+                credits += group_credits
+            plan.append({
+                "semester": semester,
+                "year": int(year),
+                "classes": [self._describe(data, p, with_section >> p & 1) for p in _bits(taken)],
+                "credits": credits,
+                "also_eligible": [data["classes"][p][0] for p in _bits(eligible & ~taken)],
+            })
+            done |= taken
+        return plan, done
+
+    def plan(self, completed, terms, max_credits=DEFAULT_MAX_CREDITS):
+        """
+        Build a plan for the given terms.
+
+        Args:
+            completed (iterable): Class ids already passed.
+            terms (list): [{"semester": "Fall", "year": 2025}, ...] in the order they are taken.
+            max_credits (int): Credit limit of each term.
+
+        Returns:
+            dict: "terms" (classes, credits and the other eligible class ids of
+            each term) and "remaining" (classes still untaken, with the
+            prerequisites they lack).
+
+        Raises:
+            ValueError: On unknown classes or semesters, or an invalid credit limit.
+        """
+        try:
+            max_credits = int(max_credits)
+        except (TypeError, ValueError):
+            raise ValueError("max_credits must be an integer.")
+        if not 1 <= max_credits <= MAX_CREDITS_LIMIT:
+            raise ValueError(f"max_credits must be between 1 and {MAX_CREDITS_LIMIT}.")
+        if not terms or len(terms) > MAX_PLAN_TERMS:
+            raise ValueError(f"Give between 1 and {MAX_PLAN_TERMS} terms.")
+        normalized = []
+        for term in terms:
+            semester = str((term or {}).get("semester", "")).strip().lower()
+            if semester not in PLANNER_SEMESTERS:
+                raise ValueError(f"Unknown semester '{term.get('semester')}'. Use one of: Fall, Spring, V1, V2.")
+            try:
+                normalized.append((semester, int(term.get("year"))))
+            except (TypeError, ValueError):
+                raise ValueError("Every term needs an integer year.")
+
+        data, generation = self._current()
+        transcript = 0
+        for cid in completed or []:
+            try:
+                transcript |= 1 << data["index"][int(cid)]
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"Class ID {cid} not found")
+
+        key = (transcript, tuple(normalized), max_credits)
+        with self._lock:
+            if generation == self._generation and key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+
+        terms_plan, done = self._plan(data, transcript, normalized, max_credits)
+        remaining = []
+        for position in _bits(((1 << len(data["classes"])) - 1) & ~done):
+            row = self._describe(data, position, False)
+            row.pop("offered")
+            row["missing_prerequisites"] = [data["classes"][p][0] for p in _bits(data["prereqs"][position] & ~done)]
+            remaining.append(row)
+        result = {"terms": terms_plan, "remaining": remaining}
+
+        with self._lock:
+            if generation == self._generation:
+                self._memo[key] = result
+                while len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+        return result
+
+
+def describe_plan(plan):
+    """
+    A plan as short plain-text lines, for chatbot answers.
+
+    Args:
+        plan (dict): Result of AcademicPlanner.plan().
+
+    Returns:
+        str: One line per term, then the classes left without a term.
+    """
+    lines = []
+    for term in plan["terms"]:
+        classes = ", ".join(f"{row['cname']} {row['ccode']}" for row in term["classes"]) or "nothing eligible"
+        lines.append(f"{term['semester'].capitalize()} {term['year']} ({term['credits']} credits): {classes}")
+    if plan["remaining"]:
+        lines.append(f"Still to plan: {len(plan['remaining'])} classes.")
+    return "\n".join(lines)
+
+
+_planners = {}
+_planners_lock = threading.Lock()
+
+
+def get_academic_planner(db_url=None):
+    """
+    Get the process-wide academic planner for a database URL.
+
+    Args:
+        db_url (str): Database connection URL. Defaults to DATABASE_URL.
+
+    Returns:
+        AcademicPlanner: The shared planner (loaded on its first plan).
+    """
+    db_url = db_url or os.getenv("DATABASE_URL")
+    with _planners_lock:
+        planner = _planners.get(db_url)
+        if planner is None:
+            planner = AcademicPlanner(db_url)
+            _planners[db_url] = planner
+        return planner
@@ -0,0 +1,367 @@
+# myApp/models/requisite_graph.py
+
+import threading
+import logging
+import os
+from myApp.extensions import db_connection
+
+logger = logging.getLogger(__name__)
+
+
+def _bits(bitset):
+    """Indexes of the set bits of an int, lowest first."""
+    while bitset:
+        low = bitset & -bitset
+        yield low.bit_length() - 1
+        bitset ^= low
+
+
+class RequisiteGraph:
+    """
+    The requisite table as an in-memory graph with a cached transitive closure.
+
+    An edge reqid -> classid means reqid must be taken before (prereq) or
+    with (corequisite) classid. Chains and unlocks follow prerequisite
+    edges only. Each class has an index; its ancestors (every class it
+    transitively requires) and descendants (every class it transitively
+    unlocks) are Python int bitsets over those indexes, so a chain is one
+    lookup and an insert updates the closure with a few ORs.
+
+    Cycles are tolerated: classes on a cycle are collapsed into one
+    strongly connected component, share their closure and level, and are
+    reported by cycles(). Levels are topological: 0 for classes without
+    prerequisites, otherwise one more than their deepest prerequisite.
+
+    RequisiteModel reports every write through set_requisite /
+    remove_requisite; writes from other processes arrive via
+    apply_change(). Inserts that cannot close a cycle are applied
+    incrementally, anything else recomputes the closure from the edges
+    already in memory.
+    """
+
+    def __init__(self, db_url):
+        self.db_url = db_url
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._classes = {}      # cid -> (cname, ccode)
+        self._requires = {}     # classid -> {reqid: prereq}
+        self._index = {}        # cid -> bit index
+        self._cids = []         # bit index -> cid
+        self._ancestors = {}    # cid -> bitset of transitive prerequisites
+        self._descendants = {}  # cid -> bitset of classes it transitively unlocks
+        self._levels = {}       # cid -> topological level
+        self._cycles = []       # lists of cids that require each other
+
+    def build(self):
+        """(Re)load classes and requisites from the database."""
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT cid, cname, ccode FROM class")
+                classes = cur.fetchall()
+                cur.execute("SELECT classid, reqid, prereq FROM requisite")
+                requisites = cur.fetchall()
+        with self._lock:
+            self._classes = {cid: (cname, ccode) for cid, cname, ccode in classes}
+            self._requires = {}
+            for classid, reqid, prereq in requisites:
+                self._requires.setdefault(classid, {})[reqid] = bool(prereq)
+            self._recompute()
+            self._loaded = True
+
+    def invalidate(self):
+        """Drop everything; the next query rebuilds from the database."""
+        with self._lock:
+            self._loaded = False
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.build()
+
+    def _bit(self, cid):
+        if cid not in self._index:
+            self._index[cid] = len(self._cids)
+            self._cids.append(cid)
+            self._ancestors[cid] = 0
+            self._descendants[cid] = 0
+            self._levels[cid] = 0
+        return 1 << self._index[cid]
+
+    def _prerequisites(self, cid):
+        return [reqid for reqid, prereq in self._requires.get(cid, {}).items() if prereq]
+
+    def _recompute(self):
+        """Closure, levels and cycles from the edges in memory (SCC condensation)."""
+        nodes = set(self._classes) | set(self._requires)
+        for edges in self._requires.values():
+            nodes.update(edges)
+        self._index, self._cids = {}, []
+        self._ancestors, self._descendants, self._levels = {}, {}, {}
+        for cid in sorted(nodes):
+            self._bit(cid)
+
+        # Tarjan's algorithm, iterative; components come out prerequisites first
+        unlocks = {}
+        for classid in nodes:
+            for reqid in self._prerequisites(classid):
+                unlocks.setdefault(reqid, []).append(classid)
+        order, low, on_stack, stack, components = {}, {}, set(), [], []
+        for root in sorted(nodes):
+            if root in order:
+                continue
+            work = [(root, iter(self._prerequisites(root)))]
+            order[root] = low[root] = len(order)
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, children = work[-1]
+                child = next(children, None)
+                if child is not None:
+                    if child not in order:
+                        order[child] = low[child] = len(order)
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self._prerequisites(child))))
+                    elif child in on_stack:
+                        low[node] = min(low[node], order[child])
+                    continue
+                work.pop()
+                if work:
+                    low[work[-1][0]] = min(low[work[-1][0]], low[node])
+                if low[node] == order[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+
+        self._cycles = [component for component in components
+                        if len(component) > 1 or component[0] in self._prerequisites(component[0])]
+
+        # Ancestors and levels in component order (every prerequisite component comes first)
+        for component in components:
+            members = set(component)
+            ancestors, level = 0, 0
+            for member in component:
+                for reqid in self._prerequisites(member):
+                    if reqid not in members:
+                        ancestors |= (1 << self._index[reqid]) | self._ancestors[reqid]
+                        level = max(level, self._levels[reqid] + 1)
+            if component in self._cycles:
+                for member in component:
+                    ancestors |= 1 << self._index[member]
+            for member in component:
+                self._ancestors[member] = ancestors
+                self._levels[member] = level
+        # Descendants in reverse order
+        for component in reversed(components):
+            members = set(component)
+            descendants = 0
+            for member in component:
+                for classid in unlocks.get(member, ()):
+                    if classid not in members:
+                        descendants |= (1 << self._index[classid]) | self._descendants[classid]
+            if component in self._cycles:
+                for member in component:
+                    descendants |= 1 << self._index[member]
+            for member in component:
+                self._descendants[member] = descendants
+
+    def set_requisite(self, classid, reqid, prereq):
+        """Apply an inserted or updated requisite row."""
+        with self._lock:
+            if not self._loaded:
+                return
+            previous = self._requires.get(classid, {}).get(reqid)
+            self._requires.setdefault(classid, {})[reqid] = bool(prereq)
+            if previous is not None and bool(previous) == bool(prereq):
+                return
+            if not prereq and not previous:
+                self._bit(classid)
+                self._bit(reqid)
+                return
+            if not prereq or self._cycles:
+                self._recompute()
+                return
+            requirement_bit, class_bit = self._bit(reqid), self._bit(classid)
+            # reqid already unlocked by classid (or the same class): the edge closes a cycle
+            if reqid == classid or self._descendants[classid] & requirement_bit:
+                self._recompute()
+                return
+            gained = requirement_bit | self._ancestors[reqid]
+            unlocked = class_bit | self._descendants[classid]
+            for index in _bits(unlocked):
+                self._ancestors[self._cids[index]] |= gained
+            for index in _bits(gained):
+                self._descendants[self._cids[index]] |= unlocked
+            # Push the new level down every class that now sits deeper
+            pending = [(classid, self._levels[reqid] + 1)]
+            while pending:
+                cid, level = pending.pop()
+                if level <= self._levels[cid]:
+                    continue
+                self._levels[cid] = level
+                for index in _bits(self._descendants[cid]):
+                    child = self._cids[index]
+                    if self._requires.get(child, {}).get(cid):
+                        pending.append((child, level + 1))
+
+    def remove_requisite(self, classid, reqid):
+        """Apply a deleted requisite row."""
+        with self._lock:
+            if not self._loaded:
+                return
+            prereq = self._requires.get(classid, {}).pop(reqid, None)
+            if prereq:
+                self._recompute()
+
+    def set_class(self, cid, cname, ccode):
+        """Apply an inserted or updated class row."""
+        with self._lock:
+            if self._loaded:
+                self._classes[cid] = (cname, ccode)
+
+    def remove_class(self, cid):
+        """Apply a deleted class row (its requisites are already gone: foreign keys)."""
+        with self._lock:
+            if self._loaded:
+                self._classes.pop(cid, None)
+
+    def apply_change(self, entity, ids):
+        """
+        ChangeListener handler: catch up with a write made by another process.
+
+        Requisite rows named in the notification are re-read and applied;
+        class writes only refresh names. Anything broader drops the graph.
+        """
+        if entity == "*" or (entity in ("requisite", "class") and not ids):
+            self.invalidate()
+            return
+        if entity not in ("requisite", "class") or not self._loaded:
+            return
+        ids = list(ids)
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                if entity == "class":
+                    cur.execute("SELECT cid, cname, ccode FROM class WHERE cid = ANY(%s)", (ids,))
+                    found = {cid: (cname, ccode) for cid, cname, ccode in cur.fetchall()}
+                else:
+                    cur.execute(
+                        """
+                        SELECT r.classid, r.reqid, r.prereq
+                        FROM requisite r
+                        JOIN unnest(%s::int[], %s::int[]) AS k (classid, reqid)
+                          ON k.classid = r.classid AND k.reqid = r.reqid
+                        """,
+                        ([classid for classid, _ in ids], [reqid for _, reqid in ids])
+                    )
+                    found = {(classid, reqid): prereq for classid, reqid, prereq in cur.fetchall()}
+        with self._lock:
+            for key in ids:
+                if entity == "class":
+                    if key in found:
+                        self._classes[key] = found[key]
+                    else:
+                        self._classes.pop(key, None)
+                elif key in found:
+                    self.set_requisite(key[0], key[1], found[key])
+                else:
+                    self.remove_requisite(key[0], key[1])
+
+    def _describe(self, cids):
+        rows = []
+        for cid in cids:
+            cname, ccode = self._classes.get(cid, (None, None))
+            rows.append({"cid": cid, "cname": cname, "ccode": ccode, "level": self._levels.get(cid, 0)})
+        return sorted(rows, key=lambda row: (row["level"], row["cid"]))
+
+    def _require_class(self, cid):
+        if cid not in self._classes:
+            raise ValueError(f"Class ID {cid} not found")
+
+    def prerequisite_chain(self, cid):
+        """
+        Every class that must be passed before cid, in the order they can be taken.
+
+        Returns:
+            dict: cid, level, prerequisites (all of them, by level),
+            direct_prerequisites, corequisites (direct) and in_cycle.
+
+        Raises:
+            ValueError: If the class does not exist.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            self._require_class(cid)
+            ancestors = self._ancestors.get(cid, 0)
+            edges = self._requires.get(cid, {})
+            return {
+                "cid": cid,
+                "level": self._levels.get(cid, 0),
+                "prerequisites": self._describe(self._cids[i] for i in _bits(ancestors) if self._cids[i] != cid),
+                "direct_prerequisites": sorted(reqid for reqid, prereq in edges.items() if prereq),
+                "corequisites": self._describe(reqid for reqid, prereq in edges.items() if not prereq),
+                "in_cycle": any(cid in cycle for cycle in self._cycles),
+            }
+
+    def unlocks(self, cid):
+        """
+        Every class that transitively requires cid.
+
+        Returns:
+            dict: cid, level, unlocks (all of them, by level) and direct_unlocks.
+
+        Raises:
+            ValueError: If the class does not exist.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            self._require_class(cid)
+            descendants = self._descendants.get(cid, 0)
+            return {
+                "cid": cid,
+                "level": self._levels.get(cid, 0),
+                "unlocks": self._describe(self._cids[i] for i in _bits(descendants) if self._cids[i] != cid),
+                "direct_unlocks": sorted(
+                    classid for classid, edges in self._requires.items() if edges.get(cid)
+                ),
+            }
+
+    def summary(self):
+        """Class and edge counts, deepest level and cycles of the graph."""
+        with self._lock:
+            self._ensure_loaded()
+            return {
+                "classes": len(self._classes),
+                "prerequisite_edges": sum(sum(1 for prereq in edges.values() if prereq)
+                                          for edges in self._requires.values()),
+                "corequisite_edges": sum(sum(1 for prereq in edges.values() if not prereq)
+                                         for edges in self._requires.values()),
+                "max_level": max(self._levels.values(), default=0),
+                "cycles": [list(cycle) for cycle in self._cycles],
+            }
+
+
+_graphs = {}
+_graphs_lock = threading.Lock()
+
+
+def get_requisite_graph(db_url=None):
+    """
+    Get the process-wide requisite graph for a database URL.
+
+    Args:
+        db_url (str): Database connection URL. Defaults to DATABASE_URL.
+
+    Returns:
+        RequisiteGraph: The shared graph (built on first query).
+    """
+    db_url = db_url or os.getenv("DATABASE_URL")
+    with _graphs_lock:
+        graph = _graphs.get(db_url)
+        if graph is None:
+            graph = RequisiteGraph(db_url)
+            _graphs[db_url] = graph
+        return graph
@@ -1,14 +1,33 @@
 # # myApp/models/requisite_model.py
 
 import psycopg2
+from psycopg2.extras import execute_values
+from myApp.extensions import db_connection
+from myApp.cache import get_read_cache, filters_key
+from myApp.notify import publish_change
+from myApp.models.requisite_graph import get_requisite_graph
+from myApp.pagination import keyset_query, to_page
+from myApp.bulk import (
+    BulkValidationError, validate_batch, require_int, require_bool,
+    insert_rows, update_rows, delete_rows, raise_if_missing, BULK_PAGE_SIZE
+)
+
+# Filters accepted by fetch_all_requisites
+REQUISITE_FILTERS = {
+    "classid": "classid = %s",
+    "reqid": "reqid = %s",
+    "prereq": "prereq = %s",
+}
 
 class RequisiteModel:
     def __init__(self, db_url):
         self.db_url = db_url
+        self.cache = get_read_cache(db_url)
+        self.graph = get_requisite_graph(db_url)
 
     def insert_requisite(self, requisite_data):
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
                     cur.execute(
                         """
@@ -17,43 +36,63 @@ class RequisiteModel:
                         """,
                         (requisite_data['classid'], requisite_data['reqid'], requisite_data['prereq'])
                     )
-                    return cur.fetchone()[0]
+                    reqid = cur.fetchone()[0]
+                    publish_change(cur, "requisite", [(requisite_data['classid'], reqid)])
+            self.cache.invalidate("requisite", (requisite_data['classid'], reqid))
+            self.graph.set_requisite(requisite_data['classid'], reqid, requisite_data['prereq'])
+            return reqid
         except psycopg2.Error as e:
             print(f"Error inserting requisite: {e}")
             return None
 
+    def _load_requisite(self, classid, reqid):
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT * FROM requisite WHERE classid = %s AND reqid = %s;",
+                    (classid, reqid)
+                )
+                result = cur.fetchone()
+                if result:
+                    columns = [desc[0] for desc in cur.description]
+                    return dict(zip(columns, result))
+                return None
+
     def fetch_requisite(self, classid, reqid):
         try:
-            with psycopg2.connect(self.db_url) as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        "SELECT * FROM requisite WHERE classid = %s AND reqid = %s;",
-                        (classid, reqid)
-                    )
-                    result = cur.fetchone()
-                    if result:
-                        columns = [desc[0] for desc in cur.description]
-                        return dict(zip(columns, result))
-                    return None
+            return self.cache.get_or_load(
+                ("requisite", "row", (classid, reqid)), lambda: self._load_requisite(classid, reqid)
+            )
         except psycopg2.Error as e:
             print(f"Error fetching requisite: {e}")
             return None
 
-    def fetch_all_requisites(self):
+    def fetch_all_requisites(self, after=None, limit=None, filters=None):
+        # Keyset on the (classid, reqid) primary key; cursors look like "12,7"
+        query, params = keyset_query(
+            "SELECT * FROM requisite", ("classid", "reqid"), REQUISITE_FILTERS, filters, after, limit
+        )
         try:
-            with psycopg2.connect(self.db_url) as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT * FROM requisite;")
-                    results = cur.fetchall()
-                    columns = [desc[0] for desc in cur.description]
-                    return [dict(zip(columns, row)) for row in results]
+            return self.cache.get_or_load(
+                ("requisite", "page", after, limit, filters_key(filters)),
+                lambda: self._load_requisites(query, params, limit)
+            )
         except psycopg2.Error as e:
             print(f"Error fetching all requisites: {e}")
             return []
 
+    def _load_requisites(self, query, params, limit):
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                results = cur.fetchall()
+                columns = [desc[0] for desc in cur.description]
+                rows = [dict(zip(columns, row)) for row in results]
+                return to_page(rows, limit, lambda row: (row['classid'], row['reqid']))
+
     def update_requisite(self, classid, reqid, requisite_data):
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
                     cur.execute(
                         """
@@ -62,29 +101,119 @@ class RequisiteModel:
                         """,
                         (requisite_data['prereq'], classid, reqid)
                     )
-                    return cur.rowcount
+                    updated_rows = cur.rowcount
+                    if updated_rows:
+                        publish_change(cur, "requisite", [(classid, reqid)])
+            if updated_rows:
+                self.cache.invalidate("requisite", (classid, reqid))
+                self.graph.set_requisite(classid, reqid, requisite_data['prereq'])
+            return updated_rows
         except psycopg2.Error as e:
             print(f"Error updating requisite: {e}")
             return 0
 
     def delete_requisite(self, classid, reqid):
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
                     cur.execute(
                         "DELETE FROM requisite WHERE classid = %s AND reqid = %s;",
                         (classid, reqid)
                     )
                     rows_deleted = cur.rowcount
+                    if rows_deleted:
+                        publish_change(cur, "requisite", [(classid, reqid)])
+            if rows_deleted:
+                self.cache.invalidate("requisite", (classid, reqid))
+                self.graph.remove_requisite(classid, reqid)
             self.reset_requisite_sequence()
             return rows_deleted
         except psycopg2.Error as e:
             print(f"Error deleting requisite: {e}")
             return 0
 
+    @staticmethod
+    def _requisite_key(requisite_data):
+        # Class ids start at 2 (valid_class_ids check on the table)
+        return (require_int(requisite_data, 'classid', 2), require_int(requisite_data, 'reqid', 2))
+
+    def _check_new_requisites(self, cur, values):
+        """Report rows that already exist or name a class that does not."""
+        rows = execute_values(
+            cur,
+            """
+            SELECT v.n,
+                   EXISTS (SELECT 1 FROM requisite r WHERE r.classid = v.classid AND r.reqid = v.reqid),
+                   EXISTS (SELECT 1 FROM class c WHERE c.cid = v.classid),
+                   EXISTS (SELECT 1 FROM class c WHERE c.cid = v.reqid)
+            FROM (VALUES %s) AS v (n, classid, reqid)
+            """,
+            [(index, classid, reqid) for index, (classid, reqid, _) in enumerate(values)],
+            template="(%s, %s::int, %s::int)", page_size=BULK_PAGE_SIZE, fetch=True
+        )
+        errors = []
+        for index, exists, class_found, requisite_found in rows:
+            classid, reqid, _ = values[index]
+            if exists:
+                errors.append({"index": index, "error": f"Requisite {classid}, {reqid} already exists."})
+            elif not class_found:
+                errors.append({"index": index, "error": f"Class ID {classid} not found"})
+            elif not requisite_found:
+                errors.append({"index": index, "error": f"Class ID {reqid} not found"})
+        if errors:
+            raise BulkValidationError(errors)
+
+    def bulk_insert_requisites(self, requisites):
+        values = validate_batch(requisites, lambda requisite_data: self._requisite_key(requisite_data) +
+                                (require_bool(requisite_data, 'prereq'),), key=lambda value: value[:2])
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                self._check_new_requisites(cur, values)
+                insert_rows(cur, "requisite", ("classid", "reqid", "prereq"), values, "reqid")
+                publish_change(cur, "requisite", [value[:2] for value in values])
+        self.cache.invalidate("requisite", *(value[:2] for value in values))
+        for classid, reqid, prereq in values:
+            self.graph.set_requisite(classid, reqid, prereq)
+        return [{"classid": classid, "reqid": reqid} for classid, reqid, _ in values]
+
+    def bulk_update_requisites(self, requisites):
+        values = validate_batch(requisites, lambda requisite_data: self._requisite_key(requisite_data) +
+                                (require_bool(requisite_data, 'prereq'),), key=lambda value: value[:2])
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                updated = update_rows(cur, "requisite", ("classid", "reqid"), ("prereq",), values,
+                                      "(%s::int, %s::int, %s::boolean)")
+                raise_if_missing([value[:2] for value in values], updated, "Requisite")
+                publish_change(cur, "requisite", [value[:2] for value in values])
+        self.cache.invalidate("requisite", *(value[:2] for value in values))
+        for classid, reqid, prereq in values:
+            self.graph.set_requisite(classid, reqid, prereq)
+        return [{"classid": classid, "reqid": reqid} for classid, reqid, _ in values]
+
+    def bulk_delete_requisites(self, requisites):
+        keys = validate_batch(requisites, self._requisite_key, key=lambda value: value)
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                deleted = delete_rows(cur, "requisite", ("classid", "reqid"), keys, "(%s::int, %s::int)")
+                raise_if_missing(keys, deleted, "Requisite")
+                publish_change(cur, "requisite", keys)
+        self.cache.invalidate("requisite", *keys)
+        for classid, reqid in keys:
+            self.graph.remove_requisite(classid, reqid)
+        return [{"classid": classid, "reqid": reqid} for classid, reqid in keys]
+
+    def prerequisite_chain(self, cid):
+        return self.graph.prerequisite_chain(cid)
+
+    def unlocks(self, cid):
+        return self.graph.unlocks(cid)
+
+    def graph_summary(self):
+        return self.graph.summary()
+
     def reset_requisite_sequence(self):
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
                     # Get the maximum reqid in the requisite table
                     cur.execute("SELECT COALESCE(MAX(reqid), 1) FROM requisite")
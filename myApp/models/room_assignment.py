@@ -0,0 +1,365 @@
+# myApp/models/room_assignment.py
+
+from bisect import bisect_left
+import logging
+import time
+import os
+from myApp.extensions import db_connection
+from myApp.models.schedule_index import span_bits, term_key, parse_days
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+
+# Seconds the repair phase may run, by default and at most
+ASSIGNMENT_TIME_LIMIT = float(os.getenv("ASSIGNMENT_TIME_LIMIT", "5"))
+ASSIGNMENT_MAX_TIME_LIMIT = 60.0
+
+# Spots an unplaced section tries to take over per repair round
+ASSIGNMENT_EJECTION_TRIES = int(os.getenv("ASSIGNMENT_EJECTION_TRIES", "64"))
+
+# Score cost of leaving a section without a room, against one wasted seat
+UNPLACED_PENALTY = 10000
+
+# Meeting patterns the ETL accepts (Transform.validate_meeting_durations /
+# filter_meetings): LWV meetings last 50 minutes; MJ meetings last 75 and
+# fall in the morning (07:30-10:15) or afternoon (12:30-19:45) block.
+MEETING_RULES = {
+    "LWV": {"minutes": 50, "windows": None},
+    "LMV": {"minutes": 50, "windows": None},
+    "MJ": {"minutes": 75, "windows": ((7 * 60 + 30, 10 * 60 + 15), (12 * 60 + 30, 19 * 60 + 45))},
+}
+
+ASSIGNMENT_ROOMS_SQL = "SELECT rid, building, room_number, capacity FROM room WHERE capacity IS NOT NULL"
+
+ASSIGNMENT_MEETINGS_SQL = """
+    SELECT mid, cdays, to_char(starttime, 'HH24:MI'), to_char(endtime, 'HH24:MI'),
+           lower(minutes), upper(minutes)
+    FROM meeting
+    WHERE day_mask IS NOT NULL AND NOT isempty(minutes)
+"""
+
+ASSIGNMENT_SECTIONS_SQL = """
+    SELECT sid, cid, mid, roomid, COALESCE(capacity, 0)
+    FROM section
+    WHERE lower(semester) = %s AND years = %s
+    ORDER BY sid
+"""
+
+
+def _bits(bitset):
+    """Indexes of the set bits of an int, lowest first."""
+    while bitset:
+        low = bitset & -bitset
+        yield low.bit_length() - 1
+        bitset ^= low
+
+
+def valid_meeting(cdays, start, end):
+    """Whether a meeting follows MEETING_RULES (patterns without a rule are accepted)."""
+    rule = MEETING_RULES.get((cdays or "").strip().upper())
+    if rule is None:
+        return True
+    if end - start != rule["minutes"]:
+        return False
+    return rule["windows"] is None or any(low <= start and end <= high for low, high in rule["windows"])
+
+
+def week_bits(cdays, start, end):
+    """Minute-of-week bitset of a meeting (bit d * 1440 + m = minute m of weekday d)."""
+    bits = 0
+    for day in parse_days(cdays):
+        bits |= span_bits(start, end) << (day * MINUTES_PER_DAY)
+    return bits
+
+
+class AssignmentProblem:
+    """
+    Sections of a term to place into rooms, with the rooms and meetings available.
+
+    Fixed sections keep their room and meeting and only block them.
+    Movable sections get a room; those without a meeting also get one of
+    the meetings that follow MEETING_RULES. A placement is feasible when
+    the room holds the section (room.capacity >= section.capacity) and the
+    meeting does not overlap anything else in the room.
+
+    Meetings are numbered and conflicts[i] is the bitset of meetings that
+    overlap meeting i (itself included), computed once from minute-of-week
+    bitsets; a room's free meetings are then candidates & ~blocked.
+    """
+
+    def __init__(self, rooms, meetings, fixed, movable):
+        # rooms: (rid, building, room_number, capacity); meetings: mid -> (cdays, start, end, week)
+        self.rooms = sorted(rooms, key=lambda room: (room[3], room[0]))
+        self.capacities = [room[3] for room in self.rooms]
+        self.meetings = meetings
+        self.mids = sorted(meetings)
+        self.meeting_index = {mid: index for index, mid in enumerate(self.mids)}
+        weeks = [meetings[mid][3] for mid in self.mids]
+        self.conflicts = [
+            sum(1 << other for other, other_week in enumerate(weeks) if week & other_week)
+            for week in weeks
+        ]
+        self.open_meetings = sum(
+            1 << index for index, mid in enumerate(self.mids) if valid_meeting(*meetings[mid][:3]))
+        self.movable = {sid: (cid, mid, capacity) for sid, cid, mid, capacity in movable}
+        self.blocked = [0] * len(self.rooms)            # meetings fixed sections block, per room
+        positions = {room[0]: position for position, room in enumerate(self.rooms)}
+        for room_id, mid in fixed:
+            if room_id in positions and mid in meetings:
+                self.blocked[positions[room_id]] |= self.conflicts[self.meeting_index[mid]]
+
+    def candidates(self, sid):
+        """Bitset of the meetings a movable section may use."""
+        mid = self.movable[sid][1]
+        return 1 << self.meeting_index[mid] if mid is not None else self.open_meetings
+
+
+class AssignmentState:
+    """Current placement of the movable sections: sid -> (room position, mid)."""
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.placement = {}
+        self.blocked = list(problem.blocked)            # meetings no longer free, per room
+        self.members = [dict() for _ in problem.rooms]  # room position -> {sid: meeting index}
+        self.load = {}                                   # meeting index -> sections using it
+        self.class_load = {}                             # (cid, meeting index) -> sections of the class
+
+    def place(self, sid, position, mid):
+        cid = self.problem.movable[sid][0]
+        index = self.problem.meeting_index[mid]
+        self.placement[sid] = (position, mid)
+        self.blocked[position] |= self.problem.conflicts[index]
+        self.members[position][sid] = index
+        self.load[index] = self.load.get(index, 0) + 1
+        self.class_load[(cid, index)] = self.class_load.get((cid, index), 0) + 1
+
+    def remove(self, sid):
+        position, mid = self.placement.pop(sid)
+        cid = self.problem.movable[sid][0]
+        index = self.members[position].pop(sid)
+        blocked = self.problem.blocked[position]
+        for other in self.members[position].values():
+            blocked |= self.problem.conflicts[other]
+        self.blocked[position] = blocked
+        self.load[index] -= 1
+        self.class_load[(cid, index)] -= 1
+        return position, mid
+
+    def best_spot(self, sid):
+        """
+        Smallest room that holds the section with a free meeting, or None.
+
+        Among the free meetings of that room, the one used least by other
+        sections of the same class, then least used overall, is taken.
+        """
+        problem = self.problem
+        cid, _, capacity = problem.movable[sid]
+        candidates = problem.candidates(sid)
+        for position in range(bisect_left(problem.capacities, capacity), len(problem.rooms)):
+            free = candidates & ~self.blocked[position]
+            if free:
+                index = min(_bits(free), key=lambda index: (
+                    self.class_load.get((cid, index), 0), self.load.get(index, 0), index))
+                return position, problem.mids[index]
+        return None
+
+    def blockers(self, position, mid):
+        """Movable sections in a room that overlap a meeting, or None if fixed sections do."""
+        conflicts = self.problem.conflicts[self.problem.meeting_index[mid]]
+        if self.problem.blocked[position] & conflicts:
+            return None
+        return [sid for sid, index in self.members[position].items() if conflicts >> index & 1]
+
+
+def solve_assignment(problem, time_limit=ASSIGNMENT_TIME_LIMIT):
+    """
+    Place the movable sections of an AssignmentProblem.
+
+    Greedy pass: sections that fit the fewest rooms go first (largest
+    capacity, then those with a set meeting), each into the smallest room
+    that holds it with a free meeting. Repair pass, until time_limit: an
+    unplaced section takes a spot held by a single movable section when
+    that section can move elsewhere (one ejection chain step), trying at
+    most ASSIGNMENT_EJECTION_TRIES spots per section and round. A final pass
+    moves sections into smaller rooms that have become free.
+
+    Returns:
+        AssignmentState: The placement found.
+    """
+    started = time.monotonic()
+    state = AssignmentState(problem)
+    order = sorted(problem.movable, key=lambda sid: (
+        -problem.movable[sid][2], problem.movable[sid][1] is None, sid))
+    unplaced = []
+    for sid in order:
+        spot = state.best_spot(sid)
+        if spot is None:
+            unplaced.append(sid)
+        else:
+            state.place(sid, *spot)
+
+    improved = True
+    while unplaced and improved and time.monotonic() - started < time_limit:
+        improved = False
+        for sid in list(unplaced):
+            if time.monotonic() - started >= time_limit:
+                break
+            capacity = problem.movable[sid][2]
+            moved, tries = False, 0
+            for position in range(bisect_left(problem.capacities, capacity), len(problem.rooms)):
+                for mid in (problem.mids[index] for index in _bits(problem.candidates(sid))):
+                    blockers = state.blockers(position, mid)
+                    if blockers is None or len(blockers) != 1:
+                        continue
+                    tries += 1
+                    if tries > ASSIGNMENT_EJECTION_TRIES:
+                        break
+                    other = blockers[0]
+                    previous = state.remove(other)
+                    state.place(sid, position, mid)
+                    spot = state.best_spot(other)
+                    if spot is not None:
+                        state.place(other, *spot)
+                        moved = True
+                        break
+                    state.remove(sid)
+                    state.place(other, *previous)
+                if moved or tries > ASSIGNMENT_EJECTION_TRIES:
+                    break
+            if moved:
+                unplaced.remove(sid)
+                improved = True
+
+    # Tighten: move sections into smaller rooms freed by the repairs
+    for sid in sorted(state.placement, key=lambda sid: -problem.movable[sid][2]):
+        if time.monotonic() - started >= time_limit:
+            break
+        position, mid = state.placement[sid]
+        state.remove(sid)
+        spot = state.best_spot(sid)
+        if spot is not None and spot[0] < position:
+            state.place(sid, *spot)
+        else:
+            state.place(sid, position, mid)
+    return state
+
+
+def score_assignment(problem, state):
+    """Placed/unplaced counts, wasted seats, average fill and the total score (lower is better)."""
+    wasted, fill = 0, []
+    for sid, (position, _) in state.placement.items():
+        capacity = problem.movable[sid][2]
+        room_capacity = problem.rooms[position][3]
+        wasted += room_capacity - capacity
+        if room_capacity:
+            fill.append(capacity / room_capacity)
+    unplaced = len(problem.movable) - len(state.placement)
+    return {
+        "placed": len(state.placement),
+        "unplaced": unplaced,
+        "wasted_seats": wasted,
+        "average_fill": round(sum(fill) * 100 / len(fill), 2) if fill else 0.0,
+        "score": unplaced * UNPLACED_PENALTY + wasted,
+    }
+
+
+def assign_rooms(db_url, semester, year, reassign=False, time_limit=ASSIGNMENT_TIME_LIMIT):
+    """
+    Propose a room (and meeting, when missing) for the unplaced sections of a term.
+
+    Nothing is written; the assignments can be applied with PUT /section/bulk.
+
+    Args:
+        db_url (str): Database connection URL.
+        semester (str): Semester as stored in section.semester (any case).
+        year (int|str): Year as stored in section.years.
+        reassign (bool): Re-solve the rooms of every section of the term
+            (meetings that are set are kept) instead of only unplaced ones.
+        time_limit (float): Seconds the solver may run.
+
+    Returns:
+        dict: semester, year, "assignments" (one per placed section, with
+        its room and meeting and whether they changed), "unplaced" (sid and
+        reason), "score" and seconds.
+
+    Raises:
+        ValueError: If time_limit is not a number in range.
+    """
+    try:
+        time_limit = float(time_limit)
+    except (TypeError, ValueError):
+        raise ValueError("time_limit must be a number.")
+    if not 0 < time_limit <= ASSIGNMENT_MAX_TIME_LIMIT:
+        raise ValueError(f"time_limit must be between 0 and {ASSIGNMENT_MAX_TIME_LIMIT:g} seconds.")
+
+    started = time.perf_counter()
+    key = term_key(semester, year)
+    with db_connection(db_url) as conn:
+        with conn.cursor() as cur:
+            cur.execute(ASSIGNMENT_ROOMS_SQL)
+            rooms = cur.fetchall()
+            cur.execute(ASSIGNMENT_MEETINGS_SQL)
+            meeting_rows = cur.fetchall()
+            cur.execute(ASSIGNMENT_SECTIONS_SQL, key)
+            sections = cur.fetchall()
+
+    meetings, times = {}, {}
+    for mid, cdays, starttime, endtime, start, end in meeting_rows:
+        meetings[mid] = (cdays, start, end, week_bits(cdays, start, end))
+        times[mid] = (cdays, starttime, endtime)
+    room_ids = {room[0] for room in rooms}
+    fixed, movable, current = [], [], {}
+    for sid, cid, mid, room_id, capacity in sections:
+        current[sid] = (room_id, mid)
+        if mid is not None and mid not in meetings:
+            mid = None
+        if not reassign and room_id in room_ids and mid is not None:
+            fixed.append((room_id, mid))
+        else:
+            movable.append((sid, cid, mid, capacity))
+
+    problem = AssignmentProblem(rooms, meetings, fixed, movable)
+    state = solve_assignment(problem, time_limit)
+
+    assignments = []
+    for sid in sorted(state.placement):
+        position, mid = state.placement[sid]
+        rid, building, room_number, room_capacity = problem.rooms[position]
+        cdays, starttime, endtime = times[mid]
+        assignments.append({
+            "section_id": sid,
+            "class_id": problem.movable[sid][0],
+            "capacity": problem.movable[sid][2],
+            "room_id": rid,
+            "building": building,
+            "room_number": room_number,
+            "room_capacity": room_capacity,
+            "master_id": mid,
+            "cdays": cdays,
+            "starttime": starttime,
+            "endtime": endtime,
+            "changed": current[sid] != (rid, mid),
+        })
+    largest = problem.capacities[-1] if problem.capacities else 0
+    unplaced = []
+    for sid in sorted(set(problem.movable) - set(state.placement)):
+        capacity = problem.movable[sid][2]
+        if capacity > largest:
+            reason = "No room is large enough"
+        elif not problem.candidates(sid):
+            reason = "No valid meeting available"
+        else:
+            reason = "Every room that fits is booked at the available meetings"
+        unplaced.append({"section_id": sid, "capacity": capacity, "reason": reason})
+
+    return {
+        "semester": key[0],
+        "year": key[1],
+        "reassign": bool(reassign),
+        "assignments": assignments,
+        "unplaced": unplaced,
+        "score": score_assignment(problem, state),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
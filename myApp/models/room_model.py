@@ -1,50 +1,158 @@
 # myApp/models/room_model.py
 
 import psycopg2
+from myApp.extensions import db_connection
+from myApp.cache import get_read_cache, filters_key
+from myApp.notify import publish_change
+from myApp.models.schedule_index import get_schedule_index
+from myApp.pagination import keyset_query, to_page
+from myApp.bulk import (
+    validate_batch, as_key_rows, require_int, require_str, insert_rows, update_rows, delete_rows, raise_if_missing,
+    insert_with_sequence_retry
+)
+
+# Filters accepted by fetch_all_rooms
+ROOM_FILTERS = {
+    "building": "building = %s",
+    "room_number": "room_number = %s",
+    "min_capacity": "capacity >= %s",
+}
 
 class RoomModel:
 
     def __init__(self, db_url):
         self.db_url = db_url
-        self.conn = psycopg2.connect(self.db_url)
-    
+        self.schedule_index = get_schedule_index(db_url)
+        self.cache = get_read_cache(db_url)
+
+
+    def _read(self, query, params=None, fetch="all"):
+        """
+        Run a read-only query on its own pooled connection.
+
+        A connection dropped by the server is discarded by the pool, so the
+        query is retried once on a fresh one.
+        """
+        for attempt in range(2):
+            try:
+                with db_connection(self.db_url) as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute(query, params)
+                        return cursor.fetchall() if fetch == "all" else cursor.fetchone()
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                if attempt:
+                    raise
+
 
     def insert_room(self, room_building, room_number, room_capacity):
-        cursor = self.conn.cursor()
-        query = "insert into room(building, room_number, capacity) values (%s, %s, %s) returning rid"
-        cursor.execute(query, (room_building, room_number, room_capacity))
-        rid = cursor.fetchone()[0]
-        self.conn.commit()
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cursor:
+                query = "insert into room(building, room_number, capacity) values (%s, %s, %s) returning rid"
+                cursor.execute(query, (room_building, room_number, room_capacity))
+                rid = cursor.fetchone()[0]
+                publish_change(cursor, "room", [rid])
+        self.schedule_index.update_room(rid, room_building, room_number, room_capacity)
+        self.cache.invalidate("room", rid)
         return rid
-    
 
-    def fetch_all_rooms(self):
-        cursor = self.conn.cursor()
-        query = "select * from room"
-        cursor.execute(query)
-        retrieved_rooms = cursor.fetchall()
-        return retrieved_rooms
+
+    def fetch_all_rooms(self, after=None, limit=None, filters=None):
+        query, params = keyset_query(
+            "select rid, building, room_number, capacity from room", ("rid",), ROOM_FILTERS, filters, after, limit
+        )
+        return self.cache.get_or_load(
+            ("room", "page", after, limit, filters_key(filters)),
+            lambda: to_page(self._read(query, params), limit, lambda room: (room[0],))
+        )
 
 
     def fetch_room(self, room_id):
-        cursor = self.conn.cursor()
         query = "select rid, building, room_number, capacity from room where rid = %s"
-        cursor.execute(query, (room_id,))
-        found_room = cursor.fetchone()
+        found_room = self.cache.get_or_load(("room", "row", room_id), lambda: self._read(query, (room_id,), fetch="one"))
         return found_room
-    
+
 
     def update_room(self, room_id, room_building, room_number, room_capacity):
-        cursor = self.conn.cursor()
-        query = "update room set building=%s, room_number=%s, capacity=%s where rid=%s"
-        cursor.execute(query, (room_building, room_number, room_capacity, room_id))
-        self.conn.commit()
-        return (cursor.rowcount == 1)
-    
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cursor:
+                query = "update room set building=%s, room_number=%s, capacity=%s where rid=%s"
+                cursor.execute(query, (room_building, room_number, room_capacity, room_id))
+                updated = (cursor.rowcount == 1)
+                if updated:
+                    publish_change(cursor, "room", [room_id])
+        if updated:
+            self.schedule_index.update_room(room_id, room_building, room_number, room_capacity)
+            self.cache.invalidate("room", room_id)
+        return updated
+
 
     def delete_room(self, room_id):
-        cursor = self.conn.cursor()
-        query = "delete from room where rid = %s"
-        cursor.execute (query, (room_id,))
-        self.conn.commit()
-        return (cursor.rowcount == 1)
\ No newline at end of file
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cursor:
+                query = "delete from room where rid = %s"
+                cursor.execute(query, (room_id,))
+                deleted = (cursor.rowcount == 1)
+                if deleted:
+                    publish_change(cursor, "room", [room_id])
+        if deleted:
+            self.schedule_index.remove_room(room_id)
+            self.cache.invalidate("room", room_id)
+        return deleted
+
+
+    @staticmethod
+    def _room_values(room):
+        return (require_str(room, "building"), require_str(room, "room_number"), require_int(room, "capacity", 0))
+
+
+    def bulk_insert_rooms(self, rooms):
+        values = validate_batch(rooms, self._room_values)
+
+        def write(cursor):
+            rids = insert_rows(cursor, "room", ("building", "room_number", "capacity"), values, "rid")
+            publish_change(cursor, "room", rids)
+            return rids
+
+        rids = insert_with_sequence_retry(self.db_url, "room", "rid", write)
+        for rid, (building, room_number, capacity) in zip(rids, values):
+            self.schedule_index.update_room(rid, building, room_number, capacity)
+        self.cache.invalidate("room", *rids)
+        return rids
+
+
+    def bulk_update_rooms(self, rooms):
+        values = validate_batch(rooms, lambda room: (require_int(room, "rid"),) + self._room_values(room),
+                                key=lambda value: value[0])
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cursor:
+                updated = update_rows(cursor, "room", ("rid",), ("building", "room_number", "capacity"), values,
+                                      "(%s::int, %s::varchar, %s::varchar, %s::int)")
+                raise_if_missing([value[:1] for value in values], updated, "Room")
+                rids = [value[0] for value in values]
+                publish_change(cursor, "room", rids)
+        for rid, building, room_number, capacity in values:
+            self.schedule_index.update_room(rid, building, room_number, capacity)
+        self.cache.invalidate("room", *rids)
+        return rids
+
+
+    def bulk_delete_rooms(self, room_ids):
+        keys = validate_batch(as_key_rows(room_ids, "rid"), lambda key: (require_int(key, "rid"),), key=lambda value: value)
+        try:
+            with db_connection(self.db_url) as conn:
+                with conn.cursor() as cursor:
+                    deleted = delete_rows(cursor, "room", ("rid",), keys, "(%s::int)")
+                    raise_if_missing(keys, deleted, "Room")
+                    rids = [key[0] for key in keys]
+                    publish_change(cursor, "room", rids)
+        except psycopg2.errors.ForeignKeyViolation:
+            raise ValueError("Some rooms still have sections; delete or move those sections first.")
+        for rid in rids:
+            self.schedule_index.remove_room(rid)
+        self.cache.invalidate("room", *rids)
+        return rids
+
+
+    def find_free_rooms(self, cdays, starttime, endtime, semester, year, min_capacity=0):
+        free_rooms = self.schedule_index.free_rooms(cdays, starttime, endtime, semester, year, min_capacity)
+        return free_rooms
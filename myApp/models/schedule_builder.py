@@ -0,0 +1,400 @@
+# myApp/models/schedule_builder.py
+
+from collections import OrderedDict
+from heapq import heappush, heappushpop
+import threading
+import logging
+import time
+import os
+from myApp.extensions import db_connection
+from myApp.models.schedule_index import span_bits, term_key
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+
+# How schedules can be ranked: fewest idle minutes between classes, or earliest last class
+SCHEDULE_RANKINGS = ("gaps", "end")
+
+# Request limits: courses per request, schedules returned, and search nodes before giving up
+SCHEDULE_MAX_COURSES = int(os.getenv("SCHEDULE_MAX_COURSES", "10"))
+SCHEDULE_DEFAULT_LIMIT = 10
+SCHEDULE_MAX_LIMIT = 100
+SCHEDULE_MAX_NODES = int(os.getenv("SCHEDULE_MAX_NODES", "50000"))
+
+# Terms and answers kept in memory until a section, meeting or class write
+SCHEDULE_MAX_TERMS = int(os.getenv("SCHEDULE_MAX_TERMS", "16"))
+SCHEDULE_MEMO_SIZE = int(os.getenv("SCHEDULE_MEMO_SIZE", "1024"))
+
+# How long (seconds) they stay without change notifications (0 = forever)
+SCHEDULE_MAX_AGE_SECONDS = float(os.getenv("SCHEDULE_MAX_AGE_SECONDS", "300"))
+
+# Tables schedules are computed from
+SCHEDULE_ENTITIES = ("section", "meeting", "class")
+
+# Every section of a term with its class and meeting
+SCHEDULE_SECTIONS_SQL = """
+    SELECT s.sid, s.cid, c.cname, c.ccode, m.mid, m.cdays,
+           to_char(m.starttime, 'HH24:MI'), to_char(m.endtime, 'HH24:MI'),
+           m.day_mask, lower(m.minutes), upper(m.minutes)
+    FROM section s
+    JOIN class c ON c.cid = s.cid
+    LEFT JOIN meeting m ON m.mid = s.mid
+    WHERE lower(s.semester) = %s AND s.years = %s
+    ORDER BY s.cid, s.sid
+"""
+
+
+def course_key(code):
+    """Normalize a course code ('CIIC 3015', 'ciic-3015') for lookups."""
+    return "".join(ch for ch in str(code).upper() if ch.isalnum())
+
+
+def _clock(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class MeetingOption:
+    """
+    One way of taking a course: a meeting pattern and the sections that use it.
+
+    week is a bitset with one bit per minute of the week (bit d * 1440 + m
+    is minute m of weekday d), so two options overlap exactly when
+    a.week & b.week is non-zero. Sections of a course that meet at the
+    same days and times are one option.
+    """
+
+    __slots__ = ("cid", "course", "mids", "sids", "cdays", "starttime", "endtime",
+                 "week", "days", "end", "minutes")
+
+    def __init__(self, cid, course, cdays, starttime, endtime, mask, start, end):
+        self.cid = cid
+        self.course = course
+        self.mids = []
+        self.sids = []
+        self.cdays = cdays
+        self.starttime = starttime
+        self.endtime = endtime
+        self.week = 0
+        self.days = {}      # weekday -> (start, end)
+        if mask and start is not None and end is not None and end > start:
+            for day in range(7):
+                if mask >> day & 1:
+                    self.week |= span_bits(start, end) << (day * MINUTES_PER_DAY)
+                    self.days[day] = (start, end)
+        self.end = end if self.days else 0
+        self.minutes = end - start if self.days else 0
+
+    def describe(self):
+        return {
+            "cid": self.cid,
+            "course": self.course,
+            "cdays": self.cdays,
+            "starttime": self.starttime,
+            "endtime": self.endtime,
+            "mids": sorted(self.mids),
+            "sids": sorted(self.sids),
+        }
+
+
+def build_options(rows):
+    """
+    Group section rows of a term into MeetingOptions per class.
+
+    Args:
+        rows (list): (sid, cid, cname, ccode, mid, cdays, starttime, endtime,
+            day_mask, start minute, end minute) as SCHEDULE_SECTIONS_SQL returns.
+
+    Returns:
+        dict: cid -> list of MeetingOption.
+    """
+    options = {}
+    for sid, cid, cname, ccode, mid, cdays, starttime, endtime, mask, start, end in rows:
+        pattern = (cid, mask, start, end)
+        by_pattern = options.setdefault(cid, OrderedDict())
+        option = by_pattern.get(pattern)
+        if option is None:
+            option = MeetingOption(cid, f"{cname} {ccode}", cdays, starttime, endtime, mask, start, end)
+            by_pattern[pattern] = option
+        if mid is not None and mid not in option.mids:
+            option.mids.append(mid)
+        option.sids.append(sid)
+    return {cid: list(by_pattern.values()) for cid, by_pattern in options.items()}
+
+
+def _day_state(days, option):
+    """Per-day (first start, last end, busy minutes) after adding option."""
+    days = dict(days)
+    for day, (start, end) in option.days.items():
+        first, last, busy = days.get(day, (start, end, 0))
+        days[day] = (min(first, start), max(last, end), busy + end - start)
+    return days
+
+
+def _gaps(days):
+    return sum(last - first - busy for first, last, busy in days.values())
+
+
+def _latest_end(days):
+    return max((last for _, last, _ in days.values()), default=0)
+
+
+def search_schedules(course_options, rank="gaps", limit=SCHEDULE_DEFAULT_LIMIT, max_nodes=SCHEDULE_MAX_NODES):
+    """
+    Best non-overlapping choices of one option per course, by branch and bound.
+
+    The search picks the course with the fewest options still compatible
+    with what is already chosen, and drops from every remaining course the
+    options that overlap the choice, so a dead end is seen as soon as some
+    course has nothing left. A branch is cut when a lower bound of its
+    ranking is already worse than the worst of the `limit` schedules kept:
+    for "end" the latest end so far, or the earliest end some remaining
+    course can still have; for "gaps" each day's current idle time minus
+    the most minutes the remaining courses could still fill on that day.
+
+    Args:
+        course_options (list): One list of MeetingOption per course.
+        rank (str): "gaps" or "end".
+        limit (int): Schedules to return.
+        max_nodes (int): Search nodes to explore before stopping.
+
+    Returns:
+        tuple: (schedules best first as (gaps, latest end, options), nodes
+        explored, whether the search finished within max_nodes).
+    """
+    best = []           # heap of (-primary, -secondary, -sequence, options); worst on top
+    state = {"nodes": 0, "sequence": 0, "complete": True}
+
+    def score(days):
+        gaps, end = _gaps(days), _latest_end(days)
+        return (gaps, end) if rank == "gaps" else (end, gaps)
+
+    def bound(days, remaining):
+        if rank == "end":
+            reachable = max((min(option.end for option in options) for options in remaining), default=0)
+            return max(_latest_end(days), reachable)
+        fill = {}
+        for options in remaining:
+            most = {}
+            for option in options:
+                for day in option.days:
+                    most[day] = max(most.get(day, 0), option.minutes)
+            for day, minutes in most.items():
+                fill[day] = fill.get(day, 0) + minutes
+        return sum(max(0, last - first - busy - fill.get(day, 0)) for day, (first, last, busy) in days.items())
+
+    def visit(days, chosen, remaining):
+        if state["nodes"] >= max_nodes:
+            state["complete"] = False
+            return
+        state["nodes"] += 1
+        if not remaining:
+            primary, secondary = score(days)
+            state["sequence"] += 1
+            entry = (-primary, -secondary, -state["sequence"], list(chosen))
+            if len(best) < limit:
+                heappush(best, entry)
+            else:
+                heappushpop(best, entry)
+            return
+        if len(best) >= limit and bound(days, remaining) > -best[0][0]:
+            return
+        position = min(range(len(remaining)), key=lambda i: len(remaining[i]))
+        others = remaining[:position] + remaining[position + 1:]
+        candidates = remaining[position]
+        ordered = sorted(candidates, key=lambda option: score(_day_state(days, option)))
+        for option in ordered:
+            narrowed = []
+            for options in others:
+                compatible = [other for other in options if not other.week & option.week]
+                if not compatible:
+                    break
+                narrowed.append(compatible)
+            else:
+                chosen.append(option)
+                visit(_day_state(days, option), chosen, narrowed)
+                chosen.pop()
+            if not state["complete"]:
+                return
+
+    if course_options and all(course_options) and limit > 0:
+        visit({}, [], [list(options) for options in course_options])
+    ranked = sorted(best, reverse=True)
+    schedules = []
+    for primary, secondary, _, options in ranked:
+        gaps, end = (-primary, -secondary) if rank == "gaps" else (-secondary, -primary)
+        schedules.append((gaps, end, options))
+    return schedules, state["nodes"], state["complete"]
+
+
+class ScheduleBuilder:
+    """
+    Non-conflicting section combinations for a list of courses in one term.
+
+    A term's sections are read once and grouped into MeetingOptions per
+    class; search_schedules() then enumerates combinations with branch and
+    bound instead of walking the Cartesian product. Terms and answers are
+    cached until a write to section, meeting or class is reported through
+    apply_change(), or for SCHEDULE_MAX_AGE_SECONDS.
+    """
+
+    def __init__(self, db_url, max_terms=SCHEDULE_MAX_TERMS, memo_size=SCHEDULE_MEMO_SIZE,
+                 max_age=SCHEDULE_MAX_AGE_SECONDS):
+        self.db_url = db_url
+        self.max_terms = max_terms
+        self.memo_size = memo_size
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._terms = OrderedDict()     # term_key -> {cid: [MeetingOption]}
+        self._codes = None              # course_key -> cid
+        self._memo = OrderedDict()
+        self._generation = 0
+        self._loaded_at = None          # when the oldest cached data was read
+
+    def _load_codes(self):
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT cid, cname, ccode FROM class")
+                return {course_key(f"{cname}{ccode}"): cid for cid, cname, ccode in cur.fetchall()}
+
+    def _load_term(self, key):
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                cur.execute(SCHEDULE_SECTIONS_SQL, key)
+                return build_options(cur.fetchall())
+
+    def _clear(self):
+        self._generation += 1
+        self._terms.clear()
+        self._codes = None
+        self._memo.clear()
+        self._loaded_at = None
+
+    def _term(self, key):
+        with self._lock:
+            if self._loaded_at is not None and self.max_age and time.monotonic() - self._loaded_at > self.max_age:
+                # Nothing may have reported the writes since (CHANGE_LISTENER=0)
+                self._clear()
+            generation = self._generation
+            codes = self._codes
+            options = self._terms.get(key)
+        if codes is None:
+            codes = self._load_codes()
+        if options is None:
+            options = self._load_term(key)
+        with self._lock:
+            if self._generation == generation:
+                if self._loaded_at is None:
+                    self._loaded_at = time.monotonic()
+                self._codes = codes
+                self._terms[key] = options
+                self._terms.move_to_end(key)
+                while len(self._terms) > self.max_terms:
+                    self._terms.popitem(last=False)
+        return codes, options, generation
+
+    def apply_change(self, entity, ids=None):
+        """ChangeListener handler: drop terms and answers after section, meeting or class writes."""
+        if entity == "*" or entity in SCHEDULE_ENTITIES:
+            with self._lock:
+                self._clear()
+
+    def build(self, courses, semester, year, rank="gaps", limit=SCHEDULE_DEFAULT_LIMIT):
+        """
+        Rank section combinations without meeting overlaps.
+
+        Args:
+            courses (list): Course codes ('CIIC 3015') or class ids.
+            semester (str): Semester as stored in section.semester (any case).
+            year (int|str): Year as stored in section.years.
+            rank (str): "gaps" (fewest idle minutes between classes) or
+                "end" (earliest last class of the week).
+            limit (int): Schedules to return (at most SCHEDULE_MAX_LIMIT).
+
+        Returns:
+            dict: semester, year, rank, "schedules" (best first, each with
+            gaps, latest_end and one entry per course listing the sections
+            that share its meeting), "unavailable" (courses without sections
+            in the term), nodes and complete (False when the search stopped
+            at SCHEDULE_MAX_NODES).
+
+        Raises:
+            ValueError: On unknown courses, rankings or invalid limits.
+        """
+        if rank not in SCHEDULE_RANKINGS:
+            raise ValueError(f"rank must be one of: {', '.join(SCHEDULE_RANKINGS)}.")
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise ValueError("limit must be an integer.")
+        if not 1 <= limit <= SCHEDULE_MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {SCHEDULE_MAX_LIMIT}.")
+        if not courses or len(courses) > SCHEDULE_MAX_COURSES:
+            raise ValueError(f"Give between 1 and {SCHEDULE_MAX_COURSES} courses.")
+
+        key = term_key(semester, year)
+        codes, options, generation = self._term(key)
+        known = set(codes.values())
+        cids = []
+        for course in courses:
+            cid = course if isinstance(course, int) else codes.get(course_key(course))
+            if cid not in known:
+                raise ValueError(f"Course {course} not found")
+            if cid not in cids:
+                cids.append(cid)
+
+        memo_key = (key, tuple(sorted(cids)), rank, limit)
+        with self._lock:
+            if generation == self._generation and memo_key in self._memo:
+                self._memo.move_to_end(memo_key)
+                return self._memo[memo_key]
+
+        available = [cid for cid in cids if options.get(cid)]
+        schedules, nodes, complete = search_schedules(
+            [options[cid] for cid in available], rank, limit)
+        result = {
+            "semester": key[0],
+            "year": key[1],
+            "rank": rank,
+            "schedules": [
+                {
+                    "gaps": gaps,
+                    "latest_end": _clock(end) if end else None,
+                    "sections": [option.describe() for option in sorted(chosen, key=lambda o: available.index(o.cid))],
+                }
+                for gaps, end, chosen in schedules
+            ],
+            "unavailable": [cid for cid in cids if cid not in available],
+            "nodes": nodes,
+            "complete": complete,
+        }
+
+        with self._lock:
+            if generation == self._generation:
+                self._memo[memo_key] = result
+                while len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+        return result
+
+
+_builders = {}
+_builders_lock = threading.Lock()
+
+
+def get_schedule_builder(db_url=None):
+    """
+    Get the process-wide schedule builder for a database URL.
+
+    Args:
+        db_url (str): Database connection URL. Defaults to DATABASE_URL.
+
+    Returns:
+        ScheduleBuilder: The shared builder (terms are loaded on first request).
+    """
+    db_url = db_url or os.getenv("DATABASE_URL")
+    with _builders_lock:
+        builder = _builders.get(db_url)
+        if builder is None:
+            builder = ScheduleBuilder(db_url)
+            _builders[db_url] = builder
+        return builder
@@ -0,0 +1,473 @@
+# myApp/models/schedule_index.py
+
+from bisect import bisect_left
+from heapq import heappush, heappop, merge
+from datetime import time, datetime
+import threading
+import os
+from myApp.extensions import db_connection
+
+# Meeting day letters as stored in meeting.cdays (e.g. 'LWV', 'MJ')
+DAY_CODES = {'L': 0, 'M': 1, 'W': 2, 'J': 3, 'V': 4, 'S': 5, 'D': 6}
+
+
+def parse_days(cdays):
+    """
+    Convert a meeting day string into weekday indexes.
+
+    Args:
+        cdays (str): Day letters such as 'LWV' or 'MJ'.
+
+    Returns:
+        list: Sorted weekday indexes (0 = Monday).
+    """
+    if not cdays:
+        return []
+    days = set()
+    for letter in cdays.strip().upper():
+        if letter not in DAY_CODES:
+            raise ValueError(f"Unknown meeting day '{letter}' in '{cdays}'")
+        days.add(DAY_CODES[letter])
+    return sorted(days)
+
+
+def day_mask(cdays):
+    """
+    Encode a meeting day string as a bitmask (bit d set = meets on weekday d).
+
+    Args:
+        cdays (str): Day letters such as 'LWV' or 'MJ'.
+
+    Returns:
+        int: The bitmask stored in meeting.day_mask.
+    """
+    mask = 0
+    for day in parse_days(cdays):
+        mask |= 1 << day
+    return mask
+
+
+def to_minutes(value):
+    """
+    Convert a time (datetime.time, datetime or 'HH:MM[:SS]' string) to minutes since midnight.
+    """
+    if isinstance(value, datetime):
+        value = value.time()
+    if isinstance(value, time):
+        return value.hour * 60 + value.minute
+    parts = str(value).split(':')
+    return int(parts[0]) * 60 + int(parts[1])
+
+
+def span_bits(start, end):
+    """Bitset with one bit per minute in [start, end), bit 0 = 00:00."""
+    if end <= start:
+        return 0
+    return ((1 << (end - start)) - 1) << start
+
+
+def term_key(semester, year):
+    """Normalize a (semester, year) pair the way section rows compare them."""
+    return (str(semester).lower(), str(year))
+
+
+class _IntervalList:
+    """
+    Intervals of one (room, day, term) slot sorted by start minute.
+
+    prefix_max[i] holds the latest end among entries[0..i], which lets an
+    overlap query stop as soon as nothing further left can reach the
+    candidate's start.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.starts = []
+        self.prefix_max = []
+
+    def _rebuild_prefix(self, index):
+        current = self.prefix_max[index - 1] if index > 0 else -1
+        del self.prefix_max[index:]
+        for start, end, _ in self.entries[index:]:
+            current = max(current, end)
+            self.prefix_max.append(current)
+
+    def add(self, start, end, sid):
+        entry = (start, end, sid)
+        index = bisect_left(self.entries, entry)
+        self.entries.insert(index, entry)
+        self.starts.insert(index, start)
+        self._rebuild_prefix(index)
+
+    def remove(self, start, end, sid):
+        index = bisect_left(self.entries, (start, end, sid))
+        if index < len(self.entries) and self.entries[index] == (start, end, sid):
+            del self.entries[index]
+            del self.starts[index]
+            self._rebuild_prefix(index)
+
+    def overlapping(self, start, end, exclude_sid=None):
+        """Return sids whose [start, end) overlaps the given interval."""
+        found = []
+        index = bisect_left(self.starts, end) - 1
+        while index >= 0 and self.prefix_max[index] > start:
+            entry_start, entry_end, sid = self.entries[index]
+            if entry_end > start and sid != exclude_sid:
+                found.append(sid)
+            index -= 1
+        return found
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class ScheduleIndex:
+    """
+    In-memory room schedule built from room + section + meeting.
+
+    Sections are stored per (room, weekday, term) as sorted minute intervals,
+    so "does this meeting overlap anything in the room?" is a bisect instead
+    of a join that splits cdays for the room's whole history. Each slot also
+    keeps a minute-resolution occupancy bitset, so "is the room free for this
+    window?" is a single AND. The room, section and meeting models keep it
+    current on every write; it is built lazily on the first query.
+    """
+
+    def __init__(self, db_url):
+        self.db_url = db_url
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._slots = {}       # (room_id, day, term) -> _IntervalList
+        self._occupancy = {}   # (room_id, day, term) -> bitset of busy minutes
+        self._rooms = {}       # room_id -> (building, room_number, capacity)
+        self._sections = {}    # sid -> (room_id, mid, term)
+        self._by_meeting = {}  # mid -> set of sids
+        self._meetings = {}    # mid -> (days, start_minute, end_minute)
+        self._room_terms = {}  # room_id -> set of terms with sections
+
+    def build(self):
+        """(Re)load every section and meeting from the database."""
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT rid, building, room_number, capacity FROM room")
+                rooms = cur.fetchall()
+                cur.execute("SELECT mid, cdays, starttime, endtime FROM meeting")
+                meetings = cur.fetchall()
+                cur.execute("SELECT sid, roomid, mid, semester, years FROM section WHERE mid IS NOT NULL")
+                sections = cur.fetchall()
+        with self._lock:
+            self._slots.clear()
+            self._occupancy.clear()
+            self._rooms = {rid: (building, number, capacity) for rid, building, number, capacity in rooms}
+            self._sections.clear()
+            self._by_meeting.clear()
+            self._meetings.clear()
+            self._room_terms.clear()
+            for mid, cdays, starttime, endtime in meetings:
+                self._meetings[mid] = (parse_days(cdays), to_minutes(starttime), to_minutes(endtime))
+            for sid, room_id, mid, semester, year in sections:
+                self._add(sid, room_id, mid, term_key(semester, year))
+            self._loaded = True
+
+    def invalidate(self):
+        """Drop everything; the next query rebuilds from the database."""
+        with self._lock:
+            self._loaded = False
+
+    def apply_change(self, entity, ids):
+        """
+        ChangeListener handler: catch up with a write made by another process.
+
+        The rows named in the notification are re-read and applied one by
+        one; anything broader drops the index so it rebuilds on next use.
+        """
+        if entity not in ("section", "meeting", "room"):
+            if entity == "*":
+                self.invalidate()
+            return
+        if not ids:
+            self.invalidate()
+            return
+        if not self._loaded:
+            return
+
+        ids = list(ids)
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                if entity == "section":
+                    cur.execute("SELECT sid, roomid, mid, semester, years FROM section WHERE sid = ANY(%s)", (ids,))
+                elif entity == "meeting":
+                    cur.execute("SELECT mid, cdays, starttime, endtime FROM meeting WHERE mid = ANY(%s)", (ids,))
+                else:
+                    cur.execute("SELECT rid, building, room_number, capacity FROM room WHERE rid = ANY(%s)", (ids,))
+                rows = cur.fetchall()
+
+        # Rows that are gone were deleted
+        update, remove = {
+            "section": (self.add_section, self.remove_section),
+            "meeting": (self.update_meeting, self.remove_meeting),
+            "room": (self.update_room, self.remove_room),
+        }[entity]
+        found = {row[0]: row[1:] for row in rows}
+        for row_id in ids:
+            if row_id in found:
+                update(row_id, *found[row_id])
+            else:
+                remove(row_id)
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.build()
+
+    def _meeting(self, mid):
+        meeting = self._meetings.get(mid)
+        if meeting is None:
+            with db_connection(self.db_url) as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT cdays, starttime, endtime FROM meeting WHERE mid = %s", (mid,))
+                    row = cur.fetchone()
+            if row is None:
+                return None
+            meeting = (parse_days(row[0]), to_minutes(row[1]), to_minutes(row[2]))
+            self._meetings[mid] = meeting
+        return meeting
+
+    def _add(self, sid, room_id, mid, term):
+        meeting = self._meeting(mid)
+        if meeting is None:
+            return
+        days, start, end = meeting
+        busy = span_bits(start, end)
+        for day in days:
+            key = (room_id, day, term)
+            self._slots.setdefault(key, _IntervalList()).add(start, end, sid)
+            self._occupancy[key] = self._occupancy.get(key, 0) | busy
+        self._sections[sid] = (room_id, mid, term)
+        self._by_meeting.setdefault(mid, set()).add(sid)
+        self._room_terms.setdefault(room_id, set()).add(term)
+
+    def _remove(self, sid):
+        placed = self._sections.pop(sid, None)
+        if placed is None:
+            return None
+        room_id, mid, term = placed
+        days, start, end = self._meetings[mid]
+        for day in days:
+            key = (room_id, day, term)
+            slot = self._slots.get(key)
+            if slot is not None:
+                slot.remove(start, end, sid)
+                if slot:
+                    busy = 0
+                    for entry_start, entry_end, _ in slot.entries:
+                        busy |= span_bits(entry_start, entry_end)
+                    self._occupancy[key] = busy
+                else:
+                    del self._slots[key]
+                    self._occupancy.pop(key, None)
+        self._by_meeting.get(mid, set()).discard(sid)
+        return placed
+
+    def add_section(self, sid, room_id, mid, semester, year):
+        """Record (or move) a section after it was written."""
+        with self._lock:
+            if not self._loaded:
+                return
+            self._remove(sid)
+            if mid is not None:
+                self._add(sid, room_id, mid, term_key(semester, year))
+
+    def remove_section(self, sid):
+        """Forget a deleted section."""
+        with self._lock:
+            if self._loaded:
+                self._remove(sid)
+
+    def update_meeting(self, mid, cdays, starttime, endtime):
+        """Re-slot every section that uses a meeting whose days or times changed."""
+        with self._lock:
+            if not self._loaded:
+                return
+            affected = [(sid, self._remove(sid)) for sid in list(self._by_meeting.get(mid, ()))]
+            self._meetings[mid] = (parse_days(cdays), to_minutes(starttime), to_minutes(endtime))
+            for sid, (room_id, _, term) in affected:
+                self._add(sid, room_id, mid, term)
+
+    def remove_meeting(self, mid):
+        """Forget a deleted meeting together with the sections that used it."""
+        with self._lock:
+            if not self._loaded:
+                return
+            for sid in list(self._by_meeting.pop(mid, ())):
+                self._remove(sid)
+            self._meetings.pop(mid, None)
+
+    def update_room(self, room_id, building, room_number, capacity):
+        """Record a created or edited room."""
+        with self._lock:
+            if self._loaded:
+                self._rooms[room_id] = (building, room_number, capacity)
+
+    def remove_room(self, room_id):
+        """Forget a deleted room."""
+        with self._lock:
+            if self._loaded:
+                self._rooms.pop(room_id, None)
+
+    def free_rooms(self, cdays, starttime, endtime, semester, year, min_capacity=0):
+        """
+        Find rooms with no section overlapping a weekly time window.
+
+        Args:
+            cdays (str): Day letters such as 'MJ'.
+            starttime (str|time): Window start.
+            endtime (str|time): Window end.
+            semester (str): Term semester.
+            year (str|int): Term year.
+            min_capacity (int): Smallest acceptable room capacity.
+
+        Returns:
+            list: (rid, building, room_number, capacity) tuples ordered by capacity, then rid.
+        """
+        days = parse_days(cdays)
+        start, end = to_minutes(starttime), to_minutes(endtime)
+        if end <= start:
+            raise ValueError("end time must be after start time")
+        window = span_bits(start, end)
+        term = term_key(semester, year)
+        with self._lock:
+            self._ensure_loaded()
+            occupancy = self._occupancy
+            free = [
+                (rid, building, room_number, capacity)
+                for rid, (building, room_number, capacity) in self._rooms.items()
+                if (capacity or 0) >= min_capacity
+                and not any(occupancy.get((rid, day, term), 0) & window for day in days)
+            ]
+        return sorted(free, key=lambda room: (room[3], room[0]))
+
+    def conflicts(self, room_id, mid, semester=None, year=None, exclude_sid=None):
+        """
+        Find sections in a room whose meeting overlaps the given meeting.
+
+        Args:
+            room_id (int): Room to check.
+            mid (int): Meeting the candidate section would use.
+            semester (str): Term semester; with year, limits the check to that term.
+            year (str|int): Term year.
+            exclude_sid (int): Section to ignore (the one being updated).
+
+        Returns:
+            list: Sorted ids of the conflicting sections.
+        """
+        if mid is None:
+            return []
+        with self._lock:
+            self._ensure_loaded()
+            meeting = self._meeting(mid)
+            if meeting is None:
+                return []
+            days, start, end = meeting
+            if semester is not None and year is not None:
+                terms = [term_key(semester, year)]
+            else:
+                terms = list(self._room_terms.get(room_id, ()))
+            found = set()
+            for term in terms:
+                for day in days:
+                    slot = self._slots.get((room_id, day, term))
+                    if slot is not None:
+                        found.update(slot.overlapping(start, end, exclude_sid))
+            return sorted(found)
+
+    def batch_conflicts(self, proposals):
+        """
+        Check many proposed placements against the room schedule and each other.
+
+        Every (room, weekday, term) slot touched by a proposal is swept once:
+        its stored intervals (already sorted) are merged with the sorted
+        proposals, and a heap of active intervals keyed by end minute yields
+        every overlapping pair.
+
+        Args:
+            proposals (list): Dicts with room_id, master_id, semester, year and
+                optionally section_id (a section being moved, ignored as a conflict).
+
+        Returns:
+            list: One dict per proposal, in input order, with the conflicting
+                section ids ("sections"), the indexes of conflicting proposals
+                ("proposals") and an "error" for proposals that cannot be checked.
+        """
+        results = [{"sections": set(), "proposals": set(), "error": None} for _ in proposals]
+        grouped = {}
+        with self._lock:
+            self._ensure_loaded()
+            for position, proposal in enumerate(proposals):
+                meeting = self._meeting(proposal['master_id'])
+                if meeting is None:
+                    results[position]["error"] = f"Master ID {proposal['master_id']} does not exist."
+                    continue
+                days, start, end = meeting
+                term = term_key(proposal['semester'], proposal['year'])
+                for day in days:
+                    grouped.setdefault((proposal['room_id'], day, term), []).append((start, end, position))
+
+            for key, proposed in grouped.items():
+                proposed.sort()
+                slot = self._slots.get(key)
+                stored = slot.entries if slot is not None else []
+                # (start, end, is_proposal, id): stored sections sort before proposals at equal starts
+                events = merge(
+                    ((start, end, False, sid) for start, end, sid in stored),
+                    ((start, end, True, position) for start, end, position in proposed),
+                )
+                active = []
+                for start, end, is_proposal, ident in events:
+                    while active and active[0][0] <= start:
+                        heappop(active)
+                    for _, other_is_proposal, other in active:
+                        if is_proposal and other_is_proposal:
+                            results[ident]["proposals"].add(other)
+                            results[other]["proposals"].add(ident)
+                        elif is_proposal:
+                            self._record_section_conflict(results, proposals, ident, other)
+                        elif other_is_proposal:
+                            self._record_section_conflict(results, proposals, other, ident)
+                    heappush(active, (end, is_proposal, ident))
+
+        return [
+            {
+                "sections": sorted(result["sections"]),
+                "proposals": sorted(result["proposals"]),
+                "error": result["error"],
+            }
+            for result in results
+        ]
+
+    @staticmethod
+    def _record_section_conflict(results, proposals, position, sid):
+        if sid != proposals[position].get('section_id'):
+            results[position]["sections"].add(sid)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_schedule_index(db_url=None):
+    """
+    Get the process-wide schedule index for a database URL.
+
+    Args:
+        db_url (str): Database connection URL. Defaults to DATABASE_URL.
+
+    Returns:
+        ScheduleIndex: The shared index (built on first query).
+    """
+    db_url = db_url or os.getenv("DATABASE_URL")
+    with _indexes_lock:
+        index = _indexes.get(db_url)
+        if index is None:
+            index = ScheduleIndex(db_url)
+            _indexes[db_url] = index
+        return index
@@ -0,0 +1,190 @@
+# myApp/models/section_import.py
+
+import csv
+import io
+
+# Columns of ETL/FixedData/section.csv; '#' (the row number) and sid are optional
+IMPORT_COLUMNS = {
+    "#": "rownum",
+    "sid": "sid",
+    "roomid": "roomid",
+    "mid": "mid",
+    "cid": "cid",
+    "semester": "semester",
+    "years": "years",
+    "capacity": "capacity",
+}
+REQUIRED_IMPORT_COLUMNS = ("roomid", "mid", "cid", "semester", "years", "capacity")
+
+# Everything is staged as text so one malformed value rejects its row, not the upload
+CREATE_STAGING_SQL = """
+    CREATE TEMP TABLE section_import (
+        line serial,
+        rownum text,
+        sid text,
+        roomid text,
+        mid text,
+        cid text,
+        semester text,
+        years text,
+        capacity text,
+        error text,
+        weekly int4multirange
+    ) ON COMMIT DROP;
+"""
+
+# The checks Transform runs in pandas, as set-based statements over the staging table
+VALIDATE_IMPORT_SQL = [
+    # Well-formed values
+    r"""
+    UPDATE section_import SET error = CASE
+        WHEN coalesce(sid, '') !~ '^\s*\d*\s*$' THEN 'sid must be an integer'
+        WHEN coalesce(roomid, '') !~ '^\s*\d+\s*$' THEN 'roomid must be an integer'
+        WHEN coalesce(mid, '') !~ '^\s*\d+\s*$' THEN 'mid must be an integer'
+        WHEN coalesce(cid, '') !~ '^\s*\d+\s*$' THEN 'cid must be an integer'
+        WHEN coalesce(capacity, '') !~ '^\s*\d+\s*$' THEN 'capacity must be an integer'
+        WHEN coalesce(trim(semester), '') = '' THEN 'semester is required'
+        WHEN coalesce(trim(years), '') = '' THEN 'years is required'
+    END;
+    UPDATE section_import SET sid = NULLIF(trim(sid), ''), semester = trim(semester), years = trim(years)
+    WHERE error IS NULL;
+    """,
+    # The same sid twice in one file
+    """
+    UPDATE section_import i SET error = 'Duplicate sid ' || i.sid || ' in file'
+    WHERE i.error IS NULL AND i.sid IS NOT NULL
+    AND EXISTS (
+        SELECT 1 FROM section_import o
+        WHERE o.sid = i.sid AND o.line < i.line AND o.error IS NULL
+    );
+    """,
+    # Room, meeting and class exist; term matches; room is big enough (check_overcapacity)
+    """
+    UPDATE section_import i SET error = v.error, weekly = v.weekly
+    FROM (
+        SELECT s.line,
+               CASE
+                   WHEN r.rid IS NULL THEN 'Room ' || s.roomid || ' not found'
+                   WHEN m.mid IS NULL THEN 'Master ID ' || s.mid || ' does not exist.'
+                   WHEN c.cid IS NULL THEN 'Class ID ' || s.cid || ' not found'
+                   WHEN lower(c.term) = 'fall' AND lower(s.semester) <> 'fall'
+                       THEN 'This class can only be taught in Fall semester'
+                   WHEN lower(c.term) = 'spring' AND lower(s.semester) <> 'spring'
+                       THEN 'This class can only be taught in Spring semester'
+                   WHEN s.capacity::int > r.capacity
+                       THEN 'Capacity ' || s.capacity || ' exceeds room capacity ' || r.capacity
+               END AS error,
+               meeting_weekly(m.day_mask, m.minutes) AS weekly
+        FROM section_import s
+        LEFT JOIN room r ON r.rid = s.roomid::int
+        LEFT JOIN meeting m ON m.mid = s.mid::int
+        LEFT JOIN class c ON c.cid = s.cid::int
+        WHERE s.error IS NULL
+    ) v
+    WHERE i.line = v.line;
+    """,
+]
+
+# Same advisory lock as single and bulk section writes, taken in room order
+LOCK_IMPORT_ROOMS_SQL = """
+    SELECT pg_advisory_xact_lock(%s, room)
+    FROM (SELECT DISTINCT roomid::int AS room FROM section_import WHERE error IS NULL ORDER BY 1) rooms;
+"""
+
+# Same-room overlaps; rows replacing an existing sid are judged by their new slot
+CONFLICT_IMPORT_SQL = [
+    """
+    UPDATE section_import i SET error = 'Schedule conflict: Room is already booked for this time slot '
+                                        || '(conflicting sections: ' || v.sids || ')'
+    FROM (
+        SELECT s.line, string_agg(e.sid::text, ', ' ORDER BY e.sid) AS sids
+        FROM section_import s
+        JOIN section e ON e.roomid = s.roomid::int
+                      AND lower(e.semester) = lower(s.semester)
+                      AND e.years = s.years
+                      AND e.weekly && s.weekly
+        WHERE s.error IS NULL
+        -- Only validated rows replace a section (CASE so a rejected sid like 'abc' is never cast)
+        AND NOT EXISTS (
+            SELECT 1 FROM section_import o
+            WHERE CASE WHEN o.error IS NULL THEN o.sid::int END = e.sid
+        )
+        GROUP BY s.line
+    ) v
+    WHERE i.line = v.line;
+    """,
+    # Overlaps inside the file: keep the earlier row (resolve_section_conflicts)
+    """
+    UPDATE section_import i SET error = 'Schedule conflict with line ' || v.first_line || ' of the file'
+    FROM (
+        SELECT b.line, min(a.line) + 1 AS first_line  -- file line, counting the header
+        FROM section_import a
+        JOIN section_import b ON a.line < b.line
+                             AND a.roomid::int = b.roomid::int
+                             AND lower(a.semester) = lower(b.semester)
+                             AND a.years = b.years
+                             AND a.weekly && b.weekly
+        WHERE a.error IS NULL AND b.error IS NULL
+        GROUP BY b.line
+    ) v
+    WHERE i.line = v.line;
+    """,
+]
+
+# Catch the sequence up first so generated sids cannot land on an existing row
+MERGE_IMPORT_SQL = """
+    SELECT setval(
+        pg_get_serial_sequence('section', 'sid'),
+        GREATEST(
+            (SELECT COALESCE(MAX(sid), 1) FROM section),
+            (SELECT COALESCE(MAX(sid::int), 1) FROM section_import WHERE error IS NULL)
+        ),
+        true
+    );
+    INSERT INTO section (sid, roomid, mid, cid, semester, years, capacity)
+    SELECT COALESCE(sid::int, nextval(pg_get_serial_sequence('section', 'sid'))),
+           roomid::int, mid::int, cid::int, semester, years, capacity::int
+    FROM section_import
+    WHERE error IS NULL
+    ORDER BY line
+    ON CONFLICT (sid) DO UPDATE
+    SET roomid = EXCLUDED.roomid,
+        mid = EXCLUDED.mid,
+        cid = EXCLUDED.cid,
+        semester = EXCLUDED.semester,
+        years = EXCLUDED.years,
+        capacity = EXCLUDED.capacity
+    RETURNING sid, (xmax = 0) AS inserted;
+"""
+
+
+def read_import_header(stream):
+    """
+    Read the CSV header line and map it to staging columns.
+
+    Args:
+        stream: Binary file-like object positioned at the start of the upload.
+
+    Returns:
+        list: Staging column names in file order.
+
+    Raises:
+        ValueError: If the header is missing, repeats a column, has unknown
+            columns or lacks a required one.
+    """
+    line = stream.readline()
+    if isinstance(line, bytes):
+        line = line.decode("utf-8-sig")
+    header = next(csv.reader(io.StringIO(line)), None)
+    if not header:
+        raise ValueError("The CSV file is empty.")
+    names = [name.strip().lower() for name in header]
+    unknown = [name for name in names if name not in IMPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown CSV column(s): {', '.join(unknown)}")
+    if len(set(names)) != len(names):
+        raise ValueError("CSV header repeats a column.")
+    missing = [name for name in REQUIRED_IMPORT_COLUMNS if name not in names]
+    if missing:
+        raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+    return [IMPORT_COLUMNS[name] for name in names]
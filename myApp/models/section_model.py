@@ -1,68 +1,270 @@
 # myApp/models/section_model.py
 
 import psycopg2
+from psycopg2.extras import execute_values
+from myApp.extensions import db_connection, iter_rows
+from myApp.pagination import keyset_query, json_page_query, to_page, STREAM_BATCH_SIZE
+from myApp.models.schedule_index import get_schedule_index
+from myApp.notify import publish_change
+from myApp.models.section_import import (
+    read_import_header, CREATE_STAGING_SQL, VALIDATE_IMPORT_SQL, LOCK_IMPORT_ROOMS_SQL,
+    CONFLICT_IMPORT_SQL, MERGE_IMPORT_SQL
+)
+from myApp.bulk import (
+    BulkValidationError, validate_batch, as_key_rows, require_int, require_str,
+    insert_rows, update_rows, delete_rows, raise_if_missing, insert_with_sequence_retry, BULK_PAGE_SIZE
+)
+
+# Advisory lock namespace serializing writes that target the same room
+SECTION_ROOM_LOCK = 4060
+
+# Validates a candidate section and writes it in the same statement. The
+# checks CTE reports why a write was skipped so the caller can raise the
+# matching error. Overlaps are found through section.weekly (served by the
+# no_room_double_booking GiST index); the room advisory lock keeps concurrent
+# writers from both passing the check where that constraint is missing.
+SECTION_WRITE_CTE = """
+    SELECT pg_advisory_xact_lock(%(lock_ns)s, %(room_id)s::int);
+    WITH candidate AS (
+        SELECT %(room_id)s::int AS roomid,
+               %(master_id)s::int AS mid,
+               %(class_id)s::int AS cid,
+               %(semester)s::varchar AS semester,
+               %(year)s::varchar AS years,
+               %(capacity)s::int AS capacity
+    ),
+    checks AS (
+        SELECT
+            (c.mid IS NULL OR EXISTS (SELECT 1 FROM meeting m WHERE m.mid = c.mid)) AS meeting_exists,
+            (SELECT cl.term FROM class cl WHERE cl.cid = c.cid) AS class_term,
+            EXISTS (
+                SELECT 1 FROM section s1
+                WHERE s1.roomid = c.roomid
+                AND lower(s1.semester) = lower(c.semester)
+                AND s1.years = c.years
+                AND s1.sid IS DISTINCT FROM %(section_id)s
+                AND s1.weekly && (
+                    SELECT meeting_weekly(m.day_mask, m.minutes) FROM meeting m WHERE m.mid = c.mid
+                )
+            ) AS has_conflict
+        FROM candidate c
+    ),
+    accepted AS (
+        SELECT c.*
+        FROM candidate c, checks ch
+        WHERE ch.meeting_exists
+        AND ch.class_term IS NOT NULL
+        AND NOT (
+            (LOWER(ch.class_term) = 'fall' AND LOWER(c.semester) <> 'fall') OR
+            (LOWER(ch.class_term) = 'spring' AND LOWER(c.semester) <> 'spring')
+        )
+        AND NOT ch.has_conflict
+    ),
+    written AS (
+        {write}
+    )
+    SELECT ch.meeting_exists, ch.class_term, ch.has_conflict,
+           (SELECT sid FROM written), (SELECT COUNT(*) FROM written)
+    FROM checks ch;
+"""
+
+SECTION_INSERT_SQL = SECTION_WRITE_CTE.format(write="""
+        INSERT INTO section (roomid, mid, cid, semester, years, capacity)
+        SELECT roomid, mid, cid, semester, years, capacity FROM accepted
+        RETURNING sid
+""")
+
+SECTION_UPDATE_SQL = SECTION_WRITE_CTE.format(write="""
+        UPDATE section s
+        SET roomid = a.roomid,
+            mid = a.mid,
+            cid = a.cid,
+            semester = a.semester,
+            years = a.years,
+            capacity = a.capacity
+        FROM accepted a
+        WHERE s.sid = %(section_id)s
+        RETURNING s.sid
+""")
+
+SECTION_SELECT = """
+    SELECT sid as section_id, 
+           roomid as room_id,
+           mid as master_id, 
+           cid as class_id, 
+           semester, 
+           years as year, 
+           capacity 
+    FROM section
+"""
+
+# Filters accepted by fetch_all_sections (all backed by indexes on section)
+SECTION_FILTERS = {
+    "semester": "lower(semester) = lower(%s)",
+    "year": "years = %s",
+    "class_id": "cid = %s",
+    "room_id": "roomid = %s",
+    "master_id": "mid = %s",
+}
+
+
+# Set-based version of the checks CTE for bulk writes: one row per candidate
+# with the meeting/class lookups and the sections it would double-book.
+SECTION_BULK_CHECK_SQL = """
+    SELECT v.n,
+           (v.mid IS NULL OR m.mid IS NOT NULL) AS meeting_exists,
+           cl.term AS class_term,
+           ARRAY(
+               SELECT s.sid FROM section s
+               WHERE s.roomid = v.roomid
+               AND lower(s.semester) = lower(v.semester)
+               AND s.years = v.years
+               AND s.sid IS DISTINCT FROM v.sid
+               AND s.weekly && meeting_weekly(m.day_mask, m.minutes)
+               ORDER BY s.sid
+           ) AS conflicts
+    FROM (VALUES %s) AS v (n, roomid, mid, cid, semester, years, sid)
+    LEFT JOIN meeting m ON m.mid = v.mid
+    LEFT JOIN class cl ON cl.cid = v.cid
+"""
+
+SECTION_WRITE_COLUMNS = ("roomid", "mid", "cid", "semester", "years", "capacity")
+
+
+def section_values(section_data):
+    """Validate one section for a bulk write and return its SECTION_WRITE_COLUMNS values."""
+    master_id = section_data.get('master_id')
+    year = section_data['year']
+    if isinstance(year, int) and not isinstance(year, bool):
+        year = str(year)
+    elif not isinstance(year, str) or not year.strip():
+        raise ValueError("year must be a string or an integer")
+    return (
+        require_int(section_data, 'room_id'),
+        require_int(section_data, 'master_id') if master_id is not None else None,
+        require_int(section_data, 'class_id', 2),
+        require_str(section_data, 'semester'),
+        year,
+        require_int(section_data, 'capacity', 0),
+    )
+
+
+def semester_error(class_term, semester):
+    """Return the reason a class cannot be taught in a semester, or None."""
+    class_term = class_term.lower()
+    section_semester = semester.lower()
+    if class_term == 'fall' and section_semester != 'fall':
+        return "This class can only be taught in Fall semester"
+    elif class_term == 'spring' and section_semester != 'spring':
+        return "This class can only be taught in Spring semester"
+    return None
+
 
 class SectionModel:
     def __init__(self, db_url):
         self.db_url = db_url
+        self.schedule_index = get_schedule_index(db_url)
 
-    def get_next_sid(self):
+    def master_id_exists(self, master_id):
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
-                    cur.execute("SELECT MAX(sid) FROM section")
-                    max_sid = cur.fetchone()[0]
-                    return (max_sid or 0) + 1
+                    cur.execute("SELECT 1 FROM meeting WHERE mid = %s", (master_id,))
+                    return cur.fetchone() is not None
         except psycopg2.Error as e:
             raise Exception(f"Database error: {str(e)}")
 
-    def master_id_exists(self, master_id):
+    def find_schedule_conflicts(self, room_id, meeting_id, section_id=None, semester=None, year=None):
+        """
+        Return the ids of sections that overlap the given room and meeting.
+
+        Answered from the in-memory schedule index; pass semester and year to
+        limit the check to one term.
+        """
         try:
-            with psycopg2.connect(self.db_url) as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT 1 FROM meeting WHERE mid = %s", (master_id,))
-                    return cur.fetchone() is not None
+            return self.schedule_index.conflicts(room_id, meeting_id, semester, year, exclude_sid=section_id)
         except psycopg2.Error as e:
             raise Exception(f"Database error: {str(e)}")
 
-    def check_schedule_conflict(self, room_id, meeting_id, section_id=None):
+    def check_schedule_conflict(self, room_id, meeting_id, section_id=None, semester=None, year=None):
         """Check if there's a scheduling conflict for the given room and meeting"""
+        return bool(self.find_schedule_conflicts(room_id, meeting_id, section_id, semester, year))
+
+    def check_batch_conflicts(self, proposals):
+        """
+        Check a list of proposed sections for room conflicts in one pass.
+
+        Args:
+            proposals (list): Dicts with room_id, master_id (or meeting_id),
+                semester and year; section_id optionally marks a section being moved.
+
+        Returns:
+            list: One result per proposal, in input order, listing conflicting
+                section ids and the indexes of conflicting proposals.
+        """
+        if not isinstance(proposals, list):
+            raise ValueError("Expected a list of proposed sections.")
+        normalized = []
+        for position, proposal in enumerate(proposals):
+            if not isinstance(proposal, dict):
+                raise ValueError(f"Proposal {position} must be an object.")
+            meeting_id = proposal.get('master_id', proposal.get('meeting_id'))
+            missing = [field for field, value in (
+                ('room_id', proposal.get('room_id')),
+                ('master_id', meeting_id),
+                ('semester', proposal.get('semester')),
+                ('year', proposal.get('year')),
+            ) if value is None]
+            if missing:
+                raise ValueError(f"Proposal {position} is missing required field(s): {', '.join(missing)}")
+            normalized.append({
+                'room_id': proposal['room_id'],
+                'master_id': meeting_id,
+                'semester': proposal['semester'],
+                'year': proposal['year'],
+                'section_id': proposal.get('section_id'),
+            })
+
         try:
-            with psycopg2.connect(self.db_url) as conn:
-                with conn.cursor() as cur:
-                    query = """
-                        SELECT COUNT(*) FROM section s1
-                        JOIN meeting m1 ON s1.mid = m1.mid
-                        JOIN meeting m2 ON %s = m2.mid
-                        WHERE s1.roomid = %s
-                        AND s1.mid != %s
-                        AND (
-                            (m1.starttime, m1.endtime) OVERLAPS 
-                            (m2.starttime, m2.endtime)
-                        )
-                        AND EXISTS (
-                            SELECT 1
-                            FROM unnest(string_to_array(m1.cdays, '')) AS day1(day)
-                            JOIN unnest(string_to_array(m2.cdays, '')) AS day2(day)
-                                ON day1.day = day2.day
-                        )
-                    """
-                    params = [meeting_id, room_id, meeting_id]
-                    
-                    if section_id:
-                        query += " AND s1.sid != %s"
-                        params.append(section_id)
-                    
-                    cur.execute(query, tuple(params))
-                    count = cur.fetchone()[0]
-                    return count > 0
+            checked = self.schedule_index.batch_conflicts(normalized)
         except psycopg2.Error as e:
             raise Exception(f"Database error: {str(e)}")
 
+        results = []
+        for position, (proposal, result) in enumerate(zip(normalized, checked)):
+            results.append({
+                "index": position,
+                **proposal,
+                "conflicting_sections": result["sections"],
+                "conflicting_proposals": result["proposals"],
+                "has_conflict": bool(result["sections"] or result["proposals"]),
+                "error": result["error"],
+            })
+        return results
+
+    def _conflict_error(self, params):
+        """
+        Message for a write the database rejected as a room conflict.
+
+        Only called once SQL has found the overlap; the in-memory index is
+        consulted to name the conflicting sections, and a stale or unavailable
+        index just leaves them out.
+        """
+        message = "Schedule conflict: Room is already booked for this time slot"
+        try:
+            conflicts = self.find_schedule_conflicts(
+                params['room_id'], params['master_id'], params['section_id'], params['semester'], params['year'])
+        except Exception as e:
+            print(f"Error naming conflicting sections: {e}")
+            conflicts = []
+        if conflicts:
+            message += f" (conflicting sections: {', '.join(map(str, conflicts))})"
+        return message
+
     def validate_semester(self, class_id, semester):
         """Validate that the section's semester matches the class's term"""
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
                     cur.execute(
                         "SELECT term FROM class WHERE cid = %s",
@@ -72,85 +274,314 @@ class SectionModel:
                     if not result:
                         raise ValueError(f"Class ID {class_id} not found")
                     
-                    class_term = result[0].lower()
-                    section_semester = semester.lower()
-                    
-                    # Check if semester matches class term
-                    if class_term == 'fall' and section_semester != 'fall':
-                        raise ValueError("This class can only be taught in Fall semester")
-                    elif class_term == 'spring' and section_semester != 'spring':
-                        raise ValueError("This class can only be taught in Spring semester")
+                    error = semester_error(result[0], semester)
+                    if error:
+                        raise ValueError(error)
                     return True
         except psycopg2.Error as e:
             raise Exception(f"Database error: {str(e)}")
 
-    def insert_section(self, section_data):
+    def _write_section(self, statement, section_data, section_id=None):
+        """
+        Validate and write a section in one transaction and one round trip.
+
+        Returns:
+            tuple: (sid written or None, number of rows written)
+        """
+        params = {
+            "lock_ns": SECTION_ROOM_LOCK,
+            "room_id": section_data['room_id'],
+            "master_id": section_data.get('master_id'),  # Use get to handle optional field
+            "class_id": section_data['class_id'],
+            "semester": section_data['semester'],
+            "year": section_data['year'],
+            "capacity": section_data['capacity'],
+            "section_id": section_id,
+        }
+        for attempt in range(2):
+            try:
+                with db_connection(self.db_url) as conn:
+                    with conn.cursor() as cur:
+                        cur.execute(statement, params)
+                        meeting_exists, class_term, has_conflict, sid, written = cur.fetchone()
+                        if not meeting_exists:
+                            raise ValueError(f"Master ID {params['master_id']} does not exist.")
+                        if class_term is None:
+                            raise ValueError(f"Class ID {params['class_id']} not found")
+                        error = semester_error(class_term, params['semester'])
+                        if error:
+                            raise ValueError(error)
+                        if not has_conflict:
+                            if written:
+                                publish_change(cur, "section", [sid])
+                            return sid, written
+                # Named after the connection is back in the pool
+                raise ValueError(self._conflict_error(params))
+            except psycopg2.errors.ExclusionViolation:
+                raise ValueError(self._conflict_error(params))
+            except psycopg2.errors.UniqueViolation:
+                # sid sequence is behind rows inserted with explicit ids; catch it up once
+                if attempt or section_id is not None:
+                    raise
+                self.reset_section_sequence()
+
+    def _overlaps_within_batch(self, values, section_ids):
+        """Map row index -> indexes of other rows in the batch booking the same room and time."""
+        scheduled = [index for index, value in enumerate(values) if value[1] is not None]
+        results = self.schedule_index.batch_conflicts([
+            {'room_id': values[index][0], 'master_id': values[index][1], 'semester': values[index][3],
+             'year': values[index][4], 'section_id': section_ids[index]}
+            for index in scheduled
+        ])
+        return {
+            index: [scheduled[other] for other in result['proposals']]
+            for index, result in zip(scheduled, results)
+        }
+
+    def _check_batch(self, cur, values, section_ids, batch_conflicts):
+        """
+        Validate a batch of sections inside the write transaction.
+
+        Locks every room involved (same lock as single writes), then checks
+        meetings, class terms and room conflicts against the database;
+        batch_conflicts comes from _overlaps_within_batch().
+
+        Raises:
+            BulkValidationError: Listing every row that cannot be written.
+        """
+        rooms = sorted({value[0] for value in values})
+        cur.execute("SELECT pg_advisory_xact_lock(%s, room) FROM unnest(%s::int[]) AS room", (SECTION_ROOM_LOCK, rooms))
+        checks = execute_values(
+            cur, SECTION_BULK_CHECK_SQL,
+            [(index,) + value[:5] + (sid,) for index, (value, sid) in enumerate(zip(values, section_ids))],
+            template="(%s, %s::int, %s::int, %s::int, %s::varchar, %s::varchar, %s::int)",
+            page_size=BULK_PAGE_SIZE, fetch=True
+        )
+
+        # Sections being moved by this batch are judged by their new slot
+        moving = {sid for sid in section_ids if sid is not None}
+        errors = []
+        for index, meeting_exists, class_term, conflicts in checks:
+            room_id, master_id, class_id, semester = values[index][:4]
+            conflicts = [sid for sid in conflicts if sid not in moving]
+            if not meeting_exists:
+                error = f"Master ID {master_id} does not exist."
+            elif class_term is None:
+                error = f"Class ID {class_id} not found"
+            else:
+                error = semester_error(class_term, semester)
+            if not error and conflicts:
+                error = ("Schedule conflict: Room is already booked for this time slot "
+                         f"(conflicting sections: {', '.join(map(str, conflicts))})")
+            if not error and batch_conflicts.get(index):
+                error = ("Schedule conflict: Room is double-booked within the batch "
+                         f"(conflicting rows: {', '.join(map(str, batch_conflicts[index]))})")
+            if error:
+                errors.append({"index": index, "error": error})
+        if errors:
+            raise BulkValidationError(errors)
+
+    def _index_batch(self, section_ids, values):
+        for sid, (room_id, master_id, _, semester, year, _) in zip(section_ids, values):
+            self.schedule_index.add_section(sid, room_id, master_id, semester, year)
+
+    def bulk_insert_sections(self, sections):
+        values = validate_batch(sections, section_values)
+        section_ids = [None] * len(values)
+        batch_conflicts = self._overlaps_within_batch(values, section_ids)
+
+        def write(cur):
+            self._check_batch(cur, values, section_ids, batch_conflicts)
+            sids = insert_rows(cur, "section", SECTION_WRITE_COLUMNS, values, "sid")
+            publish_change(cur, "section", sids)
+            return sids
+
+        try:
+            sids = insert_with_sequence_retry(self.db_url, "section", "sid", write)
+        except psycopg2.errors.ExclusionViolation:
+            raise ValueError("Schedule conflict: Room is already booked for this time slot")
+        self._index_batch(sids, values)
+        return sids
+
+    def bulk_update_sections(self, sections):
+        keyed = validate_batch(sections, lambda section_data: (require_int(section_data, 'section_id'),) +
+                               section_values(section_data), key=lambda value: value[0])
+        section_ids = [value[0] for value in keyed]
+        values = [value[1:] for value in keyed]
+        batch_conflicts = self._overlaps_within_batch(values, section_ids)
+        try:
+            with db_connection(self.db_url) as conn:
+                with conn.cursor() as cur:
+                    self._check_batch(cur, values, section_ids, batch_conflicts)
+                    updated = update_rows(
+                        cur, "section", ("sid",), SECTION_WRITE_COLUMNS, keyed,
+                        "(%s::int, %s::int, %s::int, %s::int, %s::varchar, %s::varchar, %s::int)"
+                    )
+                    raise_if_missing([(sid,) for sid in section_ids], updated, "Section")
+                    publish_change(cur, "section", section_ids)
+        except psycopg2.errors.ExclusionViolation:
+            raise ValueError("Schedule conflict: Room is already booked for this time slot")
+        self._index_batch(section_ids, values)
+        return section_ids
+
+    def bulk_delete_sections(self, section_ids):
+        keys = validate_batch(as_key_rows(section_ids, 'section_id'), lambda key: (require_int(key, 'section_id'),),
+                              key=lambda value: value)
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                deleted = delete_rows(cur, "section", ("sid",), keys, "(%s::int)")
+                raise_if_missing(keys, deleted, "Section")
+                publish_change(cur, "section", [key[0] for key in keys])
+        for (sid,) in keys:
+            self.schedule_index.remove_section(sid)
+        return [key[0] for key in keys]
+
+    def import_sections_csv(self, stream):
+        """
+        Import a section CSV (the columns of ETL/FixedData/section.csv).
+
+        The upload is streamed into a temporary staging table with COPY, the
+        Transform checks (references, term, overcapacity, same-room overlap
+        with existing sections and within the file) run as set-based SQL, and
+        the rows that pass are merged into section: rows with a sid that
+        already exists replace it, the rest are inserted.
+
+        Args:
+            stream: Binary file-like object holding the CSV.
+
+        Returns:
+            dict: inserted and updated counts plus one rejected entry
+                ({"line", "sid", "error"}) per row that was skipped.
+
+        Raises:
+            ValueError: If the header or the CSV itself is malformed.
+        """
+        columns = read_import_header(stream)
         try:
-            if 'master_id' in section_data and not self.master_id_exists(section_data['master_id']):
-                raise ValueError(f"Master ID {section_data['master_id']} does not exist.")
-            
-            # Validate semester
-            self.validate_semester(section_data['class_id'], section_data['semester'])
-            
-            # Check for schedule conflicts
-            if self.check_schedule_conflict(section_data['room_id'], section_data.get('master_id')):
-                raise ValueError("Schedule conflict: Room is already booked for this time slot")
-            
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
-                    next_sid = self.get_next_sid()
+                    cur.execute(CREATE_STAGING_SQL)
+                    cur.copy_expert(
+                        f"COPY section_import ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, ENCODING 'UTF8')",
+                        stream
+                    )
+                    for statement in VALIDATE_IMPORT_SQL:
+                        cur.execute(statement)
+                    cur.execute(LOCK_IMPORT_ROOMS_SQL, (SECTION_ROOM_LOCK,))
+                    for statement in CONFLICT_IMPORT_SQL:
+                        cur.execute(statement)
+                    cur.execute(MERGE_IMPORT_SQL)
+                    merged = cur.fetchall()
+                    if merged:
+                        publish_change(cur, "section", [sid for sid, _ in merged])
+                    # +1 for the header line
                     cur.execute(
-                        """
-                        INSERT INTO section (
-                            sid,
-                            roomid, 
-                            mid,
-                            cid, 
-                            semester, 
-                            years, 
-                            capacity
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s) 
-                        RETURNING sid
-                        """,
-                        (
-                            next_sid,
-                            section_data['room_id'],
-                            section_data.get('master_id'),  # Use get to handle optional field
-                            section_data['class_id'],
-                            section_data['semester'],
-                            section_data['year'],
-                            section_data['capacity']
-                        )
+                        "SELECT line + 1, sid, error FROM section_import WHERE error IS NOT NULL ORDER BY line"
+                    )
+                    rejected = [{"line": line, "sid": sid, "error": error} for line, sid, error in cur.fetchall()]
+        except (psycopg2.errors.BadCopyFileFormat, psycopg2.errors.CharacterNotInRepertoire,
+                psycopg2.errors.UntranslatableCharacter) as e:
+            raise ValueError(f"Malformed CSV: {e.diag.message_primary}")
+        except psycopg2.errors.ExclusionViolation:
+            raise ValueError("Schedule conflict: Room is already booked for this time slot")
+
+        if merged:
+            # Rows may have moved between rooms and terms; rebuild on next use
+            self.schedule_index.invalidate()
+        inserted = sum(1 for _, is_insert in merged if is_insert)
+        return {
+            "inserted": inserted,
+            "updated": len(merged) - inserted,
+            "rejected": rejected,
+        }
+
+    def reset_section_sequence(self):
+        try:
+            with db_connection(self.db_url) as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "SELECT setval(pg_get_serial_sequence('section', 'sid'), "
+                        "COALESCE((SELECT MAX(sid) FROM section), 1), true)"
                     )
-                    return cur.fetchone()[0]
+        except psycopg2.Error as e:
+            print(f"Error resetting section sequence: {e}")
+
+    def _index_section(self, sid, section_data):
+        self.schedule_index.add_section(
+            sid,
+            section_data['room_id'],
+            section_data.get('master_id'),
+            section_data['semester'],
+            section_data['year'],
+        )
+
+    def insert_section(self, section_data):
+        try:
+            sid, _ = self._write_section(SECTION_INSERT_SQL, section_data)
+            self._index_section(sid, section_data)
+            return sid
         except psycopg2.Error as e:
             raise Exception(f"Database error: {str(e)}")
         except KeyError as e:
             raise Exception(f"Missing required field: {str(e)}")
 
-    def fetch_all_sections(self):
+    def fetch_all_sections(self, after=None, limit=None, filters=None):
+        """
+        Fetch sections ordered by sid, one keyset page at a time.
+
+        Args:
+            after (int): Return sections with sid greater than this.
+            limit (int): Page size; None returns every section.
+            filters (dict): Any of SECTION_FILTERS.
+
+        Returns:
+            Page: Section dicts, with next_after set if more remain.
+        """
+        query, params = keyset_query(SECTION_SELECT, ("sid",), SECTION_FILTERS, filters, after, limit)
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
-                    cur.execute("""
-                        SELECT sid as section_id, 
-                               roomid as room_id,
-                               mid as master_id, 
-                               cid as class_id, 
-                               semester, 
-                               years as year, 
-                               capacity 
-                        FROM section;
-                    """)
+                    cur.execute(query, params)
                     columns = [desc[0] for desc in cur.description]
                     results = cur.fetchall()
-                    return [dict(zip(columns, row)) for row in results]
+                    rows = [dict(zip(columns, row)) for row in results]
+                    return to_page(rows, limit, lambda row: (row['section_id'],))
         except psycopg2.Error as e:
             raise Exception(f"Database error: {str(e)}")
 
+    def fetch_all_sections_json(self, after=None, limit=None, filters=None):
+        """
+        Same page as fetch_all_sections, serialised to JSON by PostgreSQL.
+
+        Returns:
+            tuple: (JSON array text, next cursor or None)
+        """
+        query, params = keyset_query(SECTION_SELECT, ("sid",), SECTION_FILTERS, filters, after, limit)
+        query, params = json_page_query(query, params, limit, ("section_id",))
+        try:
+            with db_connection(self.db_url) as conn:
+                with conn.cursor() as cur:
+                    cur.execute(query, params)
+                    return cur.fetchone()
+        except psycopg2.Error as e:
+            raise Exception(f"Database error: {str(e)}")
+
+    def stream_all_sections(self, after=None, filters=None, batch_size=STREAM_BATCH_SIZE):
+        """
+        Stream every matching section through a server-side cursor.
+
+        Filters and the cursor are validated before anything is read, so a
+        bad request fails here rather than halfway through the response.
+
+        Returns:
+            generator: Section dicts in sid order.
+        """
+        query, params = keyset_query(SECTION_SELECT, ("sid",), SECTION_FILTERS, filters, after)
+        return iter_rows(self.db_url, query, params, batch_size)
+
     def fetch_section(self, section_id):
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
                     cur.execute("""
                         SELECT sid as section_id, 
@@ -170,50 +601,26 @@ class SectionModel:
 
     def update_section(self, section_id, section_data):
         try:
-            if 'master_id' in section_data and not self.master_id_exists(section_data['master_id']):
-                raise ValueError(f"Master ID {section_data['master_id']} does not exist.")
-            
-            # Validate semester
-            self.validate_semester(section_data['class_id'], section_data['semester'])
-            
-            # Check for schedule conflicts
-            if self.check_schedule_conflict(section_data['room_id'], section_data.get('master_id'), section_id):
-                raise ValueError("Schedule conflict: Room is already booked for this time slot")
-            
-            with psycopg2.connect(self.db_url) as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        UPDATE section 
-                        SET roomid = %s, 
-                            mid = %s,
-                            cid = %s,
-                            semester = %s, 
-                            years = %s,
-                            capacity = %s
-                        WHERE sid = %s
-                        """,
-                        (
-                            section_data['room_id'],
-                            section_data.get('master_id'),  # Use get to handle optional field
-                            section_data['class_id'],
-                            section_data['semester'],
-                            section_data['year'],
-                            section_data['capacity'],
-                            section_id,
-                        )
-                    )
-                    return cur.rowcount
+            _, updated_rows = self._write_section(SECTION_UPDATE_SQL, section_data, section_id)
+            if updated_rows:
+                self._index_section(section_id, section_data)
+            return updated_rows
         except psycopg2.Error as e:
             raise Exception(f"Database error: {str(e)}")
+        except KeyError as e:
+            raise Exception(f"Missing required field: {str(e)}")
 
     def delete_section(self, section_id):
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
                     # First get the section details before deleting
                     cur.execute("DELETE FROM section WHERE sid = %s RETURNING sid;", (section_id,))
                     deleted_id = cur.fetchone()
-                    return deleted_id[0] if deleted_id else None
+                    if deleted_id:
+                        publish_change(cur, "section", [deleted_id[0]])
+            if deleted_id:
+                self.schedule_index.remove_section(deleted_id[0])
+            return deleted_id[0] if deleted_id else None
         except psycopg2.Error as e:
             raise Exception(f"Database error: {str(e)}")
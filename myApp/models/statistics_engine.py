@@ -0,0 +1,175 @@
+# myApp/models/statistics_engine.py
+
+from myApp.extensions import db_connection, execute_prepared
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Row sources a statistic aggregates over: FROM clause, table aliases it provides, fixed condition
+STATISTIC_SOURCES = {
+    "room": ("room r", {"r"}, None),
+    "section": (
+        "section s JOIN room r ON r.rid = s.roomid JOIN class c ON c.cid = s.cid JOIN meeting m ON m.mid = s.mid",
+        {"s", "r", "c", "m"},
+        None,
+    ),
+    "requisite": ("requisite q JOIN class c ON c.cid = q.reqid", {"q", "c"}, "q.prereq = true"),
+}
+
+# Metric -> (source, aggregate). ratio is seats offered over seats available, in percent:
+# per room it is the average section capacity over the room capacity.
+STATISTIC_METRICS = {
+    "capacity": ("room", "SUM(r.capacity)"),
+    "section_count": ("section", "COUNT(*)"),
+    "offer_count": ("section", "COUNT(DISTINCT (s.years, lower(s.semester)))"),
+    "seat_count": ("section", "SUM(s.capacity)"),
+    "ratio": ("section", "ROUND(SUM(s.capacity)::numeric * 100 / NULLIF(SUM(r.capacity), 0), 2)"),
+    "prereq_count": ("requisite", "COUNT(*)"),
+}
+
+# Grouping -> (alias it needs, [(expression, output column)])
+STATISTIC_GROUPINGS = {
+    "building": ("r", [("r.building", "building")]),
+    "room": ("r", [("r.rid", "rid"), ("r.building", "building"), ("r.room_number", "room_number"),
+                   ("r.capacity", "room_capacity")]),
+    "class": ("c", [("c.cid", "cid"), ("c.cname", "cname"), ("c.ccode", "ccode")]),
+    "meeting": ("m", [("m.mid", "mid"), ("m.ccode", "ccode"), ("to_char(m.starttime, 'HH24:MI:SS')", "starttime"),
+                      ("to_char(m.endtime, 'HH24:MI:SS')", "endtime"), ("m.cdays", "cdays")]),
+    "semester": ("s", [("lower(s.semester)", "semester")]),
+    "year": ("s", [("s.years", "year")]),
+    "term": ("s", [("s.years", "year"), ("lower(s.semester)", "semester")]),
+}
+
+# Filter -> (alias it needs, condition with {} for the parameter, type of the value)
+STATISTIC_FILTERS = {
+    "building": ("r", "lower(r.building) = lower({})", str),
+    "room_id": ("r", "r.rid = {}", int),
+    "class_id": ("c", "c.cid = {}", int),
+    "meeting_id": ("m", "m.mid = {}", int),
+    "semester": ("s", "lower(s.semester) = lower({})", str),
+    "year": ("s", "s.years = {}", str),
+}
+
+STATISTIC_ORDERS = {"desc": "DESC", "asc": "ASC"}
+
+DEFAULT_STATISTIC_N = 3
+MAX_STATISTIC_N = int(os.getenv("MAX_STATISTIC_N", "100"))
+
+
+def compile_statistic(metric, group_by, per=None, filters=None, n=DEFAULT_STATISTIC_N, order="desc"):
+    """
+    Compile a top-N request into one ranked SQL statement.
+
+    Groups are ranked with window functions, so "per" returns the top N of
+    every partition (e.g. the top 3 classes of each term) in a single query.
+    Every name is checked against the whitelists above and every value is a
+    $n parameter: the SQL text only depends on the shape of the request,
+    which lets it be prepared once per connection and reused.
+
+    Args:
+        metric (str): Key in STATISTIC_METRICS.
+        group_by (str): Key in STATISTIC_GROUPINGS; one result row per group.
+        per (str): Optional key in STATISTIC_GROUPINGS to rank within.
+        filters (dict): Keys in STATISTIC_FILTERS mapped to their values.
+        n (int): Groups kept per partition, 1 to MAX_STATISTIC_N.
+        order (str): "desc" for the highest values, "asc" for the lowest.
+
+    Returns:
+        tuple: (sql, params) where sql uses $1, $2, ... placeholders.
+
+    Raises:
+        ValueError: If a name is unknown, does not apply to the metric, or n is out of range.
+    """
+    if metric not in STATISTIC_METRICS:
+        raise ValueError(f"Unknown metric '{metric}'. Valid metrics: {', '.join(STATISTIC_METRICS)}")
+    source, aggregate = STATISTIC_METRICS[metric]
+    from_clause, aliases, base_condition = STATISTIC_SOURCES[source]
+
+    if group_by is None:
+        raise ValueError(f"group_by is required. Valid groupings: {', '.join(STATISTIC_GROUPINGS)}")
+    groupings = [name for name in (per, group_by) if name is not None]
+    for name in groupings:
+        if name not in STATISTIC_GROUPINGS:
+            raise ValueError(f"Unknown grouping '{name}'. Valid groupings: {', '.join(STATISTIC_GROUPINGS)}")
+        if STATISTIC_GROUPINGS[name][0] not in aliases:
+            raise ValueError(f"Metric '{metric}' cannot be grouped by {name}.")
+    shared = per and {c for _, c in STATISTIC_GROUPINGS[per][1]} & {c for _, c in STATISTIC_GROUPINGS[group_by][1]}
+    if shared:
+        raise ValueError(f"Cannot rank {group_by} per {per}: they share columns.")
+    if order not in STATISTIC_ORDERS:
+        raise ValueError("order must be 'desc' or 'asc'.")
+    try:
+        n = int(n)
+    except (TypeError, ValueError):
+        raise ValueError("n must be an integer.")
+    if not 1 <= n <= MAX_STATISTIC_N:
+        raise ValueError(f"n must be between 1 and {MAX_STATISTIC_N}.")
+
+    conditions = [base_condition] if base_condition else []
+    params = []
+    for name, value in sorted((filters or {}).items()):
+        if name not in STATISTIC_FILTERS:
+            raise ValueError(f"Unknown filter '{name}'. Valid filters: {', '.join(STATISTIC_FILTERS)}")
+        alias, condition, value_type = STATISTIC_FILTERS[name]
+        if alias not in aliases:
+            raise ValueError(f"Metric '{metric}' cannot be filtered by {name}.")
+        try:
+            params.append(value_type(value))
+        except (TypeError, ValueError):
+            raise ValueError(f"Filter '{name}' must be of type {value_type.__name__}.")
+        conditions.append(condition.format(f"${len(params)}"))
+    params.append(n)
+
+    per_columns = STATISTIC_GROUPINGS[per][1] if per else []
+    group_columns = STATISTIC_GROUPINGS[group_by][1]
+    partition = f"PARTITION BY {', '.join(expr for expr, _ in per_columns)} " if per_columns else ""
+    direction = STATISTIC_ORDERS[order]
+    outputs = [column for _, column in per_columns + group_columns]
+
+    sql = f"""
+        SELECT {', '.join(outputs)}, value, rank
+        FROM (
+            SELECT {', '.join(f'{expr} AS {column}' for expr, column in per_columns + group_columns)},
+                   {aggregate} AS value,
+                   RANK() OVER ({partition}ORDER BY {aggregate} {direction}) AS rank,
+                   ROW_NUMBER() OVER ({partition}ORDER BY {aggregate} {direction},
+                                      {', '.join(expr for expr, _ in group_columns)}) AS position
+            FROM {from_clause}
+            {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+            GROUP BY {', '.join(expr for expr, _ in per_columns + group_columns)}
+        ) ranked
+        WHERE position <= ${len(params)}
+        ORDER BY {''.join(f'{column}, ' for _, column in per_columns)}position
+    """
+    return sql, params
+
+
+def get_top_statistic(db_url=None, as_json=False, **request):
+    """
+    Run a top-N statistic through a prepared statement.
+
+    Args:
+        db_url (str): Database connection URL. Defaults to DATABASE_URL.
+        as_json (bool): Let PostgreSQL serialise the rows and return JSON text.
+        **request: Arguments of compile_statistic.
+
+    Returns:
+        list|str: Rows as dicts (group columns, value, rank), or JSON array text.
+    """
+    if not db_url:
+        db_url = os.getenv("DATABASE_URL")
+    sql, params = compile_statistic(**request)
+    if as_json:
+        sql = f"SELECT coalesce(json_agg(q), '[]'::json)::text FROM ({sql}) q"
+    try:
+        with db_connection(db_url) as conn:
+            with conn.cursor() as cur:
+                execute_prepared(cur, sql, params)
+                if as_json:
+                    return cur.fetchone()[0]
+                columns = [desc[0] for desc in cur.description]
+                return [dict(zip(columns, row)) for row in cur.fetchall()]
+    except Exception as e:
+        logger.error(f"Error fetching {request.get('metric')} statistic: {e}")
+        raise
@@ -0,0 +1,306 @@
+# myApp/models/statistics_snapshot.py
+
+import pandas as pd
+import numpy as np
+import functools
+import threading
+import logging
+import time
+import os
+from myApp.extensions import db_connection
+
+logger = logging.getLogger(__name__)
+
+# Backend names accepted by the statistics controllers (STATISTICS_BACKEND)
+SQL_BACKEND = "sql"
+SNAPSHOT_BACKEND = "snapshot"
+STATISTICS_BACKENDS = (SQL_BACKEND, SNAPSHOT_BACKEND)
+DEFAULT_STATISTICS_BACKEND = os.getenv("STATISTICS_BACKEND", SQL_BACKEND)
+
+# Reload at least this often (seconds) even without change notifications, 0 = never
+SNAPSHOT_MAX_AGE_SECONDS = float(os.getenv("SNAPSHOT_MAX_AGE_SECONDS", "300"))
+
+# Statistic results kept per loaded snapshot before the memo is emptied
+SNAPSHOT_MAX_RESULTS = int(os.getenv("SNAPSHOT_MAX_RESULTS", "1024"))
+
+# Tables held in memory; a write to any of them makes the snapshot stale
+SNAPSHOT_QUERIES = {
+    "class": "SELECT cid, cname, ccode FROM class",
+    "room": "SELECT rid, building, room_number, capacity FROM room",
+    "meeting": """
+        SELECT mid, ccode, to_char(starttime, 'HH24:MI:SS') AS starttime,
+               to_char(endtime, 'HH24:MI:SS') AS endtime, cdays
+        FROM meeting
+    """,
+    "requisite": "SELECT classid, reqid, prereq FROM requisite",
+    "section": "SELECT sid, roomid, cid, mid, semester, years, capacity FROM section",
+}
+
+
+def _records(frame, columns):
+    """Rows of frame as plain Python dicts (no NumPy scalars), NaN as None."""
+    frame = frame[columns].astype(object)
+    return frame.where(frame.notna(), None).to_dict("records")
+
+
+def _round_half_up(values):
+    """Postgres round(numeric, 0): halves go away from zero, not to even."""
+    return np.sign(values) * np.floor(np.abs(values) + 0.5)
+
+
+def _memoized(method):
+    """
+    Compute a statistic once per loaded snapshot and arguments.
+
+    The frames never change once loaded, so neither does a result computed
+    from them; a reload starts with an empty memo. The method is called as
+    method(self, data, *args) with the current frames.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        data = self.data()
+        results = data["results"]
+        key = (method.__name__,) + tuple(str(arg).lower() for arg in args)
+        rows = results.get(key)
+        if rows is None:
+            rows = method(self, data, *args)
+            if len(results) >= SNAPSHOT_MAX_RESULTS:
+                results.clear()
+            results[key] = rows
+        return rows
+    return wrapper
+
+
+class StatisticsSnapshot:
+    """
+    The scheduling tables as pandas frames, answering the statistics in memory.
+
+    Strings that are filtered or grouped on (building, semester, year) are
+    stored as categoricals, so a filter compares integer codes and a
+    groupby runs over the codes. Each method returns the same rows as its
+    SQL counterpart in localStatistics_model / globalStatistics_model, and
+    is memoized until the next reload; returned rows are shared and must be
+    treated as read-only.
+
+    The frames are loaded on first use and reloaded on the next read after
+    apply_change() reports a write, or once SNAPSHOT_MAX_AGE_SECONDS have
+    passed. A reload builds new frames and swaps them in, so readers never
+    see a half-loaded snapshot.
+    """
+
+    def __init__(self, db_url, max_age=SNAPSHOT_MAX_AGE_SECONDS):
+        self.db_url = db_url
+        self.max_age = max_age
+        self._data = None
+        self._loaded_at = 0.0
+        self._stale = True
+        self._load_lock = threading.Lock()
+        self._stats = {"loads": 0, "load_seconds": 0.0, "changes": 0}
+
+    def _load(self):
+        started = time.perf_counter()
+        frames = {}
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                for table, query in SNAPSHOT_QUERIES.items():
+                    cur.execute(query)
+                    frames[table] = pd.DataFrame(cur.fetchall(), columns=[desc[0] for desc in cur.description])
+
+        room = frames["room"]
+        room["capacity"] = room["capacity"].astype("Int64")
+        room["building_key"] = room["building"].str.lower().astype("category")
+
+        section = frames["section"]
+        section["capacity"] = section["capacity"].astype("Int64")
+        section["semester_key"] = section["semester"].str.lower().astype("category")
+        section["years"] = section["years"].astype("category")
+        # Section rows already carrying their room, as the SQL joins them
+        frames["section_room"] = section.merge(
+            room[["rid", "building", "building_key", "room_number", "capacity"]].rename(
+                columns={"capacity": "room_capacity"}),
+            left_on="roomid", right_on="rid", how="inner"
+        )
+
+        frames["results"] = {}
+        self._stats["load_seconds"] = round(time.perf_counter() - started, 4)
+        return frames
+
+    def data(self):
+        """
+        Current frames, reloading them first if they are stale.
+
+        Returns:
+            dict: Table name -> DataFrame, plus "section_room" and the "results" memo. Read-only.
+        """
+        expired = self.max_age and time.monotonic() - self._loaded_at > self.max_age
+        if self._data is not None and not self._stale and not expired:
+            return self._data
+        with self._load_lock:
+            expired = self.max_age and time.monotonic() - self._loaded_at > self.max_age
+            if self._data is None or self._stale or expired:
+                # Cleared before reading, so a write during the load marks it stale again
+                self._stale = False
+                try:
+                    self._data = self._load()
+                except Exception:
+                    self._stale = True
+                    raise
+                self._loaded_at = time.monotonic()
+                self._stats["loads"] += 1
+            return self._data
+
+    def apply_change(self, entity, ids=None):
+        """ChangeListener handler: reload on the next read after a write to a snapshot table."""
+        if entity == "*" or entity in SNAPSHOT_QUERIES:
+            self._stale = True
+            self._stats["changes"] += 1
+
+    def stats(self):
+        """Loads so far, duration of the last one, and changes received."""
+        return dict(self._stats)
+
+    # Local statistics
+
+    @_memoized
+    def get_top_rooms_by_capacity(self, data, building):
+        """Get top 3 rooms with most capacity for a building."""
+        room = data["room"]
+        rooms = room[room["building_key"] == str(building).lower()]
+        rooms = rooms.sort_values(["capacity", "rid"], ascending=[False, True], na_position="first").head(3)
+        rooms = rooms.assign(rid=rooms["rid"].astype(str), capacity=rooms["capacity"].astype(str))
+        return _records(rooms, ["rid", "room_number", "capacity"])
+
+    @_memoized
+    def get_top_sections_by_ratio(self, data, building):
+        """Get top 3 rooms by average section capacity over room capacity in a building."""
+        sections = data["section_room"]
+        sections = sections[sections["building_key"] == str(building).lower()]
+        rooms = sections.groupby("rid", sort=False).agg(
+            building=("building", "first"),
+            room_number=("room_number", "first"),
+            capacity=("room_capacity", "first"),
+            section_capacity_avg=("capacity", "mean"),
+        ).reset_index()
+        rooms["ratio"] = _round_half_up(
+            rooms["section_capacity_avg"].astype(float) / rooms["capacity"].astype(float) * 100)
+        rooms = rooms.sort_values(["ratio", "rid"], ascending=[False, True]).head(3)
+        return _records(rooms, ["rid", "building", "room_number", "capacity", "section_capacity_avg", "ratio"])
+
+    @_memoized
+    def get_top_classes_per_room(self, data, room_id):
+        """Get top 3 most taught classes per room."""
+        section = data["section"]
+        sections = section[section["roomid"] == int(room_id)]
+        terms = sections["years"].astype(str) + sections["semester"].fillna("").astype(str)
+        counts = terms.groupby(sections["cid"]).nunique().rename("class_count").reset_index()
+        classes = counts.merge(data["class"], on="cid")
+        classes = classes.sort_values(["class_count", "cname", "cid"], ascending=[False, True, True]).head(3)
+        classes = classes.assign(cid=classes["cid"].astype(str))
+        return _records(classes, ["cid", "cname", "ccode", "class_count"])
+
+    @_memoized
+    def get_top_classes_per_semester(self, data, year, semester):
+        """Get top 3 most taught classes per semester."""
+        section = data["section"]
+        mask = (section["years"] == str(year)) & (section["semester_key"] == str(semester).lower())
+        counts = section.loc[mask].groupby("cid")["sid"].nunique().rename("class_count").reset_index()
+        classes = counts.merge(data["class"], on="cid")
+        classes = classes.sort_values(["class_count", "cid"], ascending=[False, True]).head(3)
+        classes = classes.assign(cid=classes["cid"].astype(str))
+        return _records(classes, ["cid", "cname", "class_count"])
+
+    # Global statistics
+
+    @_memoized
+    def get_top_meetings_by_sections(self, data):
+        """Get top 5 meetings with the most sections."""
+        counts = data["section"].groupby("mid").size().rename("section_count").reset_index()
+        meetings = counts.merge(data["meeting"], on="mid")
+        meetings = meetings.sort_values(["section_count", "mid"], ascending=[False, True]).head(5)
+        return _records(meetings, ["mid", "ccode", "starttime", "endtime", "cdays", "section_count"])
+
+    @_memoized
+    def get_top_classes_most_prerequisites(self, data):
+        """Get top 3 classes that appear the most as prerequisites."""
+        requisite = data["requisite"]
+        counts = requisite[requisite["prereq"] == True].groupby("reqid").size().rename("prereq_count")
+        classes = counts.reset_index().merge(data["class"], left_on="reqid", right_on="cid")
+        classes = classes.sort_values(["prereq_count", "cid"], ascending=[False, True]).head(3)
+        return _records(classes, ["cid", "cname", "ccode", "prereq_count"])
+
+    @_memoized
+    def get_top_classes_least_offered(self, data):
+        """Get top 3 classes that were offered the least."""
+        counts = data["section"].groupby("cid").size().rename("offer_count").reset_index()
+        classes = counts.merge(data["class"], on="cid")
+        classes = classes.sort_values(["offer_count", "cid"]).head(3)
+        return _records(classes, ["cid", "cname", "ccode", "offer_count"])
+
+    @_memoized
+    def get_total_sections_per_year(self, data):
+        """Get total number of sections per year."""
+        section = data["section"]
+        years = section.groupby("years", observed=True).size().rename("total_sections").reset_index()
+        years = years.assign(year=years["years"].astype(str)).sort_values("year")
+        return _records(years, ["year", "total_sections"])
+
+    def statistic(self, name):
+        """
+        Rows of a global statistic by its STATISTICS_QUERIES name.
+
+        Raises:
+            KeyError: If name is not a global statistic.
+        """
+        return {
+            "top_meetings": self.get_top_meetings_by_sections,
+            "most_prerequisites": self.get_top_classes_most_prerequisites,
+            "least_offered": self.get_top_classes_least_offered,
+            "sections_per_year": self.get_total_sections_per_year,
+        }[name]()
+
+    def dashboard(self, building=None, room_id=None, year=None, semester=None):
+        """Same dict as get_statistics_dashboard, computed from the snapshot."""
+        try:
+            room_id = None if room_id is None else int(room_id)
+        except (TypeError, ValueError):
+            raise ValueError("room_id must be an integer.")
+        buildings = sorted(self.data()["room"]["building"].dropna().unique().tolist())
+        building = building if building is not None else (buildings[0] if buildings else None)
+        return {
+            "building": building,
+            "buildings": buildings,
+            "top_meetings": self.statistic("top_meetings"),
+            "most_prerequisites": self.statistic("most_prerequisites"),
+            "least_offered": self.statistic("least_offered"),
+            "sections_per_year": self.statistic("sections_per_year"),
+            "room_capacity": self.get_top_rooms_by_capacity(building) if building is not None else [],
+            "room_ratio": self.get_top_sections_by_ratio(building) if building is not None else [],
+            "room_classes": self.get_top_classes_per_room(room_id) if room_id is not None else [],
+            "classes_by_semester": (
+                self.get_top_classes_per_semester(year, semester)
+                if year is not None and semester is not None else []
+            ),
+        }
+
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_statistics_snapshot(db_url=None):
+    """
+    Get the process-wide statistics snapshot for a database URL.
+
+    Args:
+        db_url (str): Database connection URL. Defaults to DATABASE_URL.
+
+    Returns:
+        StatisticsSnapshot: The snapshot (loaded on its first read).
+    """
+    db_url = db_url or os.getenv("DATABASE_URL")
+    with _snapshots_lock:
+        snapshot = _snapshots.get(db_url)
+        if snapshot is None:
+            snapshot = StatisticsSnapshot(db_url)
+            _snapshots[db_url] = snapshot
+        return snapshot
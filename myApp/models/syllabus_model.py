@@ -2,6 +2,13 @@
 
 import psycopg2
 from psycopg2.extras import execute_batch
+from myApp.extensions import db_connection, iter_rows
+from myApp.pagination import keyset_query, to_page, STREAM_BATCH_SIZE
+
+# Filters accepted by fetch_all_fragments
+SYLLABUS_FILTERS = {
+    "courseid": "courseid = %s",
+}
 
 class SyllabusModel:
     def __init__(self, db_url):
@@ -12,7 +19,7 @@ class SyllabusModel:
         Inserts a syllabus fragment into the database.
         """
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
                     cur.execute(
                         """
@@ -37,7 +44,7 @@ class SyllabusModel:
             VALUES (%s, %s, %s::vector, %s)
         """
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
                     data = [
                         (f["chunkid"], f["courseid"],
@@ -55,7 +62,7 @@ class SyllabusModel:
         Fetches a specific syllabus fragment by chunkid.
         """
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
                     cur.execute("SELECT * FROM syllabus WHERE chunkid = %s;", (chunkid,))
                     result = cur.fetchone()
@@ -67,27 +74,36 @@ class SyllabusModel:
             print(f"Error fetching fragment: {e}")
             return None
 
-    def fetch_all_fragments(self):
+    def fetch_all_fragments(self, after=None, limit=None, filters=None):
         """
-        Fetches all syllabus fragments from the database.
+        Fetches syllabus fragments ordered by chunkid, one keyset page at a time.
         """
+        query, params = keyset_query("SELECT * FROM syllabus", ("chunkid",), SYLLABUS_FILTERS, filters, after, limit)
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
-                    cur.execute("SELECT * FROM syllabus;")
+                    cur.execute(query, params)
                     results = cur.fetchall()
                     columns = [desc[0] for desc in cur.description]
-                    return [dict(zip(columns, row)) for row in results]
+                    rows = [dict(zip(columns, row)) for row in results]
+                    return to_page(rows, limit, lambda row: (row['chunkid'],))
         except psycopg2.Error as e:
             print(f"Error fetching all fragments: {e}")
             return []
 
+    def stream_all_fragments(self, after=None, filters=None, batch_size=STREAM_BATCH_SIZE):
+        """
+        Streams syllabus fragments through a server-side cursor, batch_size rows at a time.
+        """
+        query, params = keyset_query("SELECT * FROM syllabus", ("chunkid",), SYLLABUS_FILTERS, filters, after)
+        return iter_rows(self.db_url, query, params, batch_size)
+
     def delete_fragment(self, chunkid):
         """
         Deletes a specific syllabus fragment by chunkid.
         """
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            with db_connection(self.db_url) as conn:
                 with conn.cursor() as cur:
                     cur.execute("DELETE FROM syllabus WHERE chunkid = %s;", (chunkid,))
                     return cur.rowcount
@@ -111,7 +127,7 @@ class SyllabusModel:
             LIMIT %s;
         """
         embedding_str = f"[{', '.join(map(str, embedding))}]"  # Format the embedding as a vector string
-        with psycopg2.connect(self.db_url) as conn:
+        with db_connection(self.db_url) as conn:
             with conn.cursor() as cur:
                 cur.execute(query, (embedding_str, top_n))
                 rows = cur.fetchall()
@@ -0,0 +1,267 @@
+# myApp/models/utilization_model.py
+
+import numpy as np
+import threading
+import logging
+import time
+import os
+from myApp.extensions import db_connection
+from myApp.models.schedule_index import DAY_CODES, term_key
+
+logger = logging.getLogger(__name__)
+
+# Heatmap grid: days (letters of meeting.cdays) and slots of SLOT_MINUTES from DAY_START to DAY_END
+UTILIZATION_DAYS = os.getenv("UTILIZATION_DAYS", "LMWJV")
+UTILIZATION_SLOT_MINUTES = int(os.getenv("UTILIZATION_SLOT_MINUTES", "30"))
+UTILIZATION_DAY_START = int(os.getenv("UTILIZATION_DAY_START", str(7 * 60)))
+UTILIZATION_DAY_END = int(os.getenv("UTILIZATION_DAY_END", str(22 * 60)))
+
+# Terms kept in memory, and how long (seconds) one stays without change notifications (0 = forever)
+UTILIZATION_MAX_TERMS = int(os.getenv("UTILIZATION_MAX_TERMS", "32"))
+UTILIZATION_MAX_AGE_SECONDS = float(os.getenv("UTILIZATION_MAX_AGE_SECONDS", "300"))
+
+UTILIZATION_ROOMS_SQL = "SELECT rid, building, room_number FROM room ORDER BY rid"
+
+# One row per section of the term with its room, days and minute span
+UTILIZATION_SECTIONS_SQL = """
+    SELECT s.roomid, m.day_mask, lower(m.minutes), upper(m.minutes)
+    FROM section s
+    JOIN meeting m ON m.mid = s.mid
+    WHERE lower(s.semester) = %s AND s.years = %s
+    AND s.roomid IS NOT NULL AND m.day_mask IS NOT NULL AND NOT isempty(m.minutes)
+"""
+
+
+def slot_labels(day_start=UTILIZATION_DAY_START, day_end=UTILIZATION_DAY_END,
+                slot_minutes=UTILIZATION_SLOT_MINUTES):
+    """Start time ('HH:MM') of every slot of the grid."""
+    return [f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(day_start, day_end, slot_minutes)]
+
+
+def occupancy_bitsets(day_masks, starts, ends, days=UTILIZATION_DAYS, day_start=UTILIZATION_DAY_START,
+                      day_end=UTILIZATION_DAY_END, slot_minutes=UTILIZATION_SLOT_MINUTES):
+    """
+    Slot bitsets of many meetings at once.
+
+    A slot is busy when the meeting overlaps any part of it. Bit k of the
+    result is slot k of the day; days the meeting is not held are 0.
+
+    Args:
+        day_masks (ndarray): meeting.day_mask per meeting (bit d = weekday d).
+        starts (ndarray): Start minute per meeting.
+        ends (ndarray): End minute per meeting (exclusive).
+
+    Returns:
+        ndarray: uint64 array of shape (meetings, len(days)).
+    """
+    slots = -(-(day_end - day_start) // slot_minutes)
+    if slots > 63:
+        raise ValueError("The utilization grid allows at most 63 slots per day.")
+    first = np.clip((starts - day_start) // slot_minutes, 0, slots).astype(np.uint64)
+    last = np.clip(-(-(ends - day_start) // slot_minutes), 0, slots).astype(np.uint64)
+    width = np.where(last > first, last - first, 0).astype(np.uint64)
+    spans = ((np.uint64(1) << width) - np.uint64(1)) << first
+    weekdays = np.array([DAY_CODES[letter] for letter in days], dtype=np.int64)
+    held = (day_masks.astype(np.int64)[:, None] >> weekdays[None, :]) & 1
+    return np.where(held == 1, spans[:, None], np.uint64(0))
+
+
+def bitset_matrix(bitsets, slots):
+    """Expand uint64 slot bitsets (..., days) into a 0/1 array (..., days, slots)."""
+    return ((bitsets[..., None] >> np.arange(slots, dtype=np.uint64)) & np.uint64(1)).astype(np.int64)
+
+
+class TermUtilization:
+    """Occupancy bitsets of every room for one term."""
+
+    def __init__(self, semester, year, room_ids, buildings, room_numbers, bitsets, slots):
+        self.semester = semester
+        self.year = year
+        self.room_ids = room_ids          # ndarray of rid, in room order
+        self.buildings = buildings        # building per room
+        self.room_numbers = room_numbers  # room number per room
+        self.bitsets = bitsets            # uint64 (rooms, days): busy slots of each room and day
+        self.slots = slots
+        self.loaded_at = time.monotonic()
+
+    def _row(self, matrix, rooms):
+        capacity = rooms * matrix.shape[0] * self.slots
+        occupied = int(matrix.sum())
+        return {
+            "matrix": matrix.tolist(),
+            "occupied_slots": occupied,
+            "total_slots": capacity,
+            "utilization": round(occupied * 100 / capacity, 2) if capacity else 0.0,
+        }
+
+    def by_room(self, building=None, room_id=None):
+        """Heatmap of each room (1 = busy), optionally of one building or room."""
+        keep = np.ones(len(self.room_ids), dtype=bool)
+        if building is not None:
+            keep &= np.array([str(name).lower() == str(building).lower() for name in self.buildings], dtype=bool)
+        if room_id is not None:
+            keep &= self.room_ids == int(room_id)
+        matrices = bitset_matrix(self.bitsets[keep], self.slots)
+        return [
+            {"rid": int(rid), "building": name, "room_number": number, **self._row(matrix, 1)}
+            for rid, name, number, matrix in zip(
+                self.room_ids[keep], np.asarray(self.buildings, dtype=object)[keep],
+                np.asarray(self.room_numbers, dtype=object)[keep], matrices)
+        ]
+
+    def by_building(self, building=None):
+        """Heatmap of each building: number of its rooms busy in each slot."""
+        matrices = bitset_matrix(self.bitsets, self.slots)
+        names = np.asarray([name if name is not None else "" for name in self.buildings], dtype=object)
+        results = []
+        for name in sorted(set(names)):
+            if building is not None and name.lower() != str(building).lower():
+                continue
+            members = names == name
+            results.append({"building": name, "rooms": int(members.sum()),
+                            **self._row(matrices[members].sum(axis=0), int(members.sum()))})
+        return results
+
+
+class RoomUtilization:
+    """
+    Per-term room occupancy, computed with NumPy slot bitsets and cached per term.
+
+    Every section of a term becomes one uint64 per day whose bits are the
+    grid slots its meeting covers; a room's occupancy is the OR of its
+    sections' bitsets (np.bitwise_or.reduceat over the sections sorted by
+    room). A term is computed on first request and kept until a write to
+    section, meeting or room is reported through apply_change(), or for
+    UTILIZATION_MAX_AGE_SECONDS.
+    """
+
+    def __init__(self, db_url, max_terms=UTILIZATION_MAX_TERMS, max_age=UTILIZATION_MAX_AGE_SECONDS):
+        self.db_url = db_url
+        self.max_terms = max_terms
+        self.max_age = max_age
+        self.days = UTILIZATION_DAYS
+        self.slot_labels = slot_labels()
+        self._lock = threading.Lock()
+        self._terms = {}        # term_key -> TermUtilization
+        self._generation = 0    # bumped by writes, guards a computation racing one
+
+    def _compute(self, semester, year):
+        with db_connection(self.db_url) as conn:
+            with conn.cursor() as cur:
+                cur.execute(UTILIZATION_ROOMS_SQL)
+                rooms = cur.fetchall()
+                cur.execute(UTILIZATION_SECTIONS_SQL, term_key(semester, year))
+                sections = cur.fetchall()
+
+        slots = len(self.slot_labels)
+        room_ids = np.array([row[0] for row in rooms], dtype=np.int64)
+        bitsets = np.zeros((len(rooms), len(self.days)), dtype=np.uint64)
+        if sections:
+            rows = np.array(sections, dtype=np.int64)
+            # Sections of rooms that no longer exist are ignored
+            position = np.searchsorted(room_ids, rows[:, 0])
+            known = (position < len(room_ids)) & (room_ids[np.minimum(position, len(room_ids) - 1)] == rows[:, 0])
+            rows, position = rows[known], position[known]
+            if len(rows):
+                order = np.argsort(position, kind="stable")
+                rows, position = rows[order], position[order]
+                section_bits = occupancy_bitsets(rows[:, 1], rows[:, 2], rows[:, 3], days=self.days)
+                starts = np.flatnonzero(np.r_[True, position[1:] != position[:-1]])
+                bitsets[position[starts]] = np.bitwise_or.reduceat(section_bits, starts, axis=0)
+        return TermUtilization(
+            str(semester).lower(), str(year), room_ids,
+            [row[1] for row in rooms], [row[2] for row in rooms], bitsets, slots
+        )
+
+    def term(self, semester, year):
+        """
+        Occupancy of a term, computed on first use.
+
+        Args:
+            semester (str): Semester as stored in section.semester (any case).
+            year (int|str): Year as stored in section.years.
+
+        Returns:
+            TermUtilization: Room bitsets for the term.
+        """
+        key = term_key(semester, year)
+        with self._lock:
+            cached = self._terms.get(key)
+            if cached is not None and (not self.max_age or time.monotonic() - cached.loaded_at <= self.max_age):
+                return cached
+            generation = self._generation
+        computed = self._compute(semester, year)
+        with self._lock:
+            if self._generation == generation:
+                if key not in self._terms and len(self._terms) >= self.max_terms:
+                    self._terms.pop(next(iter(self._terms)))
+                self._terms[key] = computed
+        return computed
+
+    def heatmap(self, semester, year, by="room", building=None, room_id=None):
+        """
+        Day x slot occupancy and utilization for a term.
+
+        Args:
+            semester (str): Semester of the term.
+            year (int|str): Year of the term.
+            by (str): "room" for one 0/1 matrix per room, "building" for
+                per-slot counts of busy rooms per building.
+            building (str): Only rooms of this building.
+            room_id (int): Only this room (by="room").
+
+        Returns:
+            dict: semester, year, by, days, slots, slot_minutes and "results",
+            one entry per room or building with matrix, occupied_slots,
+            total_slots and utilization (percent).
+
+        Raises:
+            ValueError: If by is not "room" or "building".
+        """
+        if by not in ("room", "building"):
+            raise ValueError("by must be 'room' or 'building'.")
+        term = self.term(semester, year)
+        results = term.by_room(building, room_id) if by == "room" else term.by_building(building)
+        return {
+            "semester": term.semester,
+            "year": term.year,
+            "by": by,
+            "days": list(self.days),
+            "slots": self.slot_labels,
+            "slot_minutes": UTILIZATION_SLOT_MINUTES,
+            "results": results,
+        }
+
+    def invalidate(self):
+        """Forget every computed term."""
+        with self._lock:
+            self._generation += 1
+            self._terms.clear()
+
+    def apply_change(self, entity, ids=None):
+        """ChangeListener handler: recompute terms after writes to section, meeting or room."""
+        if entity in ("*", "section", "meeting", "room"):
+            self.invalidate()
+
+
+_utilizations = {}
+_utilizations_lock = threading.Lock()
+
+
+def get_room_utilization(db_url=None):
+    """
+    Get the process-wide room utilization cache for a database URL.
+
+    Args:
+        db_url (str): Database connection URL. Defaults to DATABASE_URL.
+
+    Returns:
+        RoomUtilization: The shared cache (terms are computed on first request).
+    """
+    db_url = db_url or os.getenv("DATABASE_URL")
+    with _utilizations_lock:
+        utilization = _utilizations.get(db_url)
+        if utilization is None:
+            utilization = RoomUtilization(db_url)
+            _utilizations[db_url] = utilization
+        return utilization
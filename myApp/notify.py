@@ -0,0 +1,202 @@
+# myApp/notify.py
+
+import psycopg2
+from psycopg2 import extensions as pg_extensions
+import threading
+import logging
+import select
+import json
+import uuid
+import os
+
+logger = logging.getLogger(__name__)
+
+# Postgres NOTIFY channel carrying row changes between processes
+CHANGE_CHANNEL = "vic_changes"
+
+# Entity name meaning "anything may have changed" (ETL reloads, missed notifications)
+ALL_ENTITIES = "*"
+
+# NOTIFY payloads must stay under 8000 bytes; bigger id lists become "all rows of the entity"
+MAX_PAYLOAD_BYTES = 7900
+
+# Seconds between checks for a stop request while waiting for notifications
+LISTEN_POLL_SECONDS = 5.0
+
+# Reconnect backoff after the listening connection fails
+LISTEN_RETRY_SECONDS = 1.0
+LISTEN_MAX_RETRY_SECONDS = 30.0
+
+# Identifies this process in notifications; pids repeat across hosts and containers
+# sharing the database, so a random token is used instead (regenerated after fork)
+_process_token = uuid.uuid4().hex
+
+
+def publish_change(cur, entity, ids=None):
+    """
+    Announce a write to every process listening on CHANGE_CHANNEL.
+
+    Call it with the cursor of the writing transaction: Postgres only
+    delivers the notification if and when that transaction commits.
+
+    Args:
+        cur (cursor): Cursor of the transaction that did the write.
+        entity (str): "class", "room", "meeting", "requisite", "section",
+            or ALL_ENTITIES.
+        ids (iterable): Primary keys written (tuples for composite keys).
+            None means every row of the entity.
+    """
+    ids = None if ids is None else [list(i) if isinstance(i, tuple) else i for i in ids]
+    payload = json.dumps({"entity": entity, "ids": ids, "origin": _process_token})
+    if len(payload) > MAX_PAYLOAD_BYTES:
+        payload = json.dumps({"entity": entity, "ids": None, "origin": _process_token})
+    cur.execute("SELECT pg_notify(%s, %s)", (CHANGE_CHANNEL, payload))
+
+
+class ChangeListener:
+    """
+    Background thread that LISTENs on CHANGE_CHANNEL and fans changes out.
+
+    Subscribers are called as handler(entity, ids) for writes made by other
+    processes; this process's own writes are skipped because its models
+    already updated their caches. Handlers subscribed with own=True get
+    the opposite: only this process's writes, once they are committed.
+    After a reconnect every subscriber gets (ALL_ENTITIES, None), since
+    notifications sent while the connection was down are lost.
+    """
+
+    def __init__(self, db_url):
+        self.db_url = db_url
+        self.pid = os.getpid()
+        self._handlers = []
+        self._own_handlers = []
+        self._handlers_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._stats = {"received": 0, "applied": 0, "reconnects": 0}
+        self._thread = threading.Thread(target=self._run, name="change-listener", daemon=True)
+
+    def subscribe(self, handler, own=False):
+        """Register handler(entity, ids) for changes made by other processes (or by this one, with own=True)."""
+        with self._handlers_lock:
+            handlers = self._own_handlers if own else self._handlers
+            if handler not in handlers:
+                handlers.append(handler)
+
+    def start(self):
+        """Start listening in a daemon thread."""
+        self._thread.start()
+
+    def stop(self):
+        """Ask the thread to exit; it does so within LISTEN_POLL_SECONDS."""
+        self._stop_event.set()
+
+    def stats(self):
+        """Notifications received from other processes, applied, and reconnects so far."""
+        return dict(self._stats)
+
+    def _dispatch(self, entity, ids, own=False):
+        with self._handlers_lock:
+            handlers = list(self._own_handlers if own else self._handlers)
+        for handler in handlers:
+            try:
+                handler(entity, ids)
+            except Exception as e:
+                logger.warning(f"Change handler failed for {entity}: {e}")
+
+    def _on_notify(self, payload):
+        try:
+            change = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed change notification: {payload!r}")
+            return
+        own = change.get("origin") == _process_token
+        ids = change.get("ids")
+        if ids is not None:
+            ids = [tuple(i) if isinstance(i, list) else i for i in ids]
+        self._dispatch(change.get("entity", ALL_ENTITIES), ids, own)
+        if not own:
+            self._stats["received"] += 1
+            self._stats["applied"] += 1
+
+    def _listen(self):
+        conn = psycopg2.connect(self.db_url)
+        try:
+            conn.set_isolation_level(pg_extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANGE_CHANNEL};")
+            if self._stats["reconnects"]:
+                self._dispatch(ALL_ENTITIES, None)
+                self._dispatch(ALL_ENTITIES, None, own=True)
+            while not self._stop_event.is_set():
+                if select.select([conn], [], [], LISTEN_POLL_SECONDS) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    payload = conn.notifies.pop(0).payload
+                    try:
+                        self._on_notify(payload)
+                    except Exception as e:
+                        logger.error(f"Failed to apply change notification {payload!r}: {e}")
+        finally:
+            conn.close()
+
+    def _run(self):
+        delay = LISTEN_RETRY_SECONDS
+        while not self._stop_event.is_set():
+            try:
+                self._listen()
+            except psycopg2.Error as e:
+                logger.warning(f"Change listener lost its connection: {e}")
+                self._stats["reconnects"] += 1
+                self._stop_event.wait(delay)
+                delay = min(delay * 2, LISTEN_MAX_RETRY_SECONDS)
+                continue
+            delay = LISTEN_RETRY_SECONDS
+
+
+_listeners = {}
+_listeners_lock = threading.Lock()
+
+
+def start_change_listener(db_url=None):
+    """
+    Start (once per process) the change listener for a database URL.
+
+    A listener inherited from a parent process (e.g. gunicorn --preload)
+    has no running thread in the child, so a new one is started there with
+    the same subscribers.
+
+    Args:
+        db_url (str): Database connection URL. Defaults to DATABASE_URL.
+
+    Returns:
+        ChangeListener: The running listener.
+    """
+    db_url = db_url or os.getenv("DATABASE_URL")
+    with _listeners_lock:
+        listener = _listeners.get(db_url)
+        if listener is not None and listener.pid == os.getpid():
+            return listener
+        previous = listener
+        listener = ChangeListener(db_url)
+        if previous is not None:
+            for handler in previous._handlers:
+                listener.subscribe(handler)
+            for handler in previous._own_handlers:
+                listener.subscribe(handler, own=True)
+        listener.start()
+        _listeners[db_url] = listener
+        return listener
+
+
+def _restart_listeners_after_fork():
+    global _listeners_lock, _process_token
+    _listeners_lock = threading.Lock()
+    _process_token = uuid.uuid4().hex
+    for db_url, listener in list(_listeners.items()):
+        if listener.pid != os.getpid():
+            start_change_listener(db_url)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listeners_after_fork)
@@ -0,0 +1,219 @@
+# myApp/pagination.py
+
+import json
+from flask import Response, stream_with_context
+
+# Page sizes for the list endpoints (GET /class, /section, ...)
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+# Response header carrying the cursor for the next page
+NEXT_PAGE_HEADER = "X-Next-After"
+
+# Rows fetched per round trip when streaming a whole table (?format=ndjson)
+STREAM_BATCH_SIZE = 1000
+
+# Query parameters that control the response rather than filter rows
+RESERVED_ARGS = ("after", "limit", "format")
+
+
+class Page(list):
+    """
+    One page of rows from a fetch_all_* method.
+
+    Behaves like the plain list those methods used to return; next_after is
+    the cursor for the following page, or None on the last page.
+    """
+
+    def __init__(self, rows=(), next_after=None):
+        super().__init__(rows)
+        self.next_after = next_after
+
+
+def keyset_query(select_sql, key_columns, filter_sql, filters=None, after=None, limit=None):
+    """
+    Add filters, a keyset cursor, ORDER BY and LIMIT to a SELECT.
+
+    Args:
+        select_sql (str): SELECT ... FROM ... without WHERE/ORDER BY.
+        key_columns (tuple): Columns of the unique sort key, e.g. ("sid",).
+        filter_sql (dict): Filter name -> SQL condition with one %s placeholder.
+        filters (dict): Filter name -> value; None or "" values are ignored.
+        after (str|int|tuple): Key of the last row already seen. Composite keys
+            may be given as a comma-separated string ("12,7").
+        limit (int): Page size; None returns every remaining row.
+
+    Returns:
+        tuple: (query, params). The query fetches one extra row so to_page()
+            can tell whether another page exists.
+
+    Raises:
+        ValueError: On an unknown filter or a malformed cursor.
+    """
+    clauses, params = [], []
+    for name, value in (filters or {}).items():
+        if value is None or value == "":
+            continue
+        if name not in filter_sql:
+            raise ValueError(f"Unknown filter '{name}'. Allowed: {', '.join(sorted(filter_sql))}")
+        clauses.append(filter_sql[name])
+        params.append(value)
+
+    if after is not None and after != "":
+        if isinstance(after, str):
+            keys = after.split(",")
+        elif isinstance(after, (list, tuple)):
+            keys = list(after)
+        else:
+            keys = [after]
+        if len(keys) != len(key_columns):
+            raise ValueError(f"Invalid cursor '{after}': expected {len(key_columns)} value(s)")
+        placeholders = ", ".join(["%s"] * len(keys))
+        clauses.append(f"({', '.join(key_columns)}) > ({placeholders})")
+        params.extend(keys)
+
+    query = select_sql
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY " + ", ".join(key_columns)
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit + 1)
+    return query, params
+
+
+def json_page_query(query, params, limit, cursor_fields):
+    """
+    Wrap a keyset_query() so PostgreSQL returns the page as JSON text.
+
+    The row fetched past the limit is left out of the array and only used
+    to decide whether there is a next page.
+
+    Args:
+        query (str): Query from keyset_query().
+        params (list): Its parameters.
+        limit (int): Page size, or None for every row.
+        cursor_fields (tuple): Output column names that make up the cursor, in key order.
+
+    Returns:
+        tuple: (query, params) selecting (json_text, next_after or NULL).
+    """
+    # Neither window numbering nor aggregates follow the subquery's ORDER BY, so both repeat it
+    order = ", ".join(f'q."{field}"' for field in cursor_fields)
+    if limit is None:
+        return f"SELECT coalesce(json_agg(q ORDER BY {order}), '[]'::json)::text, NULL FROM ({query}) q", params
+    cursor = "concat_ws(',', " + ", ".join(f"j->>'{field}'" for field in cursor_fields) + ")"
+    wrapped = f"""
+        SELECT coalesce(json_agg(j ORDER BY n) FILTER (WHERE n <= %s), '[]'::json)::text,
+               CASE WHEN count(*) > %s THEN max({cursor}) FILTER (WHERE n = %s) END
+        FROM (SELECT row_to_json(q) AS j, row_number() OVER (ORDER BY {order}) AS n FROM ({query}) q) t
+    """
+    return wrapped, [limit, limit, limit] + list(params)
+
+
+def json_response(body, envelope=None, headers=None):
+    """
+    Send JSON text built by PostgreSQL without parsing it in Python.
+
+    Args:
+        body (str): JSON text (usually an array from fetch_json/json_page_query).
+        envelope (dict): Optional wrapper; body is added to it under "data".
+        headers (dict): Extra response headers.
+
+    Returns:
+        Response: application/json response.
+    """
+    if envelope is not None:
+        prefix = json.dumps(envelope)[:-1] + (", " if envelope else "")
+        body = prefix + '"data": ' + body + "}"
+    return Response(body, mimetype="application/json", headers=headers)
+
+
+def to_page(rows, limit, key):
+    """
+    Trim the extra row fetched by keyset_query() and compute the next cursor.
+
+    Args:
+        rows (list): Rows returned by the query.
+        limit (int): Requested page size, or None.
+        key (callable): Row -> tuple of key values.
+
+    Returns:
+        Page: At most limit rows, with next_after set if more rows exist.
+    """
+    if limit is None or len(rows) <= limit:
+        return Page(rows)
+    rows = rows[:limit]
+    return Page(rows, ",".join(str(value) for value in key(rows[-1])))
+
+
+def page_args(args):
+    """
+    Read paging and filter parameters from a request's query string.
+
+    Every parameter other than after, limit and format is passed on as a
+    filter; the model rejects filters it does not support.
+
+    Args:
+        args (MultiDict): request.args.
+
+    Returns:
+        dict: after, limit and filters keyword arguments for fetch_all_*.
+
+    Raises:
+        ValueError: If limit is not a positive integer.
+    """
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be positive")
+
+    return {
+        "after": args.get("after"),
+        "limit": min(limit, MAX_PAGE_SIZE),
+        "filters": {name: value for name, value in args.items() if name not in RESERVED_ARGS},
+    }
+
+
+def wants_stream(args):
+    """True when the client asked for the whole table as NDJSON (?format=ndjson)."""
+    return args.get("format") == "ndjson"
+
+
+def stream_args(args):
+    """Like page_args(), minus limit: a stream always runs to the end of the table."""
+    return {
+        "after": args.get("after"),
+        "filters": {name: value for name, value in args.items() if name not in RESERVED_ARGS},
+    }
+
+
+def ndjson_response(rows):
+    """
+    Stream rows as newline-delimited JSON, one object per line.
+
+    Args:
+        rows (iterable): Dicts, typically from extensions.iter_rows().
+
+    Returns:
+        Response: A chunked application/x-ndjson response.
+    """
+    def generate():
+        try:
+            for row in rows:
+                yield json.dumps(row, default=str) + "\n"
+        finally:
+            # Give the pooled connection back even if the client disconnects
+            close = getattr(rows, "close", None)
+            if close is not None:
+                close()
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+def page_headers(page):
+    """Headers advertising the next page's cursor, if there is one."""
+    next_after = getattr(page, "next_after", None)
+    return {NEXT_PAGE_HEADER: next_after} if next_after is not None else {}
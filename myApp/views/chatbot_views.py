@@ -2,14 +2,27 @@
 from flask import Blueprint, request, jsonify
 from myApp.controllers.chatbot_controller import ChatbotController
 from myApp.controllers.auth_controller import AuthController
+from myApp.embeddings import get_embedding_model
+from myApp.warmup import lazy_resource, NotReadyError, WARMUP_RETRY_AFTER
 
 # Create blueprint for chatbot routes
 chatbot_blueprint = Blueprint('chatbot', __name__)
 
-# Initialize chatbot controller
-chatbot_controller = ChatbotController()
+# The chatbot controller (database and Ollama checks) and its embedding model are
+# built on first use or by the warm-up thread, not when the app is imported
+lazy_resource("embedding_model", lambda: get_embedding_model().model)
+chatbot_resource = lazy_resource("chatbot_controller", ChatbotController)
 auth_controller = AuthController()
 
+def get_chatbot_controller():
+    """The chatbot controller; raises NotReadyError while the warm-up is still building it."""
+    return chatbot_resource.get(wait=False)
+
+def format_not_ready(error):
+    response = jsonify({'status': 'loading', 'message': str(error)})
+    response.headers['Retry-After'] = str(WARMUP_RETRY_AFTER)
+    return response, 503
+
 @chatbot_blueprint.route('/chatbot', methods=['POST'])
 def chat():
     print("\n=== Chatbot API Request ===")
@@ -27,7 +40,7 @@ def chat():
         
         # Process question and verify storage
         try:
-            response = chatbot_controller.process_question_with_logging(question, user_id)
+            response = get_chatbot_controller().process_question_with_logging(question, user_id)
             print(f"Generated response: {response}")
             
             # Verify data was stored
@@ -46,10 +59,36 @@ def chat():
             print(f"Error in controller: {str(e)}")
             raise
 
+    except NotReadyError as e:
+        return format_not_ready(e)
     except Exception as e:
         print(f"Error in chat endpoint: {str(e)}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@chatbot_blueprint.route('/chatbot/plan', methods=['POST'])
+def plan():
+    try:
+        data = request.get_json() or {}
+        if not data.get('terms'):
+            return jsonify({'status': 'error', 'message': 'Missing terms'}), 400
+
+        user_id = data.get('user_id', 'anonymous')
+        response = get_chatbot_controller().plan_courses(
+            data.get('completed', []),
+            data['terms'],
+            data.get('max_credits'),
+            user_id
+        )
+        return jsonify({'status': 'success', 'data': response, 'user_id': user_id}), 200
+
+    except NotReadyError as e:
+        return format_not_ready(e)
+    except ValueError as ve:
+        return jsonify({'status': 'error', 'message': str(ve)}), 400
+    except Exception as e:
+        print(f"Error in plan endpoint: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 @chatbot_blueprint.route('/knowledge', methods=['POST'])
 def store_knowledge():
     # Validate auth token
@@ -67,12 +106,14 @@ def store_knowledge():
             return jsonify({"error": "Content is required"}), 400
 
         # Store knowledge with user attribution
-        result = chatbot_controller.store_knowledge(
+        result = get_chatbot_controller().store_knowledge(
             content=data['content'],
             user_id=user_info['user_id']
         )
         return jsonify(result), 201
 
+    except NotReadyError as e:
+        return format_not_ready(e)
     except ValueError as ve:
         return jsonify({"error": str(ve)}), 401
     except Exception as e:
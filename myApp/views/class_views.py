@@ -2,6 +2,8 @@
 
 from flask import Blueprint, request, jsonify, current_app
 from myApp.controllers.class_controller import ClassController
+from myApp.bulk import BulkValidationError, bulk_request_rows, bulk_error_payload
+from myApp.pagination import page_args, wants_stream, stream_args, ndjson_response, json_response, NEXT_PAGE_HEADER
 
 class_blueprint = Blueprint('class', __name__)
 controller = None
@@ -36,13 +38,35 @@ def create_class():
     except Exception as e:
         return format_class_error(str(e))
 
+@class_blueprint.route('/class/bulk', methods=['POST', 'PUT', 'DELETE'])
+def bulk_classes():
+    """Create (POST), update (PUT) or delete (DELETE) many classes in one transaction."""
+    try:
+        rows = bulk_request_rows(request.get_json())
+        if request.method == 'POST':
+            ids, message, status = controller.bulk_create_classes(rows), "Classes created successfully", 201
+        elif request.method == 'PUT':
+            ids, message, status = controller.bulk_update_classes(rows), "Classes updated successfully", 200
+        else:
+            ids, message, status = controller.bulk_delete_classes(rows), "Classes deleted successfully", 200
+        response = {
+            "message": message,
+            "data": {"class_ids": ids, "count": len(ids)}
+        }
+        return jsonify(response), status
+    except BulkValidationError as e:
+        return jsonify(bulk_error_payload(e)), 400
+    except Exception as e:
+        return format_class_error(str(e))
+
 @class_blueprint.route('/class', methods=['GET'])
 def get_all_classes():
     try:
-        classes = controller.get_all_classes()
-        if not classes:
-            return format_class_error("No classes found.")
-        return format_class_response(classes)
+        if wants_stream(request.args):
+            return ndjson_response(controller.stream_classes(**stream_args(request.args)))
+        # PostgreSQL builds the JSON; the rows never become Python dicts
+        body, next_after = controller.get_all_classes_json(**page_args(request.args))
+        return json_response(body, headers={NEXT_PAGE_HEADER: next_after} if next_after else None)
     except Exception as e:
         return format_class_error(str(e))
 
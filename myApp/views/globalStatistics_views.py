@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request
 import logging
 from myApp.controllers.globalStatistics_controller import GlobalStatisticsController
+from myApp.pagination import json_response
 from config.local_config import DATABASE_URL
 from datetime import time
 
@@ -30,6 +31,12 @@ def format_statistics_response(data):
     
     return jsonify({'data': formatted_data, 'message': 'Success'}), 200
 
+def format_statistics_json(body):
+    # body is JSON text built by PostgreSQL; wrap it without parsing it
+    if body == "[]":
+        return json_response(body, {'message': 'No data found'})
+    return json_response(body, {'message': 'Success'})
+
 def format_statistics_error(error_message):
     return jsonify({'error': error_message}), 400
 
@@ -37,8 +44,8 @@ def format_statistics_error(error_message):
 def top_meetings_with_most_sections():
     """Endpoint for top 5 meetings with the most sections."""
     try:
-        results = controller.top_meetings_with_most_sections()
-        return format_statistics_response(results)
+        results = controller.statistic_json("top_meetings")
+        return format_statistics_json(results)
     except Exception as e:
         logger.error(f"Error in top_meetings_with_most_sections endpoint: {e}")
         return format_statistics_error(str(e))
@@ -47,8 +54,8 @@ def top_meetings_with_most_sections():
 def top_classes_most_prerequisites():
     """Endpoint for top 3 classes that appear the most as prerequisites."""
     try:
-        results = controller.top_classes_most_prerequisites()
-        return format_statistics_response(results)
+        results = controller.statistic_json("most_prerequisites")
+        return format_statistics_json(results)
     except Exception as e:
         logger.error(f"Error in top_classes_most_prerequisites endpoint: {e}")
         return format_statistics_error(str(e))
@@ -57,8 +64,8 @@ def top_classes_most_prerequisites():
 def top_classes_least_offered():
     """Endpoint for top 3 classes that were offered the least."""
     try:
-        results = controller.top_classes_least_offered()
-        return format_statistics_response(results)
+        results = controller.statistic_json("least_offered")
+        return format_statistics_json(results)
     except Exception as e:
         logger.error(f"Error in top_classes_least_offered endpoint: {e}")
         return format_statistics_error(str(e))
@@ -67,8 +74,37 @@ def top_classes_least_offered():
 def total_sections_per_year():
     """Endpoint for total number of sections per year."""
     try:
-        results = controller.total_sections_per_year()
-        return format_statistics_response(results)
+        results = controller.statistic_json("sections_per_year")
+        return format_statistics_json(results)
     except Exception as e:
         logger.error(f"Error in total_sections_per_year endpoint: {e}")
-        return format_statistics_error(str(e))
\ No newline at end of file
+        return format_statistics_error(str(e))
+
+@global_statistics_bp.route('/statistics/dashboard', methods=['GET', 'POST'])
+def statistics_dashboard():
+    """Endpoint for every global statistic plus the local ones for building, room_id, year and semester."""
+    try:
+        params = request.get_json(silent=True) if request.method == 'POST' else None
+        params = params if isinstance(params, dict) else request.args
+        body = controller.dashboard(
+            building=params.get('building'),
+            room_id=params.get('room_id'),
+            year=params.get('year'),
+            semester=params.get('semester'),
+            as_json=True
+        )
+        return json_response(body, {'message': 'Success'})
+    except Exception as e:
+        logger.error(f"Error in statistics_dashboard endpoint: {e}")
+        return format_statistics_error(str(e))
+
+@global_statistics_bp.route('/statistics/top', methods=['GET', 'POST'])
+def top_statistic():
+    """Endpoint for any top-N statistic: metric, group_by, per, n, order and filters."""
+    try:
+        params = request.get_json(silent=True) if request.method == 'POST' else None
+        results = controller.top_statistic_json(params if isinstance(params, dict) else request.args.to_dict())
+        return format_statistics_json(results)
+    except Exception as e:
+        logger.error(f"Error in top_statistic endpoint: {e}")
+        return format_statistics_error(str(e))
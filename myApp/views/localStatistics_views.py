@@ -50,3 +50,18 @@ def top_classes_by_semester(year, semester):
         return format_statistics_response(results)
     except Exception as e:
         return format_statistics_error(str(e))
+
+@statistics_bp.route('/utilization/<int:year>/<semester>', methods=['GET', 'POST'])
+def room_utilization(year, semester):
+    """Occupancy heatmap of a term; query args: by (room|building), building, room_id."""
+    try:
+        results = controller.utilization(
+            year,
+            semester.lower(),
+            by=request.args.get('by', 'room'),
+            building=request.args.get('building') or None,
+            room_id=request.args.get('room_id') or None
+        )
+        return format_statistics_response(results)
+    except Exception as e:
+        return format_statistics_error(str(e))
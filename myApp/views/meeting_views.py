@@ -2,6 +2,8 @@
 
 from flask import Blueprint, request, jsonify
 from myApp.controllers.meeting_controller import MeetingController
+from myApp.bulk import BulkValidationError, bulk_request_rows, bulk_error_payload
+from myApp.pagination import page_args, json_response, NEXT_PAGE_HEADER
 from config.local_config import DATABASE_URL
 from datetime import datetime
 
@@ -43,19 +45,42 @@ def create_meeting():
             }
         }
         return jsonify(response), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@meeting_blueprint.route('/meeting/bulk', methods=['POST', 'PUT', 'DELETE'])
+def bulk_meetings():
+    """Create (POST), update (PUT) or delete (DELETE) many meetings in one transaction."""
+    try:
+        rows = bulk_request_rows(request.get_json())
+        if request.method == 'POST':
+            ids, message, status = controller.bulk_create_meetings(rows), "Meetings created successfully", 201
+        elif request.method == 'PUT':
+            ids, message, status = controller.bulk_update_meetings(rows), "Meetings updated successfully", 200
+        else:
+            ids, message, status = controller.bulk_delete_meetings(rows), "Meetings deleted successfully", 200
+        response = {
+            "message": message,
+            "data": {"meeting_ids": ids, "count": len(ids)}
+        }
+        return jsonify(response), status
+    except BulkValidationError as e:
+        return jsonify(bulk_error_payload(e)), 400
+    except Exception as e:
+        return format_meeting_error(str(e))
+
 @meeting_blueprint.route('/meeting', methods=['GET'])
 def get_all_meetings():
     try:
-        meetings = controller.get_all_meetings()
+        # PostgreSQL builds the JSON (times already formatted) and it is sent as-is
+        body, next_after = controller.get_all_meetings_json(**page_args(request.args))
         response = {
             "status": "success",
-            "message": "Meetings retrieved successfully",
-            "data": meetings
+            "message": "Meetings retrieved successfully"
         }
-        return jsonify(response), 200
+        return json_response(body, response, {NEXT_PAGE_HEADER: next_after} if next_after else None)
     except Exception as e:
         return format_meeting_error(str(e))
 
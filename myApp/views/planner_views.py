@@ -0,0 +1,27 @@
+# myApp/views/planner_views.py
+
+from flask import Blueprint, jsonify, request
+from myApp.controllers.planner_controller import PlannerController
+from config.local_config import DATABASE_URL
+
+planner_blueprint = Blueprint('planner', __name__)
+controller = PlannerController(DATABASE_URL)
+
+def format_planner_response(data):
+    return jsonify(data), 200
+
+def format_planner_error(error_message):
+    return jsonify({'error': error_message}), 400
+
+@planner_blueprint.route('/planner/plan', methods=['POST'])
+def plan_courses():
+    """Body: {"completed": [cid, ...], "terms": [{"semester": "Fall", "year": 2025}, ...], "max_credits": 16}."""
+    try:
+        data = request.get_json() or {}
+        return format_planner_response(controller.plan(
+            data.get('completed', []),
+            data.get('terms'),
+            data.get('max_credits')
+        ))
+    except Exception as e:
+        return format_planner_error(str(e))
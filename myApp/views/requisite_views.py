@@ -2,6 +2,8 @@
 
 from flask import Blueprint, request, jsonify, current_app
 from myApp.controllers.requisite_controller import RequisiteController
+from myApp.bulk import BulkValidationError, bulk_request_rows, bulk_error_payload
+from myApp.pagination import page_args, page_headers
 from config.local_config import DATABASE_URL
 
 requisite_blueprint = Blueprint('requisite_blueprint', __name__)
@@ -39,13 +41,32 @@ def create_requisite():
     except Exception as e:
         return format_requisite_error(str(e))
 
+@requisite_blueprint.route('/requisite/bulk', methods=['POST', 'PUT', 'DELETE'])
+def bulk_requisites():
+    """Create (POST), update (PUT) or delete (DELETE) many requisites in one transaction."""
+    try:
+        rows = bulk_request_rows(request.get_json())
+        if request.method == 'POST':
+            ids, message, status = controller.bulk_create_requisites(rows), "Requisites created successfully", 201
+        elif request.method == 'PUT':
+            ids, message, status = controller.bulk_update_requisites(rows), "Requisites updated successfully", 200
+        else:
+            ids, message, status = controller.bulk_delete_requisites(rows), "Requisites deleted successfully", 200
+        response = {
+            "message": message,
+            "data": {"requisites": ids, "count": len(ids)}
+        }
+        return jsonify(response), status
+    except BulkValidationError as e:
+        return jsonify(bulk_error_payload(e)), 400
+    except Exception as e:
+        return format_requisite_error(str(e))
+
 @requisite_blueprint.route('/requisite', methods=['GET'])
 def get_all_requisites():
     try:
-        requisites = controller.get_all_requisites()
-        if not requisites:
-            return format_requisite_error("No requisites found.")
-        return format_requisite_response(requisites)
+        requisites = controller.get_all_requisites(**page_args(request.args))
+        return jsonify(requisites), 200, page_headers(requisites)
     except Exception as e:
         return format_requisite_error(str(e))
 
@@ -97,3 +118,24 @@ def delete_requisite(classid, reqid):
         return format_requisite_error('Requisite not found')
     except Exception as e:
         return format_requisite_error(str(e))
+
+@requisite_blueprint.route('/class/<int:cid>/prerequisite-chain', methods=['GET'])
+def get_prerequisite_chain(cid):
+    try:
+        return format_requisite_response(controller.get_prerequisite_chain(cid))
+    except Exception as e:
+        return format_requisite_error(str(e))
+
+@requisite_blueprint.route('/class/<int:cid>/unlocks', methods=['GET'])
+def get_unlocks(cid):
+    try:
+        return format_requisite_response(controller.get_unlocks(cid))
+    except Exception as e:
+        return format_requisite_error(str(e))
+
+@requisite_blueprint.route('/requisite/graph', methods=['GET'])
+def get_requisite_graph():
+    try:
+        return format_requisite_response(controller.get_requisite_graph())
+    except Exception as e:
+        return format_requisite_error(str(e))
@@ -1,7 +1,10 @@
 # myApp/views/room_views.py
 
+import psycopg2
 from flask import Blueprint, request, jsonify
 from myApp.controllers.room_controller import RoomController
+from myApp.bulk import BulkValidationError, bulk_request_rows, bulk_error_payload
+from myApp.pagination import page_args, page_headers
 from config.local_config import DATABASE_URL
 
 room_blueprint = Blueprint('room_blueprint', __name__)
@@ -29,10 +32,16 @@ def create_room():
 @room_blueprint.route("/room", methods=["GET"]) 
 def get_all_rooms():
     if request.method == "GET":
-            temp = controller.get_all_rooms()
-
-            if temp:
-                return jsonify(temp), 200
+            try:
+                paging = page_args(request.args)
+                temp = controller.get_all_rooms(**paging)
+            # DataError: a cursor or filter value of the wrong type (e.g. ?after=abc)
+            except (ValueError, psycopg2.DataError) as e:
+                return jsonify(f"Invalid Input, {str(e).splitlines()[0]}"), 400
+
+            # An empty page (no match, or a cursor past the end) is not an error
+            if temp is not None:
+                return jsonify(temp), 200, page_headers(temp)
         
             else:
                 return jsonify("Error getting rooms"), 502
@@ -41,6 +50,46 @@ def get_all_rooms():
         return jsonify("No valid method or input attached."), 500
     
 
+@room_blueprint.route("/room/bulk", methods=["POST", "PUT", "DELETE"])
+def bulk_rooms():
+    # Create (POST), update (PUT) or delete (DELETE) many rooms in one transaction
+    try:
+        rows = bulk_request_rows(request.get_json())
+        if request.method == "POST":
+            temp = controller.bulk_create_rooms(rows)
+            return jsonify(rids = temp, count = len(temp)), 201
+        elif request.method == "PUT":
+            temp = controller.bulk_update_rooms(rows)
+        else:
+            temp = controller.bulk_delete_rooms(rows)
+        return jsonify(rids = temp, count = len(temp)), 200
+
+    except BulkValidationError as e:
+        return jsonify(bulk_error_payload(e)), 400
+
+    except ValueError as e:
+        return jsonify(f"Invalid Input, {e}"), 400
+
+    # Database errors (e.g. deleting a room sections still use), as on the other bulk endpoints
+    except Exception as e:
+        return jsonify(f"Invalid Input, {str(e).splitlines()[0]}"), 400
+
+
+@room_blueprint.route("/room/free", methods=["GET"])
+def get_free_rooms():
+    # e.g. /room/free?days=MJ&start=10:30&end=11:45&semester=Fall&year=2024&capacity=30
+    if request.method == "GET":
+            temp = controller.find_free_rooms(request.args)
+
+            if type(temp) == str:
+                return jsonify(temp), 400
+
+            return jsonify(temp), 200
+
+    else:
+        return jsonify("No valid method or input attached."), 500
+
+
 @room_blueprint.route("/room/<int:room_id>", methods=["GET"]) 
 def get_room_by_id(room_id):
     if request.method == "GET":
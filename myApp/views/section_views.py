@@ -2,6 +2,8 @@
 
 from flask import Blueprint, jsonify, request
 from myApp.controllers.section_controller import SectionController
+from myApp.bulk import BulkValidationError, bulk_request_rows, bulk_error_payload, require_bool
+from myApp.pagination import page_args, wants_stream, stream_args, ndjson_response, json_response, NEXT_PAGE_HEADER
 
 section_blueprint = Blueprint('section_blueprint', __name__)
 controller = SectionController()
@@ -29,13 +31,111 @@ def create_section():
     except Exception as e:
         return format_section_error(str(e))
 
+@section_blueprint.route('/section/bulk', methods=['POST', 'PUT', 'DELETE'])
+def bulk_sections():
+    """Create (POST), update (PUT) or delete (DELETE) many sections in one transaction."""
+    try:
+        rows = bulk_request_rows(request.get_json())
+        if request.method == 'POST':
+            ids, message, status = controller.bulk_create_sections(rows), "Sections created successfully", 201
+        elif request.method == 'PUT':
+            ids, message, status = controller.bulk_update_sections(rows), "Sections updated successfully", 200
+        else:
+            ids, message, status = controller.bulk_delete_sections(rows), "Sections deleted successfully", 200
+        response = {
+            "message": message,
+            "data": {"section_ids": ids, "count": len(ids)}
+        }
+        return jsonify(response), status
+    except BulkValidationError as e:
+        return jsonify(bulk_error_payload(e)), 400
+    except Exception as e:
+        return format_section_error(str(e))
+
+@section_blueprint.route('/section/import', methods=['POST'])
+def import_sections():
+    """Import a section CSV, sent as a multipart 'file' field or as the raw request body."""
+    try:
+        upload = request.files.get('file')
+        result = controller.import_sections(upload.stream if upload else request.stream)
+        return format_section_response(
+            {**result, "rejected_count": len(result["rejected"])},
+            message="Sections imported successfully"
+        )
+    except Exception as e:
+        return format_section_error(str(e))
+
+@section_blueprint.route('/section/conflicts', methods=['POST'])
+def check_section_conflicts():
+    try:
+        payload = request.get_json()
+        proposals = payload.get('proposals') if isinstance(payload, dict) else payload
+        results = controller.check_conflicts(proposals)
+        conflicting = sum(1 for result in results if result['has_conflict'])
+        return format_section_response(
+            {
+                "results": results,
+                "total": len(results),
+                "conflicting": conflicting,
+            },
+            message="Conflicts found" if conflicting else "No conflicts found"
+        )
+    except Exception as e:
+        return format_section_error(str(e))
+
+@section_blueprint.route('/schedule/build', methods=['POST'])
+def build_schedules():
+    """Body: {"courses": ["CIIC 3015", ...], "semester": "Fall", "year": 2025, "rank": "gaps"|"end", "limit": 10}."""
+    try:
+        payload = request.get_json() or {}
+        if not payload.get('semester') or payload.get('year') is None:
+            return format_section_error("semester and year are required")
+        result = controller.build_schedules(
+            payload.get('courses'),
+            payload['semester'],
+            payload['year'],
+            payload.get('rank', 'gaps'),
+            payload.get('limit', 10)
+        )
+        return format_section_response(
+            result,
+            message="Schedules found" if result['schedules'] else "No schedule without overlaps"
+        )
+    except Exception as e:
+        return format_section_error(str(e))
+
+@section_blueprint.route('/section/assign', methods=['POST'])
+def assign_section_rooms():
+    """Body: {"semester": "Fall", "year": 2025, "reassign": false, "time_limit": 5}; nothing is written."""
+    try:
+        payload = request.get_json() or {}
+        if not payload.get('semester') or payload.get('year') is None:
+            return format_section_error("semester and year are required")
+        # Omitted options keep the controller defaults (ASSIGNMENT_TIME_LIMIT for time_limit)
+        options = {}
+        if 'reassign' in payload:
+            options['reassign'] = require_bool(payload, 'reassign')
+        if 'time_limit' in payload:
+            options['time_limit'] = payload['time_limit']
+        result = controller.assign_rooms(payload['semester'], payload['year'], **options)
+        return format_section_response(
+            result,
+            message="Unplaced sections remain" if result['unplaced'] else "Every section placed"
+        )
+    except Exception as e:
+        return format_section_error(str(e))
+
 @section_blueprint.route('/section', methods=['GET'])
 def get_all_sections():
     try:
-        sections = controller.get_all_sections()
-        return format_section_response(
-            sections if sections else [],
-            message="Sections retrieved successfully"
+        if wants_stream(request.args):
+            return ndjson_response(controller.stream_sections(**stream_args(request.args)))
+        # PostgreSQL builds the JSON; the rows never become Python dicts
+        body, next_after = controller.get_all_sections_json(**page_args(request.args))
+        return json_response(
+            body,
+            {"message": "Sections retrieved successfully"},
+            {NEXT_PAGE_HEADER: next_after} if next_after else None
         )
     except Exception as e:
         return format_section_error(str(e))
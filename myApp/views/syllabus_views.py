@@ -2,6 +2,7 @@
 
 from flask import Blueprint, request, jsonify, current_app
 from myApp.controllers.syllabus_controller import SyllabusController
+from myApp.pagination import page_args, page_headers, wants_stream, stream_args, ndjson_response
 from config.local_config import DATABASE_URL
 
 
@@ -43,10 +44,10 @@ def create_fragment():
 @syllabus_blueprint.route('/syllabus', methods=['GET'])
 def get_all_fragments():
     try:
-        fragments = controller.get_all_fragments()
-        if not fragments:
-            return format_error("No fragments found.")
-        return format_response(fragments)
+        if wants_stream(request.args):
+            return ndjson_response(controller.stream_fragments(**stream_args(request.args)))
+        fragments = controller.get_all_fragments(**page_args(request.args))
+        return jsonify(fragments), 200, page_headers(fragments)
     except Exception as e:
         return format_error(str(e))
 
@@ -0,0 +1,178 @@
+# myApp/warmup.py
+
+import threading
+import logging
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+# Start loading the registered resources in a background thread when the app starts
+WARMUP_ON_START = os.getenv("CHATBOT_WARMUP", "1") == "1"
+
+# Seconds a client is asked to wait (Retry-After) while a resource is still loading
+WARMUP_RETRY_AFTER = int(os.getenv("WARMUP_RETRY_AFTER", "5"))
+
+IDLE = "idle"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class NotReadyError(Exception):
+    """A resource is being loaded by another thread and the caller chose not to wait."""
+
+    def __init__(self, name):
+        super().__init__(f"{name} is still loading, please retry shortly")
+        self.name = name
+
+
+class LazyResource:
+    """
+    An expensive object (model, client, controller) built on first use.
+
+    get() builds it once and returns the same object afterwards. When
+    another thread is already building it, get(wait=False) raises
+    NotReadyError instead of blocking, so a request handler can answer
+    503 while the warm-up thread loads it. A failed build is retried on
+    the next get().
+    """
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self._value = None
+        self._state = IDLE
+        self._error = None
+        self._load_seconds = None
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+
+    @property
+    def ready(self):
+        return self._state == READY
+
+    def get(self, wait=True):
+        """
+        The resource, building it in this thread if nobody else is.
+
+        Args:
+            wait (bool): Block while another thread builds it (else raise NotReadyError).
+
+        Raises:
+            NotReadyError: If another thread is building it and wait is False.
+            Exception: Whatever the factory raised, if building it failed.
+        """
+        with self._lock:
+            while self._state == LOADING:
+                if not wait:
+                    raise NotReadyError(self.name)
+                self._done.wait()
+            if self._state == READY:
+                return self._value
+            self._state = LOADING
+        started = time.perf_counter()
+        try:
+            value = self.factory()
+        except Exception as e:
+            with self._lock:
+                self._state, self._error = FAILED, str(e)
+                self._done.notify_all()
+            logger.error(f"Loading {self.name} failed: {e}")
+            raise
+        with self._lock:
+            self._value, self._state, self._error = value, READY, None
+            self._load_seconds = round(time.perf_counter() - started, 3)
+            self._done.notify_all()
+        logger.info(f"Loaded {self.name} in {self._load_seconds}s")
+        return value
+
+    def warm(self):
+        """Build the resource if needed, logging instead of raising on failure."""
+        try:
+            self.get()
+        except Exception:
+            pass
+
+    def status(self):
+        """State (idle, loading, ready or failed), last error and load time."""
+        return {"state": self._state, "error": self._error, "load_seconds": self._load_seconds}
+
+    def _reset_after_fork(self):
+        # The thread that was loading it did not survive the fork
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        if self._state == LOADING:
+            self._state = IDLE
+
+
+_resources = {}
+_resources_lock = threading.Lock()
+_warmup_started = False
+
+
+def lazy_resource(name, factory):
+    """
+    Register (or get the already registered) lazy resource of a name.
+
+    Args:
+        name (str): Name shown by readiness().
+        factory (callable): Builds the resource; called at most once per successful load.
+
+    Returns:
+        LazyResource: The shared resource.
+    """
+    with _resources_lock:
+        resource = _resources.get(name)
+        if resource is None:
+            resource = LazyResource(name, factory)
+            _resources[name] = resource
+        return resource
+
+
+def start_warmup():
+    """
+    Load every registered resource in a daemon thread, in registration order.
+
+    A process forked afterwards (e.g. a gunicorn --preload worker) does not
+    inherit the thread, so resources it left loading are reset and the
+    warm-up starts again in the child.
+
+    Returns:
+        threading.Thread: The warm-up thread.
+    """
+    global _warmup_started
+    with _resources_lock:
+        resources = list(_resources.values())
+        _warmup_started = True
+
+    def warm_all():
+        for resource in resources:
+            resource.warm()
+
+    thread = threading.Thread(target=warm_all, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def readiness():
+    """Whether every registered resource is loaded, and the status of each."""
+    with _resources_lock:
+        resources = list(_resources.values())
+    return {
+        "ready": all(resource.ready for resource in resources),
+        "resources": {resource.name: resource.status() for resource in resources},
+    }
+
+
+def _restart_warmup_after_fork():
+    global _resources_lock
+    _resources_lock = threading.Lock()
+    for resource in _resources.values():
+        resource._reset_after_fork()
+    if _warmup_started:
+        start_warmup()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_warmup_after_fork)